@@ -0,0 +1,155 @@
+"""
+会话语言跟踪模块 - 锁定会话语言，避免每个片段都做语言检测
+"""
+from threading import Lock
+from typing import Dict, Optional
+from loguru import logger
+
+
+class SessionLanguageTracker:
+    """
+    会话语言跟踪器
+
+    未锁定时由 Whisper 自动检测语言，连续 lock_count 次高置信度检测到
+    同一语言后锁定，之后直接指定语言识别（跳过检测）。
+    锁定期间每 reprobe_interval 个片段用编码器语言检测复查一次：
+    置信度下降则解锁，高置信度检测到其他语言则切换。
+    """
+
+    def __init__(self, config: dict):
+        """
+        初始化语言跟踪器
+
+        Args:
+            config: 语言跟踪配置字典
+        """
+        # 锁定条件
+        self.lock_threshold = config.get('lock_threshold', 0.8)
+        self.lock_count = max(1, config.get('lock_count', 3))
+
+        # 复查间隔（片段数）和解锁阈值
+        self.reprobe_interval = max(1, config.get('reprobe_interval', 30))
+        self.unlock_threshold = config.get('unlock_threshold', 0.5)
+
+        # 状态（可能被多个识别线程同时访问）
+        self._lock = Lock()
+        self.language: Optional[str] = None
+        self._candidate: Optional[str] = None
+        self._streak = 0
+        self._since_probe = 0
+
+        # 统计
+        self.stats = {
+            'locked_segments': 0,
+            'probes': 0,
+            'locks': 0,
+            'unlocks': 0,
+            'switches': 0
+        }
+
+        logger.info(
+            f"会话语言跟踪初始化: 锁定阈值={self.lock_threshold}, "
+            f"连续次数={self.lock_count}, 复查间隔={self.reprobe_interval}"
+        )
+
+    def next_segment(self) -> bool:
+        """
+        开始识别一个片段
+
+        Returns:
+            是否需要先复查语言
+        """
+        with self._lock:
+            if self.language is None:
+                return False
+
+            self.stats['locked_segments'] += 1
+            self._since_probe += 1
+            if self._since_probe < self.reprobe_interval:
+                return False
+            # 只让一个线程复查
+            self._since_probe = 0
+            return True
+
+    def observe(self, language: str, probability: float):
+        """
+        记录一次自动检测结果（未锁定时）
+
+        Args:
+            language: 检测到的语言
+            probability: 置信度
+        """
+        with self._lock:
+            if self.language is not None or not language or language == 'unknown':
+                return
+
+            if probability < self.lock_threshold:
+                self._streak = 0
+                return
+
+            if language == self._candidate:
+                self._streak += 1
+            else:
+                self._candidate = language
+                self._streak = 1
+
+            if self._streak >= self.lock_count:
+                self._lock_language(language)
+
+    def observe_probe(self, language: str, probability: float):
+        """
+        记录一次复查结果（锁定时）
+
+        Args:
+            language: 检测到的语言
+            probability: 置信度
+        """
+        with self._lock:
+            self.stats['probes'] += 1
+            self._since_probe = 0
+
+            if self.language is None or language == 'unknown':
+                return
+
+            if language == self.language:
+                if probability < self.unlock_threshold:
+                    self._unlock(f"置信度下降 ({probability:.2f})")
+            elif probability >= self.lock_threshold:
+                self.stats['switches'] += 1
+                logger.info(f"会话语言切换: {self.language} -> {language} ({probability:.2f})")
+                self._lock_language(language)
+            else:
+                self._unlock(f"检测到 {language} ({probability:.2f})")
+
+    def _lock_language(self, language: str):
+        """锁定语言"""
+        self.language = language
+        self._since_probe = 0
+        self._streak = 0
+        self._candidate = None
+        self.stats['locks'] += 1
+        logger.info(f"会话语言已锁定: {language}")
+
+    def _unlock(self, reason: str):
+        """解锁，恢复自动检测"""
+        logger.info(f"会话语言解锁: {self.language}，{reason}")
+        self.language = None
+        self.stats['unlocks'] += 1
+
+    def reset(self):
+        """重置跟踪状态"""
+        self.language = None
+        self._candidate = None
+        self._streak = 0
+        self._since_probe = 0
+
+    def get_stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        stats = dict(self.stats)
+        stats['language'] = self.language
+        return stats
@@ -0,0 +1,233 @@
+"""
+增量 log-mel 特征模块 - 流式重叠窗口只计算新音频的 mel 帧
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+import numpy as np
+from loguru import logger
+
+
+class IncrementalMelExtractor:
+    """
+    增量 log-mel 特征提取器
+
+    替换 WhisperModel.feature_extractor。流式处理器识别的缓冲区和上一次
+    大部分重叠，按流中的帧号缓存窗口内部帧的 log10 mel 值，
+    每次只计算新音频对应的帧；窗口首尾受填充影响的几帧和
+    整体归一化（最大值 - 8 截断）每次重新计算，结果与原提取器一致。
+
+    只有通过 bind() 绑定了流中位置的音频才走缓存，其他调用
+    （批量识别、内置 VAD 拼接后的音频、语言检测）交给原提取器。
+    """
+
+    # 窗口开头受反射填充影响的帧数（帧中心前 n_fft/2 个采样在窗口外）
+    HEAD_FRAMES = 2
+
+    def __init__(self, base, max_frames: int = 3000):
+        """
+        初始化提取器
+
+        Args:
+            base: faster_whisper.feature_extractor.FeatureExtractor 实例
+            max_frames: 缓存的最大帧数（默认 30 秒）
+        """
+        self.base = base
+        self.max_frames = max_frames
+        self._window = np.hanning(base.n_fft + 1)[:-1].astype(np.float32)
+
+        # 缓存: 流中帧号 [_first, _first + _count) 的 log10 mel 值
+        self._frames = np.empty((base.mel_filters.shape[0], max_frames), dtype=np.float32)
+        self._first = 0
+        self._count = 0
+
+        # 当前线程绑定的 (音频, 流中起始采样)
+        self._bound = threading.local()
+
+        self.stats = {
+            'calls': 0,
+            'fallbacks': 0,
+            'frames_computed': 0,
+            'frames_reused': 0,
+            'extract_time': 0.0
+        }
+
+    def __getattr__(self, name):
+        # 其余属性（sampling_rate、hop_length、time_per_frame 等）取自原提取器
+        return getattr(self.base, name)
+
+    @contextmanager
+    def bind(self, audio: np.ndarray, stream_offset: int):
+        """
+        绑定音频在流中的位置，期间对这段音频的特征提取使用缓存
+
+        Args:
+            audio: 即将送入模型的音频（同一个数组对象）
+            stream_offset: audio[0] 在流中的采样序号
+        """
+        self._bound.item = (audio, stream_offset)
+        try:
+            yield self
+        finally:
+            self._bound.item = None
+
+    def reset(self):
+        """清空缓存（流重新开始时调用）"""
+        self._first = 0
+        self._count = 0
+
+    def __call__(self, waveform: np.ndarray, padding: int = 160, chunk_length: Optional[int] = None):
+        """
+        计算 log-mel 特征（与 FeatureExtractor.__call__ 相同的接口和结果）
+
+        Args:
+            waveform: 音频数据
+            padding: 末尾补零的采样数
+            chunk_length: 分块时长（秒）
+
+        Returns:
+            log-mel 特征 (n_mels, 帧数)
+        """
+        bound = getattr(self._bound, 'item', None)
+        hop = self.base.hop_length
+        if (bound is None or waveform is not bound[0] or padding != hop
+                or bound[1] % hop or len(waveform) < self.base.n_fft * 2):
+            return self.base(waveform, padding=padding, chunk_length=chunk_length)
+
+        if chunk_length is not None:
+            self.base.n_samples = chunk_length * self.base.sampling_rate
+            self.base.nb_max_frames = self.base.n_samples // hop
+
+        start_time = time.perf_counter()
+        self.stats['calls'] += 1
+
+        half = self.base.n_fft // 2
+        length = len(waveform)
+        origin = bound[1] // hop
+
+        # 内部帧 k 覆盖 [k*hop - n_fft/2, k*hop + n_fft/2)，完全在窗口内，与窗口起点无关
+        last_inner = (length - half) // hop
+        if last_inner - self.HEAD_FRAMES + 1 > self.max_frames:
+            self.stats['fallbacks'] += 1
+            return self.base(waveform, padding=padding, chunk_length=chunk_length)
+        inner = self._inner_frames(waveform, origin, last_inner)
+
+        # 开头两帧（反射填充）和末尾几帧（补零 + 反射填充）单独计算
+        head = self._log_mel(waveform[:(self.HEAD_FRAMES + 1) * hop + half], padding=0)[:, :self.HEAD_FRAMES]
+        tail_start = (last_inner + 1 - self.HEAD_FRAMES) * hop
+        tail = self._log_mel(waveform[tail_start:], padding=padding)[:, self.HEAD_FRAMES:]
+
+        log_spec = np.concatenate([head, inner, tail], axis=1)
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+
+        self.stats['extract_time'] += time.perf_counter() - start_time
+        return log_spec
+
+    def _inner_frames(self, waveform: np.ndarray, origin: int, last_inner: int) -> np.ndarray:
+        """
+        取窗口内部帧，缓存中没有的帧从音频计算后追加
+
+        Args:
+            waveform: 窗口音频
+            origin: 窗口起点的流中帧号
+            last_inner: 最后一个内部帧的窗口内帧号
+
+        Returns:
+            内部帧的 log10 mel 值 (n_mels, 帧数)
+        """
+        hop = self.base.hop_length
+        half = self.base.n_fft // 2
+        first = origin + self.HEAD_FRAMES
+        end = origin + last_inner + 1
+
+        # 缓存与本窗口不连续时重新开始
+        if not self._count or first < self._first or first > self._first + self._count:
+            self._first = first
+            self._count = 0
+
+        # 丢掉窗口之前的帧
+        if first > self._first:
+            drop = first - self._first
+            self._frames[:, :self._count - drop] = self._frames[:, drop:self._count]
+            self._first = first
+            self._count -= drop
+
+        cached_end = self._first + self._count
+        reused = min(cached_end, end) - first
+        if cached_end < end:
+            k0 = cached_end - origin
+            samples = waveform[k0 * hop - half:last_inner * hop + half]
+            frames = self._log_mel(samples, padding=0, center=False)
+            self._frames[:, self._count:self._count + frames.shape[1]] = frames
+            self._count += frames.shape[1]
+            self.stats['frames_computed'] += frames.shape[1]
+
+        self.stats['frames_reused'] += reused
+        return self._frames[:, first - self._first:end - self._first]
+
+    def _log_mel(self, samples: np.ndarray, padding: int, center: bool = True) -> np.ndarray:
+        """
+        计算 log10 mel 值（归一化之前，与 FeatureExtractor 相同的步骤）
+
+        Args:
+            samples: 音频
+            padding: 末尾补零的采样数
+            center: 是否两端反射填充
+
+        Returns:
+            log10 mel 值 (n_mels, 帧数)；center 时与原提取器一样丢掉最后一帧
+        """
+        if padding:
+            samples = np.pad(samples, (0, padding))
+
+        stft = self.base.stft(
+            samples,
+            self.base.n_fft,
+            self.base.hop_length,
+            window=self._window,
+            center=center,
+            return_complex=True
+        ).astype(np.complex64)
+        if center:
+            stft = stft[..., :-1]
+        magnitudes = np.abs(stft) ** 2
+
+        mel_spec = self.base.mel_filters @ magnitudes
+        return np.log10(np.clip(mel_spec, a_min=1e-10, a_max=None))
+
+    def get_stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        stats = dict(self.stats)
+        total = stats['frames_computed'] + stats['frames_reused']
+        stats['reuse_rate'] = stats['frames_reused'] / total if total else 0.0
+        stats['cached_frames'] = self._count
+        return stats
+
+
+def install(model) -> Optional[IncrementalMelExtractor]:
+    """
+    为 WhisperModel 安装增量特征提取器
+
+    Args:
+        model: WhisperModel 实例
+
+    Returns:
+        安装的提取器，模型没有 feature_extractor 时返回 None
+    """
+    base = getattr(model, 'feature_extractor', None)
+    if base is None:
+        return None
+    if isinstance(base, IncrementalMelExtractor):
+        return base
+
+    extractor = IncrementalMelExtractor(base)
+    model.feature_extractor = extractor
+    logger.debug("已安装增量 log-mel 特征提取器")
+    return extractor
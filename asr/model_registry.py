@@ -0,0 +1,311 @@
+"""
+模型路由模块 - 按源语言选择专用检查点（英语使用 .en 模型）
+"""
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+
+# 有英语专用版本的多语言检查点
+ENGLISH_CHECKPOINTS = {
+    'tiny': 'tiny.en',
+    'base': 'base.en',
+    'small': 'small.en',
+    'medium': 'medium.en',
+    'distil-small': 'distil-small.en',
+    'distil-medium': 'distil-medium.en'
+}
+
+
+def checkpoint_for(model_size: str, language: Optional[str],
+                   checkpoints: Optional[Dict[str, str]] = None,
+                   english_only: bool = True) -> str:
+    """
+    选择某个语言使用的检查点
+
+    Args:
+        model_size: 配置的多语言模型
+        language: 源语言（None 为未知）
+        checkpoints: 自定义 语言 -> 检查点 映射（优先）
+        english_only: 英语是否使用 .en 检查点
+
+    Returns:
+        检查点名称或路径，没有专用检查点时返回 model_size
+    """
+    if not language:
+        return model_size
+    if checkpoints and language in checkpoints:
+        return checkpoints[language]
+    if language == 'en' and english_only:
+        return ENGLISH_CHECKPOINTS.get(model_size, model_size)
+    return model_size
+
+
+class ModelRegistry:
+    """
+    语言 -> 模型检查点注册表
+
+    会话语言变化时切换活动模型。每次识别 acquire/release 一次，
+    正在使用的模型不会被卸载。
+    acquire 遇到未加载的检查点时在后台线程加载，加载完成前继续使用默认模型
+    （识别不等待下载和加载）；按需加载的模型与预加载的一样常驻，再次切换不重新加载。
+    加载失败的检查点不再重试，回退到默认模型。
+    模型在锁外加载（同一检查点只加载一次，其他线程等待加载事件），
+    加载期间不阻塞其他检查点的 acquire/release。
+    """
+
+    def __init__(self, config: dict, model_size: str,
+                 loader: Callable[[str], object],
+                 on_unload: Optional[Callable[[str], None]] = None):
+        """
+        初始化注册表
+
+        Args:
+            config: 模型路由配置字典
+            model_size: 默认（多语言）检查点
+            loader: 加载检查点的函数，返回模型实例
+            on_unload: 卸载检查点时的回调（清理关联的批量管线等）
+        """
+        self.english_only = config.get('english_only', True)
+        self.checkpoints: Dict[str, str] = dict(config.get('checkpoints') or {})
+        self.preload_languages: List[str] = list(config.get('preload') or [])
+        self.default = model_size
+        self.loader = loader
+        self.on_unload = on_unload
+
+        # 检查点 -> {'model', 'refs', 'resident', 'uses'}
+        self._entries: Dict[str, Dict] = {}
+        self._failed = set()
+        # 正在加载的检查点 -> 加载完成事件
+        self._loading: Dict[str, Event] = {}
+        # clear 时递增，之前开始的加载完成后丢弃
+        self._generation = 0
+        self.active = model_size
+        self._lock = Lock()
+
+        self.stats = {
+            'loads': 0,
+            'unloads': 0,
+            'switches': 0,
+            'load_failures': 0
+        }
+
+    def checkpoint_for(self, language: Optional[str]) -> str:
+        """
+        语言对应的检查点
+
+        Args:
+            language: 源语言
+
+        Returns:
+            检查点名称
+        """
+        checkpoint = checkpoint_for(self.default, language, self.checkpoints, self.english_only)
+        return self.default if checkpoint in self._failed else checkpoint
+
+    def register(self, checkpoint: str, model, resident: bool = True):
+        """
+        登记已加载的模型（默认模型由引擎加载后登记）
+
+        Args:
+            checkpoint: 检查点名称
+            model: 模型实例
+            resident: 是否常驻（不因切换而卸载）
+        """
+        with self._lock:
+            self._entries[checkpoint] = {'model': model, 'refs': 0, 'resident': resident, 'uses': 0}
+
+    def preload(self, languages: Optional[Iterable[str]] = None):
+        """
+        预加载语言对应的检查点（常驻）
+
+        Args:
+            languages: 语言列表（None 为配置的 preload）
+        """
+        for language in self.preload_languages if languages is None else languages:
+            self._load(self.checkpoint_for(language), resident=True)
+
+    def acquire(self, language: Optional[str]) -> Tuple[str, object]:
+        """
+        取得语言对应的模型（引用计数 +1，用完调用 release）
+
+        检查点尚未加载时开始后台加载，本次返回默认模型。
+
+        Args:
+            language: 源语言（None 为默认模型）
+
+        Returns:
+            (检查点名称, 模型实例)
+        """
+        checkpoint = self.checkpoint_for(language)
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(checkpoint)
+                if entry is None and checkpoint != self.default:
+                    self._load_in_background(checkpoint)
+                    checkpoint = self.default
+                    entry = self._entries.get(checkpoint)
+
+                if entry is not None:
+                    if checkpoint != self.active:
+                        logger.info(f"切换识别模型: {self.active} -> {checkpoint} (语言 {language})")
+                        previous = self.active
+                        self.active = checkpoint
+                        self.stats['switches'] += 1
+                        self._maybe_unload(previous)
+
+                    entry['refs'] += 1
+                    entry['uses'] += 1
+                    return checkpoint, entry['model']
+
+            # 默认模型尚未登记：同步加载
+            if self._load(checkpoint, resident=True) is None:
+                raise RuntimeError(f"默认模型 {checkpoint} 加载失败")
+
+    def release(self, checkpoint: str):
+        """
+        归还 acquire 取得的模型
+
+        Args:
+            checkpoint: acquire 返回的检查点名称
+        """
+        with self._lock:
+            entry = self._entries.get(checkpoint)
+            if entry is None:
+                return
+            entry['refs'] = max(0, entry['refs'] - 1)
+            self._maybe_unload(checkpoint)
+
+    def models(self) -> List[Tuple[str, object]]:
+        """
+        已加载的非默认模型
+
+        Returns:
+            [(检查点名称, 模型实例)]
+        """
+        with self._lock:
+            return [(name, entry['model']) for name, entry in self._entries.items() if name != self.default]
+
+    def clear(self):
+        """卸载全部模型（引擎卸载时调用）"""
+        with self._lock:
+            if self.on_unload:
+                for checkpoint in self._entries:
+                    self.on_unload(checkpoint)
+            self._entries.clear()
+            self.active = self.default
+            self._generation += 1
+
+    def _load_in_background(self, checkpoint: str):
+        """
+        在后台线程加载检查点（常驻），已在加载或加载失败过时不重复（持有锁时调用）
+
+        Args:
+            checkpoint: 检查点名称
+        """
+        if checkpoint in self._failed or checkpoint in self._loading:
+            return
+        loading = self._loading[checkpoint] = Event()
+        Thread(
+            target=self._load_model, args=(checkpoint, loading, True),
+            daemon=True, name=f"model-load-{checkpoint}"
+        ).start()
+
+    def _load(self, checkpoint: str, resident: bool = False) -> Optional[Dict]:
+        """
+        取得或加载检查点（不持有锁时调用；加载在锁外进行）
+
+        Args:
+            checkpoint: 检查点名称
+            resident: 是否常驻
+
+        Returns:
+            条目，加载失败返回 None
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(checkpoint)
+                if entry is not None:
+                    if resident:
+                        entry['resident'] = True
+                    return entry
+                if checkpoint in self._failed:
+                    return None
+                loading = self._loading.get(checkpoint)
+                if loading is None:
+                    loading = self._loading[checkpoint] = Event()
+                    break
+
+            # 其他线程正在加载：等它完成后重新查询
+            loading.wait()
+
+        return self._load_model(checkpoint, loading, resident)
+
+    def _load_model(self, checkpoint: str, loading: Event, resident: bool) -> Optional[Dict]:
+        """
+        加载检查点并登记（不持有锁；调用方已登记加载事件）
+
+        Args:
+            checkpoint: 检查点名称
+            loading: 加载完成事件
+            resident: 是否常驻
+
+        Returns:
+            条目，加载失败返回 None
+        """
+        with self._lock:
+            generation = self._generation
+
+        entry = None
+        try:
+            logger.info(f"正在加载路由模型: {checkpoint}...")
+            model = self.loader(checkpoint)
+            entry = {'model': model, 'refs': 0, 'resident': resident, 'uses': 0}
+        except Exception as e:
+            logger.error(f"加载路由模型 {checkpoint} 失败，使用 {self.default}: {e}")
+
+        with self._lock:
+            if entry is None:
+                self._failed.add(checkpoint)
+                self.stats['load_failures'] += 1
+            elif generation != self._generation:
+                # 加载期间引擎已卸载
+                entry = None
+            else:
+                self._entries[checkpoint] = entry
+                self.stats['loads'] += 1
+            del self._loading[checkpoint]
+        loading.set()
+        return entry
+
+    def _maybe_unload(self, checkpoint: str):
+        """非常驻、非活动且无人使用的模型卸载（持有锁时调用）"""
+        entry = self._entries.get(checkpoint)
+        if (entry is not None and not entry['resident'] and entry['refs'] == 0
+                and checkpoint != self.active and checkpoint != self.default):
+            self._unload(checkpoint)
+
+    def _unload(self, checkpoint: str):
+        """卸载模型（持有锁时调用）"""
+        self._entries.pop(checkpoint, None)
+        if self.on_unload:
+            self.on_unload(checkpoint)
+        self.stats['unloads'] += 1
+        logger.info(f"已卸载路由模型: {checkpoint}")
+
+    def get_stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['active'] = self.active
+            stats['models'] = {
+                name: {'refs': entry['refs'], 'uses': entry['uses'], 'resident': entry['resident']}
+                for name, entry in self._entries.items()
+            }
+        return stats
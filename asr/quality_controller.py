@@ -0,0 +1,157 @@
+"""
+ASR 负载自适应模块 - 根据实时率 (RTF) 和队列积压调整识别质量
+"""
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from loguru import logger
+
+
+class ASRQualityController:
+    """
+    识别质量分级控制器
+
+    质量等级（数字越大越省算力）：
+    - 0: 配置的 beam_size 和窗口
+    - 1: 贪心解码 (beam_size=1)
+    - 2: 贪心解码 + 缩短识别窗口
+    - 3: 贪心解码 + 缩短窗口 + 备用小模型（已配置时）
+
+    RTF 平滑值或队列积压超过上限时降一级；两者都回落到下限以下
+    并持续 recover_count 次后升一级。两次调整之间至少间隔 min_interval 秒。
+    """
+
+    def __init__(self, config: dict, engine):
+        """
+        初始化控制器
+
+        Args:
+            config: 控制器配置字典
+            engine: WhisperEngine 实例
+        """
+        self.engine = engine
+        self.base_beam_size = engine.beam_size
+
+        # 降级条件
+        self.rtf_high = config.get('rtf_high', 0.9)
+        self.queue_high = config.get('queue_high', 5)
+
+        # 恢复条件
+        self.rtf_low = config.get('rtf_low', 0.5)
+        self.queue_low = config.get('queue_low', 0)
+        self.recover_count = config.get('recover_count', 5)
+
+        # 调整间隔和 RTF 平滑系数
+        self.min_interval = config.get('min_interval', 5.0)
+        self.smoothing = config.get('smoothing', 0.3)
+
+        # 缩短窗口的比例
+        self.short_window_scale = config.get('short_window_scale', 0.5)
+
+        # 最高等级（没有备用模型时不进入 3 级）
+        self.max_level = 3 if engine.fallback_model_size else 2
+
+        self.level = 0
+        self.rtf: Optional[float] = None
+        self._calm = 0
+        self._last_change = 0.0
+
+        # 调整记录（指标）
+        self.transitions: deque = deque(maxlen=config.get('history', 50))
+        self.transition_count = 0
+
+        logger.info(
+            f"ASR 负载控制初始化: RTF {self.rtf_low}-{self.rtf_high}, "
+            f"队列上限={self.queue_high}, 最高等级={self.max_level}"
+        )
+
+    @property
+    def window_scale(self) -> float:
+        """当前识别窗口的缩放比例"""
+        return self.short_window_scale if self.level >= 2 else 1.0
+
+    def record(self, rtf: float, queue_depth: int) -> bool:
+        """
+        记录一次识别的 RTF 和当前队列积压，必要时调整等级
+
+        Args:
+            rtf: 实时率（处理耗时 / 音频时长）
+            queue_depth: 待识别的队列长度
+
+        Returns:
+            等级是否发生变化
+        """
+        if self.rtf is None:
+            self.rtf = rtf
+        else:
+            self.rtf += self.smoothing * (rtf - self.rtf)
+
+        overloaded = self.rtf > self.rtf_high or queue_depth >= self.queue_high
+        calm = self.rtf < self.rtf_low and queue_depth <= self.queue_low
+        self._calm = self._calm + 1 if calm else 0
+
+        now = time.monotonic()
+        if now - self._last_change < self.min_interval:
+            return False
+
+        if overloaded and self.level < self.max_level:
+            self._set_level(self.level + 1, queue_depth, now)
+            return True
+
+        if self._calm >= self.recover_count and self.level > 0:
+            self._set_level(self.level - 1, queue_depth, now)
+            return True
+
+        return False
+
+    def _set_level(self, level: int, queue_depth: int, now: float):
+        """
+        切换质量等级并应用到引擎
+
+        Args:
+            level: 新等级
+            queue_depth: 当前队列积压
+            now: 当前时间（monotonic）
+        """
+        previous = self.level
+        self.level = level
+        self._calm = 0
+        self._last_change = now
+
+        self.engine.set_quality(
+            beam_size=self.base_beam_size if level == 0 else 1,
+            use_fallback=level >= 3
+        )
+
+        self.transition_count += 1
+        self.transitions.append({
+            'time': time.time(),
+            'from': previous,
+            'to': level,
+            'rtf': self.rtf,
+            'queue_depth': queue_depth
+        })
+
+        logger.info(
+            f"ASR 质量调整: 等级 {previous} -> {level} "
+            f"(RTF={self.rtf:.2f}, 队列={queue_depth}, beam={self.engine.beam_size}, "
+            f"备用模型={'是' if self.engine.use_fallback else '否'})"
+        )
+
+    def get_stats(self) -> Dict:
+        """
+        获取控制器统计信息
+
+        Returns:
+            统计信息字典
+        """
+        transitions: List[Dict] = list(self.transitions)
+        return {
+            'level': self.level,
+            'rtf': self.rtf,
+            'beam_size': self.engine.beam_size,
+            'use_fallback': self.engine.use_fallback,
+            'window_scale': self.window_scale,
+            'transitions': self.transition_count,
+            'recent_transitions': transitions[-10:]
+        }
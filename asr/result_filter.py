@@ -0,0 +1,217 @@
+"""
+识别结果过滤模块 - 在翻译前丢弃非语音片段和 Whisper 幻觉输出
+"""
+import re
+from threading import Lock
+from typing import Dict, Iterable
+from loguru import logger
+
+
+# Whisper 在音乐、枪声、静音上常见的幻觉文本（比较时忽略大小写、空白和标点）
+DEFAULT_HALLUCINATIONS = (
+    "thank you for watching",
+    "thanks for watching",
+    "please subscribe",
+    "subscribe to my channel",
+    "like and subscribe",
+    "subtitles by the amara.org community",
+    "字幕由amara.org社区提供",
+    "请不吝点赞 订阅 转发 打赏支持明镜与点点栏目",
+    "谢谢观看",
+    "感谢观看",
+    "ご視聴ありがとうございました",
+    "チャンネル登録お願いします",
+    "시청해 주셔서 감사합니다",
+)
+
+# 同时也是常见真实台词的幻觉文本，只在片段指标也像非语音时丢弃
+WEAK_HALLUCINATIONS = (
+    "you",
+)
+
+_PUNCTUATION = re.compile(r"[\s\.,!?;:'\"，。！？；：、…~\-]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    比较用的文本形式（小写，去掉空白和标点）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        归一化文本
+    """
+    return _PUNCTUATION.sub('', text).lower()
+
+
+class ASRResultFilter:
+    """
+    识别结果过滤器
+
+    逐片段检查 Whisper 的置信度指标：
+    - no_speech_prob 高且 avg_logprob 低：非语音
+    - avg_logprob 过低：低质量
+    - compression_ratio 过高：重复输出
+    - 文本与已知幻觉文本一致：幻觉
+    - 文本与弱幻觉文本（如 "You."）一致且 no_speech_prob 偏高或 avg_logprob 偏低：幻觉
+    被丢弃的片段不进入翻译。
+    """
+
+    def __init__(self, config: dict):
+        """
+        初始化过滤器
+
+        Args:
+            config: 过滤器配置字典
+        """
+        self.no_speech_threshold = config.get('no_speech_threshold', 0.6)
+        self.logprob_threshold = config.get('logprob_threshold', -1.0)
+        self.min_avg_logprob = config.get('min_avg_logprob', -1.5)
+        self.max_compression_ratio = config.get('max_compression_ratio', 2.4)
+
+        self.hallucinations = set()
+        self.add_hallucinations(DEFAULT_HALLUCINATIONS)
+        self.add_hallucinations(config.get('hallucinations', []))
+        self.weak_hallucinations = {normalize_text(text) for text in WEAK_HALLUCINATIONS}
+
+        # 统计（处理线程、最终识别线程和流式识别都会更新，持锁）
+        self._lock = Lock()
+        self.stats = {
+            'segments': 0,
+            'no_speech': 0,
+            'low_logprob': 0,
+            'repetitive': 0,
+            'hallucination': 0,
+            'dropped_results': 0
+        }
+
+        logger.info(f"识别结果过滤初始化: 幻觉文本 {len(self.hallucinations)} 条")
+
+    def add_hallucinations(self, texts: Iterable[str]):
+        """
+        添加幻觉文本
+
+        Args:
+            texts: 文本列表
+        """
+        for text in texts:
+            normalized = normalize_text(text)
+            if normalized:
+                self.hallucinations.add(normalized)
+
+    def is_hallucination(self, text: str) -> bool:
+        """
+        判断文本是否为已知幻觉
+
+        Args:
+            text: 识别文本
+
+        Returns:
+            是否为幻觉
+        """
+        return normalize_text(text) in self.hallucinations
+
+    def check_text(self, text: str) -> bool:
+        """
+        检查没有片段指标的文本（如流式识别确认的句子），丢弃的计入幻觉统计
+
+        Args:
+            text: 识别文本
+
+        Returns:
+            是否保留
+        """
+        if not self.is_hallucination(text):
+            return True
+
+        with self._lock:
+            self.stats['hallucination'] += 1
+            self.stats['dropped_results'] += 1
+        logger.debug(f"丢弃幻觉文本: {text[:50]}")
+        return False
+
+    def _reject_reason(self, segment: Dict) -> str:
+        """
+        检查单个片段
+
+        Args:
+            segment: 片段字典
+
+        Returns:
+            丢弃原因（统计键），保留返回空字符串
+        """
+        avg_logprob = segment.get('avg_logprob')
+        no_speech_prob = segment.get('no_speech_prob')
+        compression_ratio = segment.get('compression_ratio')
+
+        if (no_speech_prob is not None and avg_logprob is not None
+                and no_speech_prob > self.no_speech_threshold
+                and avg_logprob < self.logprob_threshold):
+            return 'no_speech'
+        if avg_logprob is not None and avg_logprob < self.min_avg_logprob:
+            return 'low_logprob'
+        if compression_ratio is not None and compression_ratio > self.max_compression_ratio:
+            return 'repetitive'
+        if self.is_hallucination(segment['text']):
+            return 'hallucination'
+        if (normalize_text(segment['text']) in self.weak_hallucinations
+                and ((no_speech_prob is not None and no_speech_prob > self.no_speech_threshold)
+                     or (avg_logprob is not None and avg_logprob < self.logprob_threshold))):
+            return 'hallucination'
+        return ''
+
+    def filter(self, asr_result: Dict) -> Dict:
+        """
+        过滤识别结果（原地更新 text 和 segments）
+
+        Args:
+            asr_result: WhisperEngine.transcribe 的结果字典
+
+        Returns:
+            过滤后的结果字典，丢弃的片段数记录在 filtered 字段
+        """
+        segments = asr_result.get('segments', [])
+        if not segments:
+            if asr_result.get('text') and not self.check_text(asr_result['text']):
+                asr_result['text'] = ''
+            return asr_result
+
+        kept = []
+        rejected = []
+        for segment in segments:
+            reason = self._reject_reason(segment)
+            if reason:
+                rejected.append(reason)
+                logger.debug(f"丢弃识别片段 ({reason}): {segment['text'][:50]}")
+            else:
+                kept.append(segment)
+
+        # 幻觉文本可能被拆成多个片段，整体再检查一次
+        if kept and len(kept) > 1 and self.is_hallucination(" ".join(s['text'] for s in kept)):
+            rejected += ['hallucination'] * len(kept)
+            kept = []
+
+        asr_result['filtered'] = len(segments) - len(kept)
+        if asr_result['filtered']:
+            asr_result['segments'] = kept
+            asr_result['text'] = " ".join(s['text'] for s in kept).strip()
+
+        with self._lock:
+            self.stats['segments'] += len(segments)
+            for reason in rejected:
+                self.stats[reason] += 1
+            if asr_result['filtered'] and not asr_result['text']:
+                self.stats['dropped_results'] += 1
+
+        return asr_result
+
+    def get_stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return dict(self.stats)
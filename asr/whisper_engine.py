@@ -2,14 +2,33 @@
 Whisper 语音识别引擎模块
 """
 import numpy as np
+from bisect import bisect_right
+from contextlib import nullcontext
 from faster_whisper import WhisperModel
+from threading import Event, Lock, Thread, local
 from typing import Optional, Dict, List, Tuple
 from loguru import logger
 import time
 
+try:
+    # faster-whisper >= 1.1 提供批量推理
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
+from audio.instrumentation import alloc_tracker
+from .language_tracker import SessionLanguageTracker
+from .mel_cache import IncrementalMelExtractor, install as install_mel_cache
+from .model_registry import ModelRegistry, checkpoint_for
+
 
 class WhisperEngine:
-    """Whisper 语音识别引擎"""
+    """
+    Whisper 语音识别引擎
+
+    生命周期: unloaded -> loading -> warming -> ready（失败为 failed），
+    ready 事件在模型加载并完成预热后置位。
+    """
 
     def __init__(self, config: dict):
         """
@@ -22,52 +41,385 @@ class WhisperEngine:
         self.model_size = config.get('model_size', 'medium')
         self.device = config.get('device', 'cuda')
         self.compute_type = config.get('compute_type', 'float16')
+
+        # 并发识别：CTranslate2 worker 数和每个 worker 的 CPU 线程数（0 为自动）
+        self.num_workers = config.get('num_workers', 1)
+        self.cpu_threads = config.get('cpu_threads', 0)
         self.beam_size = config.get('beam_size', 5)
         self.language = config.get('language', None)  # None = 自动检测
         self.task = config.get('task', 'transcribe')  # transcribe / translate
-        self.vad_filter = config.get('vad_filter', True)
+        # 内置 Silero VAD: True 总是使用 / False 不使用 / 'auto' 未提供语音区间时使用
+        self.vad_filter = config.get('vad_filter', 'auto')
+        self.batch_size = config.get('batch_size', 8)  # 1 = 不使用批量推理
+
+        # 流式重叠窗口复用已计算的 log-mel 帧
+        self.mel_cache = config.get('mel_cache', True)
+
+        # 延迟预算：限制温度回退次数和解码长度；按近期 RTF 预计会超过 max_latency 时
+        # 解码前就去掉温度回退并缩短解码长度，多窗口音频另外在片段之间检查截止时间
+        budget = config.get('latency_budget', {})
+        self.max_fallbacks = budget.get('max_fallbacks', 1)
+        self.tokens_per_second = budget.get('tokens_per_second', 12)
+        self.min_new_tokens = budget.get('min_new_tokens', 16)
+        self.max_latency = budget.get('max_latency', 3.0)  # 秒，0 为不限制
+        self.rtf_estimate = 0.0  # 近期 RTF（指数平均，不含草稿模型）
+        self.budget_limited = 0  # 因预计超时而收紧解码参数的次数
+        self._budget_lock = Lock()  # 线程池的多个线程同时更新 RTF 估计和计数
+
+        # 会话语言跟踪（仅自动检测语言时）
+        tracking = config.get('language_tracking', {})
+        self.language_tracker: Optional[SessionLanguageTracker] = None
+        if self.language is None and tracking.get('enabled', True):
+            self.language_tracker = SessionLanguageTracker(tracking)
 
         self.model: Optional[WhisperModel] = None
+        self.batched_model = None
         self.is_loaded = False
 
-        logger.info(f"Whisper 引擎初始化: 模型={self.model_size}, 设备={self.device}")
+        # 备用小模型（负载过高时切换，随主模型预加载）
+        self.fallback_model_size = config.get('fallback_model_size', None)
+        self.fallback_model: Optional[WhisperModel] = None
+        self.batched_fallback = None
+        self.use_fallback = False
+
+        # 两遍识别：小模型先出草稿，配置的模型随后重新识别并替换
+        two_pass = config.get('two_pass', {})
+        self.draft_model_size = two_pass.get('draft_model_size', 'base') if two_pass.get('enabled', False) else None
+        self.draft_beam_size = two_pass.get('draft_beam_size', 1)
+        self.draft_model: Optional[WhisperModel] = None
+
+        # 按源语言路由到专用检查点（英语使用 .en 模型）
+        routing = config.get('model_routing', {})
+        self.model_registry: Optional[ModelRegistry] = None
+        self._batched_routes: Dict[str, object] = {}
+        if routing.get('enabled', True):
+            english_only = routing.get('english_only', True)
+            if self.language:
+                # 固定语言：直接加载对应的检查点
+                self.model_size = checkpoint_for(
+                    self.model_size, self.language, routing.get('checkpoints'), english_only
+                )
+                if self.fallback_model_size:
+                    self.fallback_model_size = checkpoint_for(self.fallback_model_size, self.language,
+                                                              english_only=english_only)
+                if self.draft_model_size:
+                    self.draft_model_size = checkpoint_for(self.draft_model_size, self.language,
+                                                           english_only=english_only)
+            else:
+                # 自动检测：会话语言锁定后切换
+                self.model_registry = ModelRegistry(
+                    routing, self.model_size, self._load_routed_model,
+                    lambda checkpoint: self._batched_routes.pop(checkpoint, None)
+                )
+
+        # 就绪状态
+        self.warmup = config.get('warmup', True)
+        self.state = 'unloaded'
+        self.ready = Event()
+        self.load_time = 0.0
+        self.warmup_time = 0.0
+        self._load_lock = Lock()
+        self._thread_lock = Lock()
+        self._load_thread: Optional[Thread] = None
+
+        # 批量推理的拼接缓冲（按需扩容复用；线程池的各线程可能同时批量识别，每个线程一个）
+        self._batch_local = local()
+
+        logger.info(
+            f"Whisper 引擎初始化: 模型={self.model_size}, 设备={self.device}, "
+            f"并发={self.num_workers}, CPU 线程={self.cpu_threads or '自动'}"
+        )
+
+    def load_async(self) -> Optional[Thread]:
+        """
+        在后台线程加载模型并预热（已在加载或已就绪时不重复启动）
+
+        Returns:
+            加载线程，已就绪时返回 None
+        """
+        if self.ready.is_set():
+            return None
+
+        with self._thread_lock:
+            if self._load_thread and self._load_thread.is_alive():
+                return self._load_thread
+
+            self._load_thread = Thread(target=self._load_and_warm_up, daemon=True)
+            self._load_thread.start()
+            return self._load_thread
+
+    def _load_and_warm_up(self):
+        """
+        加载模型并预热（后台线程）
+        """
+        try:
+            self.load_model()
+            if self.warmup:
+                self.warm_up()
+        except Exception:
+            # 错误已在 load_model 中记录
+            return
+
+        self.state = 'ready'
+        self.ready.set()
+        logger.info(
+            f"Whisper 引擎就绪: 加载 {self.load_time:.2f}s, 预热 {self.warmup_time:.2f}s"
+        )
+
+    def warm_up(self, duration: float = 1.0):
+        """
+        用合成音频跑一次识别，提前完成首次解码的内存分配和内核初始化
+
+        Args:
+            duration: 预热音频时长（秒）
+        """
+        if not self.is_loaded:
+            self.load_model()
+
+        self.state = 'warming'
+        start_time = time.time()
+
+        rng = np.random.default_rng(0)
+        audio = (0.01 * rng.standard_normal(int(duration * 16000))).astype(np.float32)
+
+        routed = [model for _, model in self.model_registry.models()] if self.model_registry else []
+        for model in (self.model, self.draft_model, *routed):
+            if model is None:
+                continue
+            try:
+                segments, _ = model.transcribe(
+                    audio,
+                    language=self.language or 'en',
+                    task=self.task,
+                    beam_size=self.beam_size,
+                    vad_filter=False
+                )
+                # 消费生成器，完整跑一次解码
+                for _ in segments:
+                    pass
+            except Exception as e:
+                logger.warning(f"模型预热失败: {e}")
+
+        self.warmup_time = time.time() - start_time
+        logger.info(f"模型预热完成，耗时 {self.warmup_time:.2f}s")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待引擎就绪
+
+        Args:
+            timeout: 超时时间（秒），None 为一直等待
+
+        Returns:
+            是否已就绪
+        """
+        return self.ready.wait(timeout)
 
     def load_model(self):
         """
-        加载 Whisper 模型
+        加载 Whisper 模型（同步）
+        """
+        with self._load_lock:
+            self._load_model()
+
+    def _load_model(self):
+        """
+        加载 Whisper 模型（持有加载锁时调用）
         """
         if self.is_loaded:
-            logger.warning("模型已加载")
             return
 
         try:
+            self.state = 'loading'
             logger.info(f"正在加载 Whisper 模型: {self.model_size}...")
             start_time = time.time()
 
-            self.model = WhisperModel(
-                self.model_size,
-                device=self.device,
-                compute_type=self.compute_type,
-                download_root="./models/whisper"
-            )
+            self.model = self._create_model(self.model_size)
+
+            if self.fallback_model_size:
+                logger.info(f"正在加载备用模型: {self.fallback_model_size}...")
+                self.fallback_model = self._create_model(self.fallback_model_size)
+
+            if self.draft_model_size:
+                logger.info(f"正在加载草稿模型: {self.draft_model_size}...")
+                self.draft_model = self._create_model(self.draft_model_size)
+
+            if self.mel_cache:
+                install_mel_cache(self.model)
+                if self.fallback_model:
+                    install_mel_cache(self.fallback_model)
 
-            load_time = time.time() - start_time
+            if self.batch_size > 1:
+                if BatchedInferencePipeline is not None:
+                    self.batched_model = BatchedInferencePipeline(model=self.model)
+                    if self.fallback_model:
+                        self.batched_fallback = BatchedInferencePipeline(model=self.fallback_model)
+                else:
+                    logger.warning("当前 faster-whisper 不支持批量推理，使用逐段识别")
+
+            # 默认模型常驻，预加载路由模型（如英语 .en 检查点）
+            if self.model_registry:
+                self.model_registry.register(self.model_size, self.model)
+                self.model_registry.preload()
+
+            self.load_time = time.time() - start_time
             self.is_loaded = True
+            self.state = 'loaded'
 
-            logger.info(f"模型加载成功，耗时 {load_time:.2f}s")
+            logger.info(f"模型加载成功，耗时 {self.load_time:.2f}s")
 
         except Exception as e:
+            self.state = 'failed'
             logger.error(f"模型加载失败: {e}")
             raise
 
+    def _create_model(self, model_size: str) -> WhisperModel:
+        """
+        按引擎的设备和线程配置创建模型
+
+        Args:
+            model_size: 模型大小、名称或本地路径
+
+        Returns:
+            模型实例
+        """
+        return WhisperModel(
+            model_size,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers,
+            download_root="./models/whisper"
+        )
+
+    def _load_routed_model(self, checkpoint: str) -> WhisperModel:
+        """
+        加载路由模型（模型注册表的加载函数）
+
+        Args:
+            checkpoint: 检查点名称
+
+        Returns:
+            模型实例
+        """
+        model = self._create_model(checkpoint)
+        if self.mel_cache:
+            install_mel_cache(model)
+        return model
+
+    def _select_model(self, lang: Optional[str]) -> Tuple[str, WhisperModel, Optional[str]]:
+        """
+        选择本次识别使用的模型
+
+        Args:
+            lang: 本次识别的源语言（None 为自动检测）
+
+        Returns:
+            (模型名称, 模型实例, 需要 release 的路由检查点)
+        """
+        if self.use_fallback and self.fallback_model:
+            return self.fallback_model_size, self.fallback_model, None
+        if self.model_registry:
+            checkpoint, model = self.model_registry.acquire(lang)
+            return checkpoint, model, checkpoint
+        return self.model_size, self.model, None
+
+    def _clip_options(self, speech_regions: Optional[List[Tuple[float, float]]]) -> Dict:
+        """
+        根据上游语音区间决定是否运行内置 VAD
+
+        Args:
+            speech_regions: 上游 VAD 给出的语音区间（秒），None 为未提供
+
+        Returns:
+            model.transcribe 的 vad_filter / clip_timestamps 参数
+        """
+        if self.vad_filter is True:
+            return {'vad_filter': True}
+
+        if speech_regions:
+            # 只识别上游给出的语音区间，跳过内置 VAD
+            return {
+                'vad_filter': False,
+                'clip_timestamps': [t for region in speech_regions for t in region]
+            }
+
+        return {'vad_filter': self.vad_filter == 'auto'}
+
+    def _decode_options(self, duration: float, predict: bool = True) -> Tuple[Dict, bool]:
+        """
+        按延迟预算生成解码参数
+
+        单个 30 秒窗口在一次解码调用中完成（包括温度回退），片段之间的截止时间
+        检查来不及生效，所以按近期 RTF 预计本次耗时：超过 max_latency 时
+        不做温度回退，并按比例缩短解码长度。
+
+        Args:
+            duration: 音频时长（秒）
+            predict: 是否按近期 RTF 收紧（草稿模型不使用主模型的 RTF）
+
+        Returns:
+            (temperature / max_new_tokens 参数, 是否因预算收紧)
+        """
+        # 默认温度序列 0.0, 0.2, ..., 1.0，只保留前 max_fallbacks 次回退
+        temperatures = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0][:self.max_fallbacks + 1]
+
+        # 新 token 上限与时长成正比（单个 30 秒窗口内），保留提示文本的上下文空间
+        max_new_tokens = min(int(self.min_new_tokens + self.tokens_per_second * min(duration, 30.0)), 200)
+
+        expected = duration * self.rtf_estimate
+        limited = bool(predict and self.max_latency and expected > self.max_latency)
+        if limited:
+            temperatures = temperatures[:1]
+            max_new_tokens = max(self.min_new_tokens, int(max_new_tokens * self.max_latency / expected))
+            with self._budget_lock:
+                self.budget_limited += 1
+            logger.debug(f"预计识别耗时 {expected:.1f}s 超过预算，收紧解码参数 (max_new_tokens={max_new_tokens})")
+
+        options = {
+            'temperature': temperatures,
+            'max_new_tokens': max_new_tokens
+        }
+        return options, limited
+
+    @staticmethod
+    def _bind_features(model, audio: np.ndarray, stream_offset: Optional[int]):
+        """
+        流式识别时绑定音频在流中的位置，让增量特征提取器复用缓存帧
+
+        Args:
+            model: 本次使用的 WhisperModel
+            audio: 送入模型的音频
+            stream_offset: audio[0] 在流中的采样序号
+
+        Returns:
+            上下文管理器（model.transcribe 计算特征期间有效）
+        """
+        extractor = getattr(model, 'feature_extractor', None)
+        if stream_offset is None or not isinstance(extractor, IncrementalMelExtractor):
+            return nullcontext()
+        return extractor.bind(audio, stream_offset)
+
     def transcribe(self, audio: np.ndarray,
-                   language: Optional[str] = None) -> Dict:
+                   language: Optional[str] = None,
+                   word_timestamps: bool = False,
+                   initial_prompt: Optional[str] = None,
+                   speech_regions: Optional[List[Tuple[float, float]]] = None,
+                   stream_offset: Optional[int] = None,
+                   draft: bool = False) -> Dict:
         """
         转录音频
 
         Args:
             audio: 音频数据 (float32, 单声道)
             language: 源语言代码（None 为自动检测）
+            word_timestamps: 是否输出词级时间戳
+            initial_prompt: 提示文本（前文上下文）
+            speech_regions: 上游 VAD 给出的语音区间 [(起始秒, 结束秒)]，
+                提供时跳过内置 VAD（vad_filter 为 True 时忽略）
+            stream_offset: audio[0] 在流中的采样序号（流式识别时提供，
+                用于复用重叠部分的 log-mel 帧）
+            draft: 是否用草稿模型快速识别（两遍识别的第一遍，未加载草稿模型时忽略）
 
         Returns:
             识别结果字典
@@ -75,44 +427,92 @@ class WhisperEngine:
         if not self.is_loaded:
             self.load_model()
 
+        # 保证连续 float32 输入（已满足时不复制）
+        converted = np.ascontiguousarray(audio, dtype=np.float32)
+        if converted is not audio:
+            alloc_tracker.record('asr_input', converted.nbytes, copy=True)
+            audio = converted
+
+        routed = None
         try:
             start_time = time.time()
 
-            # 使用配置的语言或传入的语言
-            lang = language or self.language
+            draft = draft and self.draft_model is not None
 
-            # 转录
-            segments, info = self.model.transcribe(
-                audio,
-                language=lang,
-                task=self.task,
-                beam_size=self.beam_size,
-                vad_filter=self.vad_filter,
-                vad_parameters=dict(
-                    threshold=0.5,
-                    min_speech_duration_ms=250,
-                    min_silence_duration_ms=500
+            # 使用传入的语言、配置的语言或会话锁定的语言（草稿不做复查探测）
+            if draft:
+                lang = language or self.language or (
+                    self.language_tracker.language if self.language_tracker else None
+                )
+            else:
+                lang = language or self.language or self._session_language(audio)
+
+            # 转录（按语言路由到专用检查点）
+            if draft:
+                model_name, model = self.draft_model_size, self.draft_model
+            else:
+                model_name, model, routed = self._select_model(lang)
+            decode_options, budget_limited = self._decode_options(len(audio) / 16000, predict=not draft)
+            with self._bind_features(model, audio, stream_offset):
+                segments, info = model.transcribe(
+                    audio,
+                    language=lang,
+                    task=self.task,
+                    beam_size=self.draft_beam_size if draft else self.beam_size,
+                    word_timestamps=word_timestamps,
+                    initial_prompt=initial_prompt,
+                    vad_parameters=dict(
+                        threshold=0.5,
+                        min_speech_duration_ms=250,
+                        min_silence_duration_ms=500
+                    ),
+                    **decode_options,
+                    **self._clip_options(speech_regions)
                 )
-            )
 
             # 提取文本和时间戳
             results = []
             full_text = ""
+            timed_out = False
+            deadline = start_time + self.max_latency if self.max_latency else None
 
             for segment in segments:
-                results.append({
+                item = {
                     'start': segment.start,
                     'end': segment.end,
-                    'text': segment.text.strip()
-                })
+                    'text': segment.text.strip(),
+                    'no_speech_prob': segment.no_speech_prob,
+                    'avg_logprob': segment.avg_logprob,
+                    'compression_ratio': segment.compression_ratio
+                }
+                if word_timestamps and segment.words:
+                    item['words'] = [
+                        {'start': w.start, 'end': w.end, 'word': w.word}
+                        for w in segment.words
+                    ]
+                results.append(item)
                 full_text += segment.text.strip() + " "
 
+                # 超过截止时间且还有未解码的音频：返回已有结果
+                if (deadline and time.time() > deadline
+                        and segment.end < len(audio) / 16000 - 1.0):
+                    timed_out = True
+                    segments.close()
+                    logger.warning(f"识别超过截止时间 {self.max_latency:.1f}s，返回部分结果")
+                    break
+
             full_text = full_text.strip()
 
+            # 草稿模型的语言判断不计入会话跟踪
+            if lang is None and self.language_tracker and not draft:
+                self.language_tracker.observe(info.language, info.language_probability)
+
             # 处理时间
             process_time = time.time() - start_time
             audio_duration = len(audio) / 16000  # 假设 16kHz
-            rtf = process_time / audio_duration if audio_duration > 0 else 0
+            rtf = self._throughput_rtf(process_time, audio_duration)
+            if not draft and audio_duration >= 1.0:
+                self._update_rtf(rtf)
 
             result = {
                 'text': full_text,
@@ -121,11 +521,15 @@ class WhisperEngine:
                 'language_probability': info.language_probability,
                 'duration': audio_duration,
                 'process_time': process_time,
-                'rtf': rtf  # Real-Time Factor
+                'rtf': rtf,  # Real-Time Factor
+                'timed_out': timed_out,  # 超过截止时间，返回部分结果
+                'budget_limited': budget_limited,  # 按预计耗时收紧了解码参数
+                'draft': draft,
+                'model': model_name
             }
 
             logger.info(
-                f"识别完成: [{info.language}] \"{full_text[:50]}...\" "
+                f"{'草稿' if draft else '识别'}完成: [{info.language}] \"{full_text[:50]}...\" "
                 f"(耗时 {process_time:.2f}s, RTF={rtf:.2f}x)"
             )
 
@@ -139,10 +543,175 @@ class WhisperEngine:
                 'language': 'unknown',
                 'error': str(e)
             }
+        finally:
+            if routed:
+                self.model_registry.release(routed)
+
+    def transcribe_batch(self, audios: List[np.ndarray],
+                         language: Optional[str] = None,
+                         speech_regions: Optional[List[List[Tuple[float, float]]]] = None) -> List[Dict]:
+        """
+        批量转录多个语音片段（一次批量编码/解码）
+
+        片段拼接后以 clip_timestamps 标出各自范围，交给批量推理管线，
+        识别出的片段按起始时间归回各自的输入。
+        只有一个片段或不支持批量推理时逐段识别。
+
+        Args:
+            audios: 音频片段列表 (float32, 16kHz，每段不超过 30 秒)
+            language: 源语言代码（None 为自动检测）
+            speech_regions: 各片段的语音区间（秒），提供时只识别这些区间
+
+        Returns:
+            识别结果列表，与输入一一对应
+        """
+        if speech_regions is None or self.vad_filter is True:
+            speech_regions = [None] * len(audios)
+        if not self.is_loaded:
+            self.load_model()
+
+        max_clip = 30 * 16000
+        batched = self.batched_fallback if self.use_fallback and self.batched_fallback else self.batched_model
+        if (len(audios) < 2 or batched is None
+                or any(len(a) > max_clip or len(a) == 0 for a in audios)):
+            return [
+                self.transcribe(audio, language=language, speech_regions=regions)
+                for audio, regions in zip(audios, speech_regions)
+            ]
+
+        # 拼接到复用缓冲
+        total = sum(len(a) for a in audios)
+        buffer = getattr(self._batch_local, 'buffer', None)
+        if buffer is None or len(buffer) < total:
+            buffer = self._batch_local.buffer = np.empty(total * 2, dtype=np.float32)
+            alloc_tracker.record('asr_batch', buffer.nbytes)
+
+        clips = []
+        starts = []
+        pos = 0
+        for audio, regions in zip(audios, speech_regions):
+            buffer[pos:pos + len(audio)] = audio
+            if regions:
+                # 只识别语音区间
+                for start, end in regions:
+                    clips.append({
+                        'start': pos + int(start * 16000),
+                        'end': pos + min(len(audio), int(end * 16000))
+                    })
+            else:
+                clips.append({'start': pos, 'end': pos + len(audio)})
+            starts.append(pos / 16000)
+            pos += len(audio)
+        alloc_tracker.record('asr_batch', total * 4, copy=True)
+
+        routed = None
+        try:
+            start_time = time.time()
+            lang = language or self.language or self._session_language(audios[0])
+
+            # 会话语言路由到专用检查点时使用对应的批量管线
+            if self.model_registry and not (self.use_fallback and self.batched_fallback):
+                routed, model = self.model_registry.acquire(lang)
+                if routed != self.model_size:
+                    batched = self._batched_routes.get(routed)
+                    if batched is None:
+                        batched = BatchedInferencePipeline(model=model)
+                        self._batched_routes[routed] = batched
+
+            decode_options, budget_limited = self._decode_options(max(len(a) for a in audios) / 16000)
+            segments, info = batched.transcribe(
+                buffer[:total],
+                language=lang,
+                task=self.task,
+                beam_size=self.beam_size,
+                batch_size=min(self.batch_size, len(clips)),
+                clip_timestamps=clips,
+                vad_filter=False,
+                # 批量管线不做温度回退，只限制解码长度
+                max_new_tokens=decode_options['max_new_tokens']
+            )
+
+            # 识别片段按起始时间归回输入
+            texts = [[] for _ in audios]
+            items = [[] for _ in audios]
+            for segment in segments:
+                index = max(0, bisect_right(starts, segment.start + 0.01) - 1)
+                offset = starts[index]
+                items[index].append({
+                    'start': segment.start - offset,
+                    'end': segment.end - offset,
+                    'text': segment.text.strip(),
+                    'no_speech_prob': segment.no_speech_prob,
+                    'avg_logprob': segment.avg_logprob,
+                    'compression_ratio': segment.compression_ratio
+                })
+                texts[index].append(segment.text.strip())
+
+            if lang is None and self.language_tracker:
+                self.language_tracker.observe(info.language, info.language_probability)
+
+            process_time = time.time() - start_time
+            audio_duration = total / 16000
+            rtf = self._throughput_rtf(process_time, audio_duration)
+
+            logger.info(
+                f"批量识别完成: {len(audios)} 段, [{info.language}] "
+                f"(耗时 {process_time:.2f}s, RTF={rtf:.2f}x)"
+            )
+
+            results = []
+            for audio, text, item in zip(audios, texts, items):
+                duration = len(audio) / 16000
+                results.append({
+                    'text': " ".join(text).strip(),
+                    'segments': item,
+                    'language': info.language,
+                    'language_probability': info.language_probability,
+                    'duration': duration,
+                    # 批量耗时按时长分摊
+                    'process_time': process_time * duration / audio_duration,
+                    'rtf': rtf,
+                    'timed_out': False,
+                    'budget_limited': budget_limited,
+                    'batch_size': len(audios),
+                    'model': routed or self.model_size
+                })
+            return results
+
+        except Exception as e:
+            logger.error(f"批量转录失败，改为逐段识别: {e}")
+            return [
+                self.transcribe(audio, language=language, speech_regions=regions)
+                for audio, regions in zip(audios, speech_regions)
+            ]
+        finally:
+            if routed:
+                self.model_registry.release(routed)
+
+    def _session_language(self, audio: np.ndarray) -> Optional[str]:
+        """
+        获取会话锁定的语言（需要时先复查）
+
+        Args:
+            audio: 即将识别的音频（复查用）
+
+        Returns:
+            锁定的语言，未锁定返回 None（自动检测）
+        """
+        tracker = self.language_tracker
+        if tracker is None:
+            return None
+
+        # 太短的片段检测不可靠，推迟复查
+        if tracker.next_segment() and len(audio) >= 16000:
+            language, probability = self.detect_language(audio)
+            tracker.observe_probe(language, probability)
+
+        return tracker.language
 
     def detect_language(self, audio: np.ndarray) -> Tuple[str, float]:
         """
-        检测音频语言
+        检测音频语言（只运行编码器，不解码）
 
         Args:
             audio: 音频数据
@@ -157,20 +726,22 @@ class WhisperEngine:
             # 只取前 30 秒用于语言检测
             sample_audio = audio[:16000 * 30]
 
-            segments, info = self.model.transcribe(
-                sample_audio,
-                language=None,
-                task='transcribe',
-                beam_size=1,
-                vad_filter=False
-            )
-
-            # 消费生成器
-            _ = list(segments)
+            if hasattr(self.model, 'detect_language'):
+                language, probability, _ = self.model.detect_language(audio=sample_audio)
+            else:
+                # 旧版本：语言在 transcribe 返回前已检测，不消费生成器即不解码
+                _, info = self.model.transcribe(
+                    sample_audio,
+                    language=None,
+                    task='transcribe',
+                    beam_size=1,
+                    vad_filter=False
+                )
+                language, probability = info.language, info.language_probability
 
-            logger.info(f"检测到语言: {info.language} (置信度: {info.language_probability:.2f})")
+            logger.debug(f"检测到语言: {language} (置信度: {probability:.2f})")
 
-            return info.language, info.language_probability
+            return language, probability
 
         except Exception as e:
             logger.error(f"语言检测失败: {e}")
@@ -187,12 +758,14 @@ class WhisperEngine:
             识别结果列表
         """
         results = []
+        step = max(1, self.batch_size)
 
-        for i, chunk in enumerate(audio_chunks):
-            logger.debug(f"处理音频块 {i+1}/{len(audio_chunks)}")
-            result = self.transcribe(chunk)
-            if result['text']:
-                results.append(result)
+        for i in range(0, len(audio_chunks), step):
+            batch = audio_chunks[i:i + step]
+            logger.debug(f"处理音频块 {i+1}-{i+len(batch)}/{len(audio_chunks)}")
+            for result in self.transcribe_batch(batch):
+                if result['text']:
+                    results.append(result)
 
         return results
 
@@ -203,9 +776,79 @@ class WhisperEngine:
         if self.model:
             del self.model
             self.model = None
+            self.batched_model = None
+            self.fallback_model = None
+            self.batched_fallback = None
+            self.draft_model = None
+            if self.model_registry:
+                self.model_registry.clear()
+            self._batched_routes.clear()
             self.is_loaded = False
+            self.state = 'unloaded'
+            self.ready.clear()
             logger.info("模型已卸载")
 
+    def set_quality(self, beam_size: int, use_fallback: bool = False):
+        """
+        调整识别质量（负载控制用）
+
+        Args:
+            beam_size: beam search 大小（1 为贪心解码）
+            use_fallback: 是否使用备用小模型（未配置时忽略）
+        """
+        self.beam_size = beam_size
+        self.use_fallback = use_fallback and self.fallback_model_size is not None
+
+    def _throughput_rtf(self, process_time: float, audio_duration: float) -> float:
+        """
+        按吞吐量计算 RTF
+
+        num_workers > 1 时每次解码只用 1/num_workers 的 CPU 线程，多个解码并发进行，
+        单次耗时 / 时长约为吞吐量 RTF 的 num_workers 倍，按 worker 数折算。
+
+        Args:
+            process_time: 识别耗时（秒）
+            audio_duration: 音频时长（秒）
+
+        Returns:
+            RTF
+        """
+        if audio_duration <= 0:
+            return 0
+        return process_time / audio_duration / max(1, self.num_workers)
+
+    def _update_rtf(self, rtf: float):
+        """
+        更新近期 RTF 估计（供延迟预算预测解码耗时）
+
+        Args:
+            rtf: 本次识别的 RTF
+        """
+        with self._budget_lock:
+            self.rtf_estimate = rtf if not self.rtf_estimate else 0.7 * self.rtf_estimate + 0.3 * rtf
+
+    def get_status(self) -> Dict:
+        """
+        获取引擎就绪状态
+
+        Returns:
+            状态字典
+        """
+        status = {
+            'state': self.state,
+            'ready': self.ready.is_set(),
+            'load_time': self.load_time,
+            'warmup_time': self.warmup_time,
+            'rtf_estimate': self.rtf_estimate,
+            'budget_limited': self.budget_limited
+        }
+        extractor = getattr(self.model, 'feature_extractor', None)
+        if isinstance(extractor, IncrementalMelExtractor):
+            status['mel_cache'] = extractor.get_stats()
+        if self.model_registry:
+            status['model_routing'] = self.model_registry.get_stats()
+        return status
+
     def __enter__(self):
         """上下文管理器入口"""
         self.load_model()
@@ -217,17 +860,46 @@ class WhisperEngine:
 
 
 class WhisperStreamProcessor:
-    """Whisper 流式处理器（优化延迟）"""
+    """
+    Whisper 流式处理器（优化延迟）
+
+    支持两种模式：
+    - buffer: 缓冲满 buffer_duration 后整体识别，相邻窗口重叠 overlap_duration；
+      按词级时间戳丢弃上一窗口已输出的词，窗口末尾重叠区内的词留到下一窗口输出
+    - agreement: LocalAgreement 增量识别，每隔 min_chunk_duration 重新识别缓冲区，
+      只确认连续两次识别结果中一致的前缀；已确认的完整 Whisper 片段
+      按时间戳从缓冲区裁掉，输出 partial / final 事件
+    """
+
+    MODES = ('buffer', 'agreement')
 
-    def __init__(self, engine: WhisperEngine, buffer_duration: float = 3.0):
+    # 词级时间戳的误差余量（秒）
+    TIMESTAMP_MARGIN = 0.1
+
+    # log-mel 帧移（采样）；缓冲区裁剪对齐到帧边界，重叠部分的特征帧可以复用
+    FEATURE_HOP = 160
+
+    def __init__(self, engine: WhisperEngine, buffer_duration: float = 3.0,
+                 mode: str = 'buffer', min_chunk_duration: float = 1.0,
+                 max_buffer_duration: float = 15.0, prompt_chars: int = 200,
+                 overlap_duration: float = 0.5):
         """
         初始化流式处理器
 
         Args:
             engine: Whisper 引擎实例
-            buffer_duration: 缓冲时长（秒）
+            buffer_duration: 缓冲时长（秒，buffer 模式）
+            mode: 处理模式 (buffer / agreement)
+            min_chunk_duration: 两次识别之间的最少新音频（秒，agreement 模式）
+            max_buffer_duration: 缓冲区最大时长（秒，agreement 模式），超过时强制确认
+            prompt_chars: 作为提示的已确认文本长度（字符，agreement 模式）
+            overlap_duration: 相邻窗口的重叠时长（秒，buffer 模式）
         """
+        if mode not in self.MODES:
+            raise ValueError(f"无效的流式模式: {mode}")
+
         self.engine = engine
+        self.mode = mode
         self.buffer_duration = buffer_duration
         self.sample_rate = 16000
         self.buffer_size = int(buffer_duration * self.sample_rate)
@@ -238,7 +910,46 @@ class WhisperStreamProcessor:
         # 上次处理的文本（用于去重）
         self.last_text = ""
 
-        logger.info(f"流式处理器初始化: 缓冲时长={buffer_duration}s")
+        # 窗口重叠合并（buffer 模式）：缓冲区起点和已输出词的流中时间（秒）
+        self.overlap_duration = min(overlap_duration, buffer_duration / 2)
+        self._buffer_offset = 0.0
+        self._emitted: List[Tuple[float, float, str]] = []
+        self._emitted_end = 0.0
+
+        # 缓冲区起点的特征序号（采样，只增不减；清空缓冲区后跳到下一个帧边界之后，
+        # 让特征缓存识别出不连续）
+        self._feature_offset = 0
+
+        # LocalAgreement 参数
+        self.min_chunk_size = int(min_chunk_duration * self.sample_rate)
+        self.max_buffer_size = int(max_buffer_duration * self.sample_rate)
+        self.prompt_chars = prompt_chars
+
+        # 预分配缓冲区（超过 max_buffer_size 前会被裁剪或强制确认）
+        self._audio = np.empty(self.max_buffer_size + self.sample_rate * 5, dtype=np.float32)
+        self._length = 0
+        self._decoded_length = 0
+        self._offset = 0.0  # 缓冲区起点在流中的时间（秒）
+
+        # 词列表: (起始时间, 结束时间, 词)，时间为流中的绝对时间
+        self._hypothesis: List[Tuple[float, float, str]] = []
+        self._committed: List[Tuple[float, float, str]] = []
+        self._committed_end = 0.0
+        self._new_words: List[Tuple[float, float, str]] = []
+        self._context = ""
+        self._language: Optional[str] = None
+        self._language_probability = 0.0
+
+        self.stats = {
+            'decodes': 0,
+            'decode_time': 0.0,
+            'decoded_seconds': 0.0,
+            'partials': 0,
+            'finals': 0,
+            'overlap_dropped': 0
+        }
+
+        logger.info(f"流式处理器初始化: 模式={mode}, 缓冲时长={buffer_duration}s")
 
     def add_audio(self, audio: np.ndarray) -> Optional[Dict]:
         """
@@ -248,48 +959,421 @@ class WhisperStreamProcessor:
             audio: 音频数据
 
         Returns:
-            识别结果（如果有）
+            识别结果（如果有）；agreement 模式下为 partial / final 事件
         """
+        if self.mode == 'agreement':
+            return self._add_audio_agreement(audio)
+
         # 添加到缓冲区
         self.audio_buffer = np.concatenate([self.audio_buffer, audio])
 
         # 如果缓冲区足够大，进行识别
         if len(self.audio_buffer) >= self.buffer_size:
-            result = self.engine.transcribe(self.audio_buffer)
+            return self._decode_window(final=False)
 
-            # 去重（避免重复输出）
-            if result['text'] and result['text'] != self.last_text:
-                self.last_text = result['text']
+        return None
 
-                # 清空缓冲区（保留最后 0.5s 用于上下文）
-                overlap_size = int(0.5 * self.sample_rate)
-                self.audio_buffer = self.audio_buffer[-overlap_size:]
+    def _decode_window(self, final: bool) -> Optional[Dict]:
+        """
+        识别当前窗口，合并重叠区后输出新词，并保留下一窗口的重叠音频
 
-                return result
-            else:
-                # 清空缓冲区
-                self.audio_buffer = np.array([], dtype=np.float32)
+        Args:
+            final: 是否为最后一个窗口（全部输出，不保留重叠）
+
+        Returns:
+            合并后的识别结果，没有新文本时返回 None
+        """
+        window_end = self._buffer_offset + len(self.audio_buffer) / self.sample_rate
+        result = self.engine.transcribe(
+            self.audio_buffer,
+            word_timestamps=True,
+            stream_offset=self._feature_offset
+        )
+
+        # 重叠区内的词下一窗口还会完整识别一次，这里先不输出
+        limit = window_end if final else window_end - self.overlap_duration
+        # 下一窗口最多保留 3/4 窗口（保证前进）
+        keep_floor = window_end - self.buffer_duration * 0.75
+        result, held_start = self._merge_overlap(result, limit, keep_floor)
+
+        if final:
+            self._advance_features(len(self.audio_buffer), cleared=True)
+            self.audio_buffer = np.array([], dtype=np.float32)
+            self._buffer_offset = window_end
+        else:
+            # 在已输出的最后一个词和第一个未输出的词（或重叠区）之间的间隙切开，
+            # 尽量给未输出的词留出时间戳误差余量，又不切进已输出的词
+            keep_to = min(limit, held_start) if held_start is not None else limit
+            keep_from = keep_to - self.TIMESTAMP_MARGIN
+            if self._emitted_end < keep_to:
+                keep_from = max(keep_from, (self._emitted_end + keep_to) / 2)
+            keep_from = max(keep_from, keep_floor)
+            samples = int(round((keep_from - self._buffer_offset) * self.sample_rate))
+            samples = min(max(samples, 0), len(self.audio_buffer))
+            samples -= samples % self.FEATURE_HOP
+            self.audio_buffer = self.audio_buffer[samples:]
+            self._buffer_offset += samples / self.sample_rate
+            self._advance_features(samples, cleared=False)
+
+        if not result['text']:
+            return None
+
+        self.last_text = result['text']
+        self.stats['finals'] += 1
+        return result
+
+    def _advance_features(self, samples: int, cleared: bool):
+        """
+        缓冲区起点前移后更新特征序号
+
+        Args:
+            samples: 裁掉的采样数
+            cleared: 缓冲区是否已清空（下一段音频与之前不连续）
+        """
+        self._feature_offset += samples
+        if cleared:
+            hop = self.FEATURE_HOP
+            self._feature_offset = (self._feature_offset // hop + 2) * hop
+
+    def _merge_overlap(self, result: Dict, limit: float,
+                       keep_floor: float) -> Tuple[Dict, Optional[float]]:
+        """
+        按时间戳合并窗口重叠区
+
+        丢弃中点落在已输出范围内的词和结束时间紧挨已输出范围的词（窗口起点
+        截断的已输出词尾），再去掉开头与已输出文本末尾重复的词
+        （时间戳在两个窗口间有偏差时兜底）；结束时间超过 limit 的词暂不输出，
+        但下一窗口保留不到的词（起点早于 keep_floor）只要在窗口内结束就立即输出。
+        没有词级时间戳时按片段时间戳处理。
+
+        Args:
+            result: transcribe 结果（时间相对当前窗口）
+            limit: 本窗口可输出的最晚结束时间（流中时间，秒）
+            keep_floor: 下一窗口的最早起点（流中时间，秒）
+
+        Returns:
+            (更新后的结果, 第一个暂不输出的词的起始时间)
+        """
+        offset = self._buffer_offset
+        window_end = offset + len(self.audio_buffer) / self.sample_rate
+        kept_segments = []
+        words: List[Tuple[float, float, str]] = []
+        held_start = None
+
+        for seg in result['segments']:
+            seg_words = seg.get('words') or [
+                {'start': seg['start'], 'end': seg['end'], 'word': ' ' + seg['text']}
+            ]
+            candidates = [(offset + w['start'], offset + w['end'], w['word']) for w in seg_words]
+
+            fresh = [w for w in candidates
+                     if (w[0] + w[1]) / 2 > self._emitted_end
+                     and w[1] > self._emitted_end + self.TIMESTAMP_MARGIN / 2]
+            self.stats['overlap_dropped'] += len(candidates) - len(fresh)
+            if not words and fresh:
+                fresh, repeated = self._drop_repeated_head(fresh, self._emitted, self.TIMESTAMP_MARGIN)
+                self.stats['overlap_dropped'] += repeated
+
+            # 第一个超过 limit 的词及之后的词都留到下一窗口
+            ready = []
+            if held_start is None:
+                for w in fresh:
+                    complete = (w[0] - self.TIMESTAMP_MARGIN < keep_floor
+                                and w[1] < window_end - self.TIMESTAMP_MARGIN)
+                    if w[1] > limit and not complete:
+                        held_start = w[0]
+                        break
+                    ready.append(w)
+
+            if ready:
+                words.extend(ready)
+                kept_segments.append(dict(
+                    seg,
+                    start=ready[0][0],
+                    end=ready[-1][1],
+                    text=self._join(ready),
+                    words=[{'start': w[0], 'end': w[1], 'word': w[2]} for w in ready]
+                ))
+
+        if words:
+            self._emitted = (self._emitted + words)[-5:]
+            self._emitted_end = words[-1][1]
+
+        result['segments'] = kept_segments
+        result['text'] = " ".join(s['text'] for s in kept_segments).strip()
+        result['type'] = 'final'
+        result['start'] = words[0][0] if words else self._buffer_offset
+        result['end'] = words[-1][1] if words else self._buffer_offset
+        return result, held_start
+
+    @classmethod
+    def _drop_repeated_head(cls, words: List[Tuple[float, float, str]],
+                            tail: List[Tuple[float, float, str]],
+                            max_gap: float = 1.0) -> Tuple[List[Tuple[float, float, str]], int]:
+        """
+        去掉开头与已输出文本末尾重复的 1-5 个词
+
+        Args:
+            words: 新识别的词
+            tail: 已输出的词
+            max_gap: 新词起点与已输出末尾的最大间隔（秒），超过时视为真实重复
+
+        Returns:
+            (去重后的词, 去掉的词数)
+        """
+        if not words or not tail or abs(words[0][0] - tail[-1][1]) >= max_gap:
+            return words, 0
+
+        for n in range(min(5, len(words), len(tail)), 0, -1):
+            if [cls._normalize(w[2]) for w in tail[-n:]] == [cls._normalize(w[2]) for w in words[:n]]:
+                return words[n:], n
+        return words, 0
+
+    def _add_audio_agreement(self, audio: np.ndarray) -> Optional[Dict]:
+        """
+        agreement 模式：追加音频，新音频足够时重新识别并确认稳定前缀
+
+        Args:
+            audio: 音频数据
+
+        Returns:
+            partial / final 事件，没有变化时返回 None
+        """
+        end = self._length + len(audio)
+        if end > len(self._audio):
+            grown = np.empty(end * 2, dtype=np.float32)
+            grown[:self._length] = self._audio[:self._length]
+            self._audio = grown
+        self._audio[self._length:end] = audio
+        self._length = end
+
+        if self._length - self._decoded_length < self.min_chunk_size:
+            return None
+
+        segments = self._decode()
+        newly = self._commit_agreed()
+
+        if self._length > self.max_buffer_size:
+            # 缓冲过长仍没有完整片段可裁：全部确认
+            logger.debug("流式缓冲超过最大时长，强制确认")
+            return self._finalize(self._committed_end + 1e9, force=True)
+
+        # 已确认的完整片段按片段结束时间裁掉
+        cut = self._segment_cut(segments)
+        if cut is not None:
+            return self._finalize(cut)
+
+        if newly or self._hypothesis:
+            return self._make_event('partial', self._committed)
 
         return None
 
+    def _decode(self) -> List[Dict]:
+        """
+        识别当前缓冲区，更新假设词列表
+
+        Returns:
+            片段列表（时间为流中的绝对时间）
+        """
+        buffer = self._audio[:self._length]
+        prompt = self._context[-self.prompt_chars:] if self.prompt_chars else None
+        # 缓冲区只含上游 VAD 判定的语音，整段作为语音区间（跳过内置 VAD）
+        result = self.engine.transcribe(
+            buffer,
+            word_timestamps=True,
+            initial_prompt=prompt or None,
+            speech_regions=[(0.0, self._length / self.sample_rate)],
+            stream_offset=self._feature_offset
+        )
+        self._decoded_length = self._length
+
+        self.stats['decodes'] += 1
+        self.stats['decode_time'] += result.get('process_time', 0.0)
+        self.stats['decoded_seconds'] += self._length / self.sample_rate
+        if result.get('language') and result['language'] != 'unknown':
+            self._language = result['language']
+            self._language_probability = result.get('language_probability', 0.0)
+
+        segments = []
+        words = []
+        for seg in result['segments']:
+            segments.append({
+                'start': self._offset + seg['start'],
+                'end': self._offset + seg['end']
+            })
+            for w in seg.get('words', []):
+                words.append((self._offset + w['start'], self._offset + w['end'], w['word']))
+
+        # 去掉已确认时间之前的词
+        words = [w for w in words if w[0] > self._committed_end - 0.1]
+
+        # 去掉开头与已确认文本末尾重复的 1-5 个词
+        words, _ = self._drop_repeated_head(words, self._committed)
+
+        self._new_words = words
+        return segments
+
+    def _commit_agreed(self) -> List[Tuple[float, float, str]]:
+        """
+        确认本次与上次假设的最长公共前缀
+
+        Returns:
+            新确认的词
+        """
+        words = self._new_words
+        count = 0
+        limit = min(len(words), len(self._hypothesis))
+        while count < limit and self._normalize(words[count][2]) == self._normalize(self._hypothesis[count][2]):
+            count += 1
+
+        newly = words[:count]
+        self._hypothesis = words[count:]
+        if newly:
+            self._committed.extend(newly)
+            self._committed_end = newly[-1][1]
+        return newly
+
+    def _segment_cut(self, segments: List[Dict]) -> Optional[float]:
+        """
+        找到可以裁掉的位置：最后一个已完全确认的片段结束时间
+
+        Args:
+            segments: 片段列表
+
+        Returns:
+            裁剪时间点（秒），没有可裁的片段返回 None
+        """
+        if not self._committed:
+            return None
+
+        cut = None
+        for seg in segments:
+            if seg['end'] <= self._committed_end + 0.01:
+                cut = seg['end']
+        # 片段最后一个词尚未确认时不裁
+        if cut is not None and not any(w[1] <= cut + 0.01 for w in self._committed):
+            return None
+        return cut
+
+    def _finalize(self, cut: float, force: bool = False) -> Optional[Dict]:
+        """
+        输出 cut 之前已确认的词，并从缓冲区裁掉对应音频
+
+        Args:
+            cut: 裁剪时间点（秒）
+            force: 是否连同未确认的假设一起输出并清空缓冲区
+
+        Returns:
+            final 事件
+        """
+        if force:
+            self._committed.extend(self._hypothesis)
+            self._hypothesis = []
+            if self._committed:
+                self._committed_end = self._committed[-1][1]
+
+        final = [w for w in self._committed if w[1] <= cut + 0.01]
+        self._committed = [w for w in self._committed if w[1] > cut + 0.01]
+
+        # 裁剪缓冲区
+        if force:
+            samples = self._length
+        else:
+            samples = min(self._length, max(0, int((cut - self._offset) * self.sample_rate)))
+            samples -= samples % self.FEATURE_HOP
+        remaining = self._length - samples
+        if remaining:
+            self._audio[:remaining] = self._audio[samples:self._length]
+        self._length = remaining
+        self._decoded_length = max(0, self._decoded_length - samples)
+        self._offset += samples / self.sample_rate
+        self._advance_features(samples, cleared=not remaining)
+
+        if not final:
+            return None
+
+        event = self._make_event('final', final)
+        self._context = (self._context + event['text'] + ' ')[-self.prompt_chars * 2:]
+        return event
+
+    def _make_event(self, kind: str, words: List[Tuple[float, float, str]]) -> Dict:
+        """
+        生成流式事件
+
+        Args:
+            kind: partial / final
+            words: 事件的已确认词
+
+        Returns:
+            事件字典
+        """
+        self.stats['partials' if kind == 'partial' else 'finals'] += 1
+        return {
+            'type': kind,
+            'text': self._join(words),
+            'pending': self._join(self._hypothesis),
+            'start': words[0][0] if words else self._offset,
+            'end': words[-1][1] if words else self._offset,
+            'language': self._language or 'unknown',
+            'language_probability': self._language_probability
+        }
+
+    @staticmethod
+    def _join(words: List[Tuple[float, float, str]]) -> str:
+        """拼接词文本"""
+        return ''.join(w[2] for w in words).strip()
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        """比较用的词形式（忽略大小写和首尾标点）"""
+        return word.strip().strip('.,!?;:"\'，。！？；：、').lower()
+
     def flush(self) -> Optional[Dict]:
         """
         处理缓冲区中剩余的音频
 
         Returns:
-            识别结果（如果有）
+            识别结果（如果有）；agreement 模式下为 final 事件
         """
-        if len(self.audio_buffer) > self.sample_rate * 0.5:  # 至少 0.5s
-            result = self.engine.transcribe(self.audio_buffer)
-            self.audio_buffer = np.array([], dtype=np.float32)
-            return result
+        if self.mode == 'agreement':
+            if self._length > self._decoded_length and self._length > self.sample_rate * 0.3:
+                self._decode()
+                self._hypothesis = self._new_words
+            return self._finalize(self._committed_end + 1e9, force=True)
+
+        if len(self.audio_buffer) > self.sample_rate * 0.3:  # 至少 0.3s（可能含上一窗口留下的词）
+            return self._decode_window(final=True)
 
+        self._advance_features(len(self.audio_buffer), cleared=True)
+        self.audio_buffer = np.array([], dtype=np.float32)
         return None
 
+    def get_stats(self) -> Dict:
+        """
+        获取流式处理统计信息
+
+        Returns:
+            统计信息字典
+        """
+        stats = dict(self.stats)
+        stats['buffered_seconds'] = self._length / self.sample_rate
+        return stats
+
     def reset(self):
         """重置处理器状态"""
+        self._advance_features(self._length + len(self.audio_buffer), cleared=True)
         self.audio_buffer = np.array([], dtype=np.float32)
         self.last_text = ""
+        self._buffer_offset = 0.0
+        self._emitted = []
+        self._emitted_end = 0.0
+        self._length = 0
+        self._decoded_length = 0
+        self._offset = 0.0
+        self._hypothesis = []
+        self._committed = []
+        self._committed_end = 0.0
+        self._context = ""
         logger.debug("流式处理器已重置")
 
 
@@ -0,0 +1,246 @@
+"""
+ASR 工作线程池 - 多个线程并发识别语音片段，结果按提交顺序输出
+"""
+import os
+import time
+from queue import Queue, Empty
+from threading import Thread, Lock, Event
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+
+def partition_threads(pool_size: int, total_threads: int = 0) -> Dict:
+    """
+    按线程池大小划分 CPU 线程
+
+    Args:
+        pool_size: 并发识别数
+        total_threads: 可用 CPU 线程总数（0 为全部核心）
+
+    Returns:
+        WhisperModel 的 num_workers / cpu_threads 配置
+    """
+    total = total_threads or os.cpu_count() or 1
+    return {
+        'num_workers': pool_size,
+        'cpu_threads': max(1, total // pool_size)
+    }
+
+
+class ASRWorkerPool:
+    """
+    ASR 工作线程池
+
+    共用一个以 num_workers 加载的 WhisperModel（CTranslate2 为每个 worker
+    分配独立的计算线程），多个 Python 线程并发调用 transcribe。
+    片段按轮询分配给各线程，识别结果按提交顺序重排后放入 results 队列。
+    积压的多个片段可用 submit_batch 整批交给一个线程批量识别。
+    不需要识别的片段（如重复语音缓存命中）用 skip 占位，保持输出顺序。
+    """
+
+    def __init__(self, engine, size: int):
+        """
+        初始化线程池
+
+        Args:
+            engine: WhisperEngine 实例（模型以 num_workers=size 加载）
+            size: 线程数
+        """
+        self.engine = engine
+        self.size = size
+
+        # 每个线程一个输入队列（轮询分配）
+        self._inputs: List[Queue] = [Queue() for _ in range(size)]
+        self._threads: List[Thread] = []
+        self._running = Event()
+
+        # 重排缓冲: 序号 -> (音频, 结果, 上下文)
+        self._lock = Lock()
+        self._completed: Dict[int, Tuple[np.ndarray, Optional[Dict], object]] = {}
+        self._next_submit = 0
+        self._next_output = 0
+
+        # 按提交顺序输出的 (音频, 结果, 上下文)，skip 的片段结果为 None
+        self.results: Queue = Queue()
+
+        # 统计
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'max_reorder': 0,
+            'batches': 0,
+            'per_worker': [0] * size,
+            'busy_time': [0.0] * size
+        }
+
+        logger.info(f"ASR 线程池初始化: {size} 个线程")
+
+    def start(self):
+        """启动工作线程"""
+        if self._running.is_set():
+            return
+
+        self._running.set()
+        self._threads = [
+            Thread(target=self._worker, args=(i,), daemon=True, name=f"asr-worker-{i}")
+            for i in range(self.size)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """
+        停止工作线程
+
+        Args:
+            timeout: 每个线程的等待时间（秒）
+        """
+        self._running.clear()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, audio: np.ndarray, regions: Optional[List[Tuple[float, float]]] = None,
+               context=None) -> int:
+        """
+        提交一个语音片段
+
+        Args:
+            audio: 预处理后的音频
+            regions: 语音区间（秒）
+            context: 随结果原样返回的附加数据（如音频指纹）
+
+        Returns:
+            片段序号
+        """
+        return self.submit_batch([(audio, regions, context)])[0]
+
+    def submit_batch(self, items: List[Tuple[np.ndarray, Optional[List[Tuple[float, float]]], object]]) -> List[int]:
+        """
+        提交多个语音片段，由同一个线程一次批量识别（多于一个时）
+
+        Args:
+            items: [(音频, 语音区间, 附加数据)]
+
+        Returns:
+            各片段的序号（连续）
+        """
+        if not items:
+            return []
+
+        first = self._reserve(len(items))
+        seqs = list(range(first, first + len(items)))
+        audios, regions, contexts = (list(column) for column in zip(*items))
+        self._inputs[first % self.size].put((seqs, audios, regions, contexts))
+        return seqs
+
+    def skip(self, audio: np.ndarray, context=None) -> int:
+        """
+        占用一个序号但不识别（结果为 None），按顺序与识别结果一起输出
+
+        Args:
+            audio: 音频
+            context: 随结果返回的附加数据
+
+        Returns:
+            片段序号
+        """
+        seq = self._reserve()
+        self._complete(seq, audio, None, context)
+        return seq
+
+    def _reserve(self, count: int = 1) -> int:
+        """
+        分配连续的片段序号
+
+        Args:
+            count: 片段数
+
+        Returns:
+            第一个序号
+        """
+        with self._lock:
+            seq = self._next_submit
+            self._next_submit += count
+            self.stats['submitted'] += count
+        return seq
+
+    def pending(self) -> int:
+        """已提交但尚未输出的片段数"""
+        with self._lock:
+            return self._next_submit - self._next_output
+
+    def _worker(self, index: int):
+        """
+        工作线程：识别分配到的片段
+
+        Args:
+            index: 线程编号
+        """
+        inputs = self._inputs[index]
+
+        while self._running.is_set():
+            try:
+                seqs, audios, regions, contexts = inputs.get(timeout=0.5)
+            except Empty:
+                continue
+
+            start_time = time.time()
+            try:
+                if len(audios) > 1:
+                    results = self.engine.transcribe_batch(audios, speech_regions=regions)
+                else:
+                    results = [self.engine.transcribe(audios[0], speech_regions=regions[0])]
+            except Exception as e:
+                logger.error(f"ASR 线程 {index} 识别异常: {e}")
+                results = [
+                    {'text': '', 'segments': [], 'language': 'unknown', 'error': str(e)}
+                    for _ in audios
+                ]
+
+            self.stats['busy_time'][index] += time.time() - start_time
+            self.stats['per_worker'][index] += len(audios)
+            if len(audios) > 1:
+                self.stats['batches'] += 1
+            for seq, audio, result, context in zip(seqs, audios, results, contexts):
+                self._complete(seq, audio, result, context)
+
+    def _complete(self, seq: int, audio: np.ndarray, result: Optional[Dict], context=None):
+        """
+        记录完成的片段，并按顺序输出已连续完成的结果
+
+        Args:
+            seq: 片段序号
+            audio: 音频
+            result: 识别结果（skip 的片段为 None）
+            context: 附加数据
+        """
+        with self._lock:
+            self._completed[seq] = (audio, result, context)
+            self.stats['completed'] += 1
+            self.stats['max_reorder'] = max(self.stats['max_reorder'], len(self._completed))
+
+            while self._next_output in self._completed:
+                self.results.put(self._completed.pop(self._next_output))
+                self._next_output += 1
+
+    def get_stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            stats = {
+                'size': self.size,
+                'submitted': self.stats['submitted'],
+                'completed': self.stats['completed'],
+                'pending': self._next_submit - self._next_output,
+                'max_reorder': self.stats['max_reorder'],
+                'batches': self.stats['batches'],
+                'per_worker': list(self.stats['per_worker']),
+                'busy_time': list(self.stats['busy_time'])
+            }
+        return stats
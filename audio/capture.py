@@ -3,10 +3,13 @@
 """
 import sounddevice as sd
 import numpy as np
-from queue import Queue
-from typing import Optional, Callable
+from typing import Optional, Callable, Tuple, Dict
 from loguru import logger
 
+from .ring_buffer import AudioRingBuffer
+from .processor import StreamingResampler
+from .instrumentation import alloc_tracker
+
 
 class AudioCapture:
     """音频捕获器"""
@@ -20,16 +23,29 @@ class AudioCapture:
         """
         self.config = config
         self.device_name = config.get('device_name', 'CABLE Output')
-        self.sample_rate = config.get('sample_rate', 16000)
+        self.sample_rate = config.get('sample_rate', 16000)    # 输出采样率
+        self.capture_rate = config.get('capture_rate', None)  # 设备采样率，None 使用设备默认值
         self.channels = config.get('channels', 1)
         self.chunk_duration = config.get('chunk_duration', 0.3)
         self.buffer_size = config.get('buffer_size', 1024)
 
-        # 计算每个音频块的帧数
+        # 计算每个音频块的帧数（输出采样率）
         self.chunk_frames = int(self.sample_rate * self.chunk_duration)
 
-        # 音频队列
-        self.audio_queue = Queue(maxsize=100)
+        # 设备实际采样率及对应的块帧数（启动时确定）
+        self.device_rate = self.capture_rate or self.sample_rate
+        self.device_chunk_frames = self.chunk_frames
+
+        # 环形缓冲区（启动时按设备采样率一次性分配，回调中原地写入）
+        self.ring_buffer_chunks = config.get('ring_buffer_chunks', 100)
+        self.ring_buffer: Optional[AudioRingBuffer] = None
+
+        # 设备采样率与输出采样率不同时的流式重采样器
+        self.resampler: Optional[StreamingResampler] = None
+        self._output_index = 0
+
+        # 音频流状态异常计数（回调中不记录日志）
+        self.status_count = 0
 
         # 音频流
         self.stream: Optional[sd.InputStream] = None
@@ -69,6 +85,53 @@ class AudioCapture:
         logger.warning(f"未找到设备 '{self.device_name}'，使用默认输入设备")
         return None
 
+    def _resolve_device_rate(self, device_index: Optional[int]) -> int:
+        """
+        确定设备采样率（优先使用配置，否则使用设备默认采样率）
+
+        Args:
+            device_index: 设备索引（None 为默认输入设备）
+
+        Returns:
+            设备采样率
+        """
+        if self.capture_rate:
+            return int(self.capture_rate)
+
+        try:
+            device = sd.query_devices(device_index, 'input')
+            return int(device['default_samplerate'])
+        except Exception as e:
+            logger.warning(f"查询设备默认采样率失败: {e}，使用 {self.sample_rate}Hz")
+            return self.sample_rate
+
+    def _prepare_buffers(self, device_rate: int):
+        """
+        按设备采样率准备环形缓冲区和重采样器
+
+        Args:
+            device_rate: 设备采样率
+        """
+        self.device_rate = device_rate
+        self.device_chunk_frames = int(device_rate * self.chunk_duration)
+
+        capacity = self.device_chunk_frames * self.ring_buffer_chunks
+        if self.ring_buffer is None or self.ring_buffer.capacity != capacity:
+            self.ring_buffer = AudioRingBuffer(capacity=capacity, max_read=self.device_chunk_frames)
+        else:
+            self.ring_buffer.reset()
+
+        if device_rate != self.sample_rate:
+            if self.resampler is None or self.resampler.orig_rate != device_rate:
+                self.resampler = StreamingResampler(device_rate, self.sample_rate)
+            else:
+                self.resampler.reset()
+            logger.info(f"设备采样率 {device_rate}Hz，流式重采样到 {self.sample_rate}Hz")
+        else:
+            self.resampler = None
+
+        self._output_index = 0
+
     def _audio_callback(self, indata: np.ndarray, frames: int, time_info, status):
         """
         音频流回调函数
@@ -80,23 +143,18 @@ class AudioCapture:
             status: 状态标志
         """
         if status:
-            logger.warning(f"音频流状态: {status}")
-
-        # 转换为单声道
-        if indata.shape[1] > 1:
-            audio_data = np.mean(indata, axis=1)
-        else:
-            audio_data = indata[:, 0]
+            self.status_count += 1
 
-        # 放入队列
-        if not self.audio_queue.full():
-            self.audio_queue.put(audio_data.copy())
-        else:
-            logger.warning("音频队列已满，丢弃数据")
+        # 原地写入环形缓冲区（缓冲区满时丢弃并计数）
+        if self.ring_buffer.write(indata):
+            alloc_tracker.record('capture', frames * 4, copy=True)
 
-        # 调用外部回调
+        # 调用外部回调（单声道数据）
         if self.callback:
-            self.callback(audio_data)
+            if indata.shape[1] > 1:
+                self.callback(np.mean(indata, axis=1))
+            else:
+                self.callback(indata[:, 0])
 
     def start(self, callback: Optional[Callable] = None):
         """
@@ -113,11 +171,15 @@ class AudioCapture:
         device_index = self.find_device_index()
 
         try:
+            # 以设备采样率打开（避免驱动层重采样或不支持 16kHz 导致失败）
+            self._prepare_buffers(self._resolve_device_rate(device_index))
+            self.status_count = 0
+
             self.stream = sd.InputStream(
                 device=device_index,
                 channels=self.channels,
-                samplerate=self.sample_rate,
-                blocksize=self.chunk_frames,
+                samplerate=self.device_rate,
+                blocksize=self.device_chunk_frames,
                 callback=self._audio_callback,
                 dtype=np.float32
             )
@@ -141,11 +203,46 @@ class AudioCapture:
             self.stream = None
 
         self.is_capturing = False
+
+        if self.ring_buffer and (self.ring_buffer.overruns or self.status_count):
+            logger.warning(
+                f"音频缓冲溢出 {self.ring_buffer.overruns} 次 "
+                f"(丢弃 {self.ring_buffer.dropped_samples} 个样本), "
+                f"音频流状态异常 {self.status_count} 次"
+            )
+
         logger.info("音频捕获已停止")
 
+    def read_chunk(self, timeout: float = 1.0) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        从环形缓冲区读取音频块
+
+        设备采样率等于输出采样率时返回零拷贝只读视图，
+        否则返回流式重采样后的新数组（长度可能有 ±1 样本的相位抖动）。
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            (输出采样率下的起始样本索引, 音频数据)，超时返回 None
+        """
+        if self.ring_buffer is None:
+            return None
+
+        chunk = self.ring_buffer.read(self.device_chunk_frames, timeout=timeout)
+        if chunk is None or self.resampler is None:
+            return chunk
+
+        resampled = self.resampler.process(chunk[1])
+        start = self._output_index
+        self._output_index += len(resampled)
+        return start, resampled
+
     def get_audio_chunk(self, timeout: float = 1.0) -> Optional[np.ndarray]:
         """
-        从队列获取音频块
+        从环形缓冲区获取音频块
+
+        未重采样时返回只读视图，需要跨多次读取保留数据时请自行复制。
 
         Args:
             timeout: 超时时间（秒）
@@ -153,19 +250,42 @@ class AudioCapture:
         Returns:
             音频数据，超时返回 None
         """
-        try:
-            return self.audio_queue.get(timeout=timeout)
-        except:
+        chunk = self.read_chunk(timeout=timeout)
+        if chunk is None:
             return None
+        return chunk[1]
 
     def clear_queue(self):
-        """清空音频队列"""
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except:
-                break
-        logger.debug("音频队列已清空")
+        """丢弃环形缓冲区中未读取的音频"""
+        if self.ring_buffer is None:
+            return
+        self.ring_buffer.skip()
+        logger.debug("音频缓冲已清空")
+
+    def get_stats(self) -> Dict:
+        """
+        获取捕获统计信息
+
+        Returns:
+            统计信息字典
+        """
+        stats = {
+            'device_rate': self.device_rate,
+            'output_rate': self.sample_rate,
+            'status_count': self.status_count
+        }
+
+        if self.ring_buffer is None:
+            return stats
+
+        stats.update({
+            'samples_captured': self.ring_buffer.write_index,
+            'samples_read': self.ring_buffer.read_index,
+            'backlog_samples': self.ring_buffer.available(),
+            'overruns': self.ring_buffer.overruns,
+            'dropped_samples': self.ring_buffer.dropped_samples
+        })
+        return stats
 
     def __enter__(self):
         """上下文管理器入口"""
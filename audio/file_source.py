@@ -0,0 +1,267 @@
+"""
+文件回放音频源 - 从 WAV/FLAC/NumPy 文件回放音频，用于复现问题和性能测试
+"""
+import time
+import wave
+import numpy as np
+from math import gcd
+from pathlib import Path
+from threading import Event
+from scipy import signal
+from typing import Optional, Callable, Tuple, Dict
+from loguru import logger
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+
+class FileAudioSource:
+    """
+    文件回放音频源
+
+    与 AudioCapture 接口一致（start / get_audio_chunk / stop），
+    按 chunk_duration 切块输出，可按实时节奏回放或不限速回放。
+    """
+
+    PACING_MODES = ('realtime', 'fast')
+
+    def __init__(self, config: dict):
+        """
+        初始化文件回放源
+
+        Args:
+            config: 音频配置字典
+        """
+        self.config = config
+        self.file_path = config.get('file_path', '')
+        self.sample_rate = config.get('sample_rate', 16000)
+        self.chunk_duration = config.get('chunk_duration', 0.3)
+        self.pacing = config.get('pacing', 'realtime')  # realtime / fast
+        self.loop = config.get('loop', False)
+
+        if self.pacing not in self.PACING_MODES:
+            raise ValueError(f"无效的回放节奏: {self.pacing}")
+
+        # 计算每个音频块的帧数
+        self.chunk_frames = int(self.sample_rate * self.chunk_duration)
+
+        # 音频数据（start 时加载）
+        self.audio: Optional[np.ndarray] = None
+        self.total_chunks = 0
+
+        # 回放状态
+        self.is_capturing = False
+        self.finished = Event()
+        self._chunk_index = 0
+        self._start_time = 0.0
+
+        # 回调函数
+        self.callback: Optional[Callable] = None
+
+        logger.info(f"文件回放源初始化: 文件={self.file_path}, 节奏={self.pacing}")
+
+    def _read_file(self) -> Tuple[np.ndarray, int]:
+        """
+        读取音频文件
+
+        Returns:
+            (音频数据 (frames, channels) 或 (frames,), 文件采样率)
+        """
+        path = Path(self.file_path)
+        suffix = path.suffix.lower()
+
+        if suffix == '.npy':
+            return np.load(path), self.config.get('file_sample_rate', self.sample_rate)
+
+        if suffix == '.npz':
+            with np.load(path) as data:
+                rate = int(data['sample_rate']) if 'sample_rate' in data else self.sample_rate
+                return data['audio'], rate
+
+        if sf is not None:
+            data, rate = sf.read(str(path), dtype='float32', always_2d=True)
+            return data, rate
+
+        if suffix == '.wav':
+            with wave.open(str(path), 'rb') as wf:
+                if wf.getsampwidth() != 2:
+                    raise ValueError("未安装 soundfile，仅支持 16-bit PCM WAV")
+                rate = wf.getframerate()
+                channels = wf.getnchannels()
+                raw = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            return raw.reshape(-1, channels).astype(np.float32) / 32768.0, rate
+
+        raise ValueError(f"不支持的音频格式: {suffix}（FLAC 需要安装 soundfile）")
+
+    def load(self):
+        """
+        加载音频文件并转换为 16kHz 单声道 float32
+        """
+        data, rate = self._read_file()
+
+        # 转换为单声道
+        if data.ndim > 1:
+            data = np.mean(data, axis=1) if data.shape[1] > 1 else data[:, 0]
+
+        # 重采样到目标采样率
+        if rate != self.sample_rate:
+            g = gcd(int(rate), int(self.sample_rate))
+            data = signal.resample_poly(data, self.sample_rate // g, int(rate) // g)
+            logger.info(f"回放文件重采样: {rate}Hz -> {self.sample_rate}Hz")
+
+        # 末尾补零到整块
+        remainder = len(data) % self.chunk_frames
+        if remainder:
+            data = np.pad(data, (0, self.chunk_frames - remainder))
+
+        self.audio = np.ascontiguousarray(data, dtype=np.float32)
+        self.audio.flags.writeable = False
+        self.total_chunks = len(self.audio) // self.chunk_frames
+
+        logger.info(f"回放文件已加载: 时长={len(self.audio)/self.sample_rate:.2f}s, 块数={self.total_chunks}")
+
+    def start(self, callback: Optional[Callable] = None):
+        """
+        开始回放
+
+        Args:
+            callback: 音频数据回调函数
+        """
+        if self.is_capturing:
+            logger.warning("文件回放已在运行")
+            return
+
+        self.callback = callback
+
+        if self.audio is None:
+            self.load()
+
+        self._chunk_index = 0
+        self._start_time = time.monotonic()
+        self.finished.clear()
+        self.is_capturing = True
+        logger.info("文件回放已启动")
+
+    def stop(self):
+        """停止回放"""
+        if not self.is_capturing:
+            return
+
+        self.is_capturing = False
+        logger.info(f"文件回放已停止: 已输出 {self._chunk_index}/{self.total_chunks} 块")
+
+    def read_chunk(self, timeout: float = 1.0) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        读取下一个音频块（零拷贝）
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            (起始样本索引, 只读音频视图)，超时或回放结束返回 None
+        """
+        if not self.is_capturing:
+            return None
+
+        if self._chunk_index >= self.total_chunks:
+            if not self.loop:
+                # 回放结束，模拟静默设备
+                self.finished.set()
+                time.sleep(timeout)
+                return None
+            self._chunk_index = 0
+            self._start_time = time.monotonic()
+
+        if self.pacing == 'realtime':
+            # 块在"录制完成"时刻才可读取
+            due = self._start_time + (self._chunk_index + 1) * self.chunk_duration
+            wait = due - time.monotonic()
+            if wait > timeout:
+                time.sleep(timeout)
+                return None
+            if wait > 0:
+                time.sleep(wait)
+
+        start = self._chunk_index * self.chunk_frames
+        chunk = self.audio[start:start + self.chunk_frames]
+        self._chunk_index += 1
+
+        if self.callback:
+            self.callback(chunk)
+
+        return start, chunk
+
+    def get_audio_chunk(self, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        获取下一个音频块
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            音频数据，超时或回放结束返回 None
+        """
+        chunk = self.read_chunk(timeout=timeout)
+        if chunk is None:
+            return None
+        return chunk[1]
+
+    def clear_queue(self):
+        """文件回放无缓冲，保持接口一致"""
+        pass
+
+    def get_stats(self) -> Dict:
+        """
+        获取回放统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            'file_path': self.file_path,
+            'pacing': self.pacing,
+            'chunks_read': self._chunk_index,
+            'total_chunks': self.total_chunks,
+            'finished': self.finished.is_set()
+        }
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.stop()
+
+
+if __name__ == "__main__":
+    # 测试代码
+    import sys
+
+    logger.add("file_source.log", rotation="10 MB")
+
+    config = {
+        'file_path': sys.argv[1] if len(sys.argv) > 1 else 'test.wav',
+        'sample_rate': 16000,
+        'chunk_duration': 0.3,
+        'pacing': 'fast'
+    }
+
+    source = FileAudioSource(config)
+    source.start()
+
+    start_time = time.time()
+    count = 0
+    while True:
+        audio_chunk = source.get_audio_chunk(timeout=0.1)
+        if audio_chunk is None and source.finished.is_set():
+            break
+        if audio_chunk is not None:
+            count += 1
+
+    elapsed = time.time() - start_time
+    logger.info(f"回放完成: {count} 块, 耗时 {elapsed:.3f}s")
+    source.stop()
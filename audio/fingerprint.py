@@ -0,0 +1,361 @@
+"""
+声学指纹模块 - 识别重复播放的游戏语音（NPC 台词、播报、无线电），跳过识别和翻译
+"""
+import json
+import os
+from collections import Counter, OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy.ndimage import maximum_filter
+from loguru import logger
+
+
+# 哈希中帧差所占的低位
+DELTA_MASK = 0x3F
+
+
+class Fingerprint:
+    """一段音频的指纹：频谱峰值对的哈希及其锚点帧号"""
+
+    __slots__ = ('hashes', 'times', 'duration')
+
+    def __init__(self, hashes: np.ndarray, times: np.ndarray, duration: float):
+        """
+        Args:
+            hashes: 峰值对哈希 (uint32)
+            times: 锚点所在帧号 (int32)
+            duration: 音频时长（秒）
+        """
+        self.hashes = hashes
+        self.times = times
+        self.duration = duration
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+def compute_fingerprint(audio: np.ndarray, sample_rate: int = 16000,
+                        n_fft: int = 1024, hop: int = 256,
+                        peaks_per_second: int = 20, fan_out: int = 5,
+                        max_delta: int = DELTA_MASK) -> Fingerprint:
+    """
+    计算频谱峰值哈希指纹
+
+    在对数幅度谱上找局部最大值（按强度保留每秒 peaks_per_second 个），
+    每个峰值与其后 fan_out 个峰值配对，哈希为 (频率1, 频率2, 帧差)，帧差在低 6 位。
+    哈希只依赖峰值的相对位置，与片段起点和音量无关。
+
+    Args:
+        audio: 音频数据 (float32)
+        sample_rate: 采样率
+        n_fft: FFT 长度
+        hop: 帧移
+        peaks_per_second: 每秒保留的峰值数
+        fan_out: 每个锚点配对的峰值数
+        max_delta: 配对的最大帧差
+
+    Returns:
+        指纹
+    """
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    duration = len(audio) / sample_rate
+    empty = Fingerprint(np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int32), duration)
+    if len(audio) < n_fft * 4:
+        return empty
+
+    # 对数幅度谱 (帧, 频率)，只用 250-4000Hz（语音主要能量，避开低频轰鸣）
+    n_frames = 1 + (len(audio) - n_fft) // hop
+    frames = np.lib.stride_tricks.as_strided(
+        audio, shape=(n_frames, n_fft), strides=(audio.strides[0] * hop, audio.strides[0])
+    )
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(n_fft).astype(np.float32), axis=1))
+    low = int(250 * n_fft / sample_rate)
+    high = int(4000 * n_fft / sample_rate)
+    spectrum = np.log(spectrum[:, low:high] + 1e-6)
+
+    # 局部最大值且高于平均强度
+    local_max = maximum_filter(spectrum, size=(7, 9)) == spectrum
+    candidates = np.argwhere(local_max & (spectrum > spectrum.mean()))
+    if len(candidates) < 2:
+        return empty
+
+    limit = max(2, int(peaks_per_second * duration))
+    if len(candidates) > limit:
+        strength = spectrum[candidates[:, 0], candidates[:, 1]]
+        candidates = candidates[np.argsort(strength)[-limit:]]
+    peaks = candidates[np.lexsort((candidates[:, 1], candidates[:, 0]))]
+
+    hashes = []
+    times = []
+    for i in range(len(peaks)):
+        t1, f1 = peaks[i]
+        for t2, f2 in peaks[i + 1:i + 1 + fan_out]:
+            delta = t2 - t1
+            if delta > max_delta:
+                break
+            hashes.append((int(f1) << 16) | (int(f2) << 6) | int(delta))
+            times.append(t1)
+
+    return Fingerprint(
+        np.array(hashes, dtype=np.uint32),
+        np.array(times, dtype=np.int32),
+        duration
+    )
+
+
+class FingerprintCache:
+    """
+    重复语音缓存
+
+    以指纹为键缓存 (识别文本, 语言, 翻译)。查询时按哈希倒排索引投票，
+    同一条目在同一时间偏移（±1 帧）上命中的哈希数除以两者中较多的哈希数
+    作为匹配分数，超过 threshold 即视为同一条语音。
+    条目数超过 max_entries 时按最近最少使用淘汰；配置 path 时保存到磁盘。
+    """
+
+    def __init__(self, config: dict, target_language: str = ''):
+        """
+        初始化缓存
+
+        Args:
+            config: 指纹缓存配置字典
+            target_language: 当前翻译目标语言（与磁盘缓存不同时丢弃其中的翻译）
+        """
+        self.threshold = config.get('threshold', 0.3)
+        self.min_hashes = config.get('min_hashes', 20)
+        self.max_duration_ratio = config.get('max_duration_ratio', 1.25)
+        self.max_entries = config.get('max_entries', 500)
+        self.path = config.get('path')
+        self.target_language = target_language
+
+        # 条目: id -> {'hashes', 'times', 'duration', 'text', 'language', ...}
+        self._entries: OrderedDict = OrderedDict()
+        # 倒排索引: 哈希 -> {条目 id}
+        self._index: Dict[int, set] = {}
+        self._next_id = 0
+        self._lock = Lock()
+
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'misses': 0,
+            'skipped': 0,
+            'added': 0,
+            'evicted': 0
+        }
+
+        if self.path:
+            self.load()
+
+        logger.info(
+            f"声学指纹缓存初始化: 阈值={self.threshold}, 最大条目={self.max_entries}, "
+            f"已有 {len(self._entries)} 条"
+        )
+
+    def lookup(self, audio: np.ndarray) -> Tuple[Optional[Dict], Fingerprint]:
+        """
+        查询音频是否为缓存过的语音
+
+        Args:
+            audio: 音频数据 (float32, 16kHz)
+
+        Returns:
+            (命中的条目或 None, 音频指纹)；指纹可在识别后传给 add
+        """
+        fingerprint = compute_fingerprint(audio)
+
+        with self._lock:
+            self.stats['lookups'] += 1
+            if len(fingerprint) < self.min_hashes:
+                self.stats['skipped'] += 1
+                return None, fingerprint
+
+            entry_id, score = self._best_match(fingerprint)
+            if entry_id is None or score < self.threshold:
+                self.stats['misses'] += 1
+                return None, fingerprint
+
+            self._entries.move_to_end(entry_id)
+            entry = self._entries[entry_id]
+            entry['hits'] += 1
+            self.stats['hits'] += 1
+
+        logger.debug(f"指纹命中 (分数 {score:.2f}): {entry['text'][:50]}")
+        return entry, fingerprint
+
+    def _best_match(self, fingerprint: Fingerprint) -> Tuple[Optional[int], float]:
+        """
+        按时间偏移投票找出最佳匹配条目（持有锁时调用）
+
+        Args:
+            fingerprint: 查询指纹
+
+        Returns:
+            (条目 id, 匹配分数)
+        """
+        votes: Counter = Counter()
+        for h, t in zip(fingerprint.hashes.tolist(), fingerprint.times.tolist()):
+            # 片段起点不在帧边界上时峰值帧差可能 ±1，相邻帧差也算命中
+            delta = h & DELTA_MASK
+            variants = [h]
+            if delta > 0:
+                variants.append(h - 1)
+            if delta < DELTA_MASK:
+                variants.append(h + 1)
+
+            matched = set()
+            for variant in variants:
+                for entry_id in self._index.get(variant, ()):
+                    for entry_time in self._entries[entry_id]['table'][variant]:
+                        matched.add((entry_id, entry_time - t))
+            for key in matched:
+                votes[key] += 1
+
+        best_id, best_votes = None, 0
+        for (entry_id, offset), count in votes.items():
+            count += votes.get((entry_id, offset - 1), 0) + votes.get((entry_id, offset + 1), 0)
+            if count > best_votes:
+                best_id, best_votes = entry_id, count
+
+        if best_id is None:
+            return None, 0.0
+
+        entry = self._entries[best_id]
+        shorter, longer = sorted((entry['duration'], fingerprint.duration))
+        if longer > shorter * self.max_duration_ratio:
+            return None, 0.0
+        return best_id, best_votes / max(len(fingerprint), entry['count'])
+
+    def add(self, fingerprint: Fingerprint, text: str, language: str,
+            language_probability: float = 0.0, translation: Optional[str] = None):
+        """
+        缓存一条识别结果
+
+        Args:
+            fingerprint: lookup 返回的指纹
+            text: 识别文本
+            language: 语言
+            language_probability: 语言置信度
+            translation: 翻译结果
+        """
+        if len(fingerprint) < self.min_hashes or not text:
+            return
+
+        table: Dict[int, List[int]] = {}
+        for h, t in zip(fingerprint.hashes.tolist(), fingerprint.times.tolist()):
+            table.setdefault(h, []).append(t)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                'table': table,
+                'count': len(fingerprint),
+                'duration': fingerprint.duration,
+                'text': text,
+                'language': language,
+                'language_probability': language_probability,
+                'translation': translation,
+                'hits': 0
+            }
+            for h in table:
+                self._index.setdefault(h, set()).add(entry_id)
+            self.stats['added'] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def update_translation(self, entry: Dict, translation: Optional[str]):
+        """
+        更新条目的翻译（翻译目标语言变化后重新翻译时调用）
+
+        Args:
+            entry: lookup 返回的条目
+            translation: 翻译结果
+        """
+        with self._lock:
+            entry['translation'] = translation
+
+    def _evict(self):
+        """淘汰最近最少使用的条目（持有锁时调用）"""
+        entry_id, entry = self._entries.popitem(last=False)
+        for h in entry['table']:
+            ids = self._index.get(h)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[h]
+        self.stats['evicted'] += 1
+
+    def load(self):
+        """从磁盘加载缓存"""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"加载指纹缓存失败: {e}")
+            return
+
+        keep_translation = data.get('target_language') == self.target_language
+        for item in data.get('entries', [])[-self.max_entries:]:
+            fingerprint = Fingerprint(
+                np.array(item['hashes'], dtype=np.uint32),
+                np.array(item['times'], dtype=np.int32),
+                item['duration']
+            )
+            self.add(
+                fingerprint,
+                item['text'],
+                item['language'],
+                item.get('language_probability', 0.0),
+                item.get('translation') if keep_translation else None
+            )
+        self.stats['added'] = 0
+        logger.info(f"已加载指纹缓存: {len(self._entries)} 条")
+
+    def save(self):
+        """保存缓存到磁盘（按最近使用顺序）"""
+        if not self.path:
+            return
+
+        with self._lock:
+            entries = []
+            for entry in self._entries.values():
+                pairs = [(h, t) for h, times in entry['table'].items() for t in times]
+                entries.append({
+                    'hashes': [h for h, _ in pairs],
+                    'times': [t for _, t in pairs],
+                    'duration': entry['duration'],
+                    'text': entry['text'],
+                    'language': entry['language'],
+                    'language_probability': entry['language_probability'],
+                    'translation': entry['translation']
+                })
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'target_language': self.target_language, 'entries': entries}, f, ensure_ascii=False)
+            logger.info(f"指纹缓存已保存: {len(entries)} 条 -> {self.path}")
+        except Exception as e:
+            logger.error(f"保存指纹缓存失败: {e}")
+
+    def get_stats(self) -> Dict:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        checked = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / checked if checked else 0.0
+        return stats
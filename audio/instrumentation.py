@@ -0,0 +1,103 @@
+"""
+内存分配统计模块 - 统计音频链路上的数组分配和复制（性能分析用）
+"""
+from threading import Lock
+from typing import Dict
+
+
+class AllocationTracker:
+    """
+    按环节统计数组分配次数、分配字节数和复制字节数
+
+    默认关闭，关闭时 record 只做一次布尔判断。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = Lock()
+        self.reset()
+
+    def enable(self, enabled: bool = True):
+        """
+        开启/关闭统计
+
+        Args:
+            enabled: 是否开启
+        """
+        self.enabled = enabled
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self.stages: Dict[str, Dict[str, int]] = {}
+            self.audio_seconds = 0.0
+
+    def record(self, stage: str, nbytes: int, copy: bool = False):
+        """
+        记录一次数组分配或复制
+
+        Args:
+            stage: 环节名称
+            nbytes: 字节数
+            copy: 是否为复制（否则为新分配）
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = {
+                    'allocations': 0, 'allocated_bytes': 0,
+                    'copies': 0, 'copied_bytes': 0
+                }
+            if copy:
+                entry['copies'] += 1
+                entry['copied_bytes'] += nbytes
+            else:
+                entry['allocations'] += 1
+                entry['allocated_bytes'] += nbytes
+
+    def add_audio(self, seconds: float):
+        """
+        累计已捕获的音频时长（用于换算每秒音频的开销）
+
+        Args:
+            seconds: 音频时长（秒）
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.audio_seconds += seconds
+
+    def report(self) -> Dict:
+        """
+        生成统计报告
+
+        Returns:
+            各环节统计及每秒音频的分配次数/字节数
+        """
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self.stages.items()}
+            seconds = self.audio_seconds
+
+        totals = {'allocations': 0, 'allocated_bytes': 0, 'copies': 0, 'copied_bytes': 0}
+        for entry in stages.values():
+            for key in totals:
+                totals[key] += entry[key]
+
+        per_second = {}
+        if seconds > 0:
+            per_second = {key: value / seconds for key, value in totals.items()}
+
+        return {
+            'audio_seconds': seconds,
+            'stages': stages,
+            'totals': totals,
+            'per_audio_second': per_second
+        }
+
+
+# 全局统计实例（由 performance.enable_profiling 开启）
+alloc_tracker = AllocationTracker()
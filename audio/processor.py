@@ -2,10 +2,152 @@
 音频预处理模块 - 音频增强和标准化
 """
 import numpy as np
+from math import gcd
 from scipy import signal
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from loguru import logger
 
+from .instrumentation import alloc_tracker
+
+
+class StreamingFilter:
+    """带状态的流式 IIR 滤波器（二阶节形式）"""
+
+    def __init__(self, sos: np.ndarray):
+        """
+        初始化流式滤波器
+
+        Args:
+            sos: 二阶节系数 (n_sections, 6)
+        """
+        self.sos = np.asarray(sos, dtype=np.float32)
+        self.zi = np.zeros((self.sos.shape[0], 2), dtype=np.float32)
+
+    def process(self, audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        滤波一个音频块，滤波状态延续到下一块（因果滤波，无块边界瞬态）
+
+        Args:
+            audio: 输入音频 (float32)
+            out: 输出缓冲（可与输入相同）
+
+        Returns:
+            滤波后的音频
+        """
+        if len(self.sos) == 0:
+            filtered = audio
+        else:
+            filtered, self.zi = signal.sosfilt(self.sos, audio, zi=self.zi)
+            alloc_tracker.record('filter', filtered.nbytes)
+
+        if out is None or out is filtered:
+            return filtered
+
+        np.copyto(out, filtered)
+        alloc_tracker.record('filter', out.nbytes, copy=True)
+        return out
+
+    def reset(self):
+        """清空滤波状态"""
+        self.zi.fill(0.0)
+
+
+class StreamingResampler:
+    """
+    带状态的流式多相重采样器（与 resample_poly 相同的 Kaiser 窗 FIR）
+
+    每块用 upfirdn 计算，跨块保留滤波所需的输入历史，块边界无失真；
+    输出已按滤波器群延迟对齐。
+    """
+
+    def __init__(self, orig_rate: int, target_rate: int):
+        """
+        初始化重采样器
+
+        Args:
+            orig_rate: 输入采样率
+            target_rate: 输出采样率
+        """
+        g = gcd(int(orig_rate), int(target_rate))
+        self.orig_rate = orig_rate
+        self.target_rate = target_rate
+        self.up = int(target_rate) // g
+        self.down = int(orig_rate) // g
+
+        # 抗混叠低通 FIR（参数与 scipy.signal.resample_poly 一致）
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+        self.taps = taps.astype(np.float32)
+
+        # 每个输出样本依赖的输入样本数
+        self.num_inputs = -(-len(self.taps) // self.up)
+
+        # 群延迟（输出样本数），用于对齐
+        self.delay = half_len // self.down
+
+        self.reset()
+
+    def _history_start(self, in_count: int) -> int:
+        """
+        计算需保留历史的起点（对齐到 down 的整数倍，使输出相位连续）
+
+        Args:
+            in_count: 已输入样本总数
+
+        Returns:
+            历史起点（绝对输入索引，可为负）
+        """
+        return ((in_count - (self.num_inputs - 1)) // self.down) * self.down
+
+    def reset(self):
+        """清空滤波历史"""
+        self._base = self._history_start(0)
+        self._history = np.zeros(-self._base, dtype=np.float32)
+        self._in_count = 0
+        self._out_count = 0
+        self._skip = self.delay
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        重采样一个音频块
+
+        Args:
+            audio: 输入音频块 (float32)
+
+        Returns:
+            重采样后的音频 (float32)，长度随相位在 ±1 样本内变化
+        """
+        if self.up == self.down:
+            return audio
+
+        buffer = np.concatenate([self._history, audio.astype(np.float32, copy=False)])
+        base = self._base
+        self._in_count += len(audio)
+
+        # 当前可计算的输出样本：m * down <= in_count * up - 1
+        last = (self._in_count * self.up - 1) // self.down
+        first = self._out_count
+        self._out_count = last + 1
+
+        # upfirdn 输出 k 对应绝对输出索引 k + base * up / down
+        filtered = signal.upfirdn(self.taps, buffer, self.up, self.down)
+        offset = base * self.up // self.down
+        output = filtered[first - offset:last + 1 - offset]
+        alloc_tracker.record('resample', filtered.nbytes + buffer.nbytes)
+
+        # 保留下一块所需的历史
+        self._base = self._history_start(self._in_count)
+        self._history = buffer[self._base - base:].copy()
+
+        # 丢弃群延迟对应的起始输出
+        if self._skip:
+            skipped = min(self._skip, len(output))
+            output = output[skipped:]
+            self._skip -= skipped
+
+        return output
+
 
 class AudioProcessor:
     """音频预处理器"""
@@ -18,24 +160,93 @@ class AudioProcessor:
             sample_rate: 音频采样率
         """
         self.sample_rate = sample_rate
+
+        # 滤波器系数缓存（按类型和截止频率）
+        self._sos_cache: Dict[Tuple, np.ndarray] = {}
+
+        # 流式带通滤波器（首次使用时创建）
+        self.stream_filter: Optional[StreamingFilter] = None
+
         logger.info(f"音频处理器初始化: 采样率={sample_rate}Hz")
 
-    def normalize(self, audio: np.ndarray, target_level: float = -20.0) -> np.ndarray:
+    def design_filter(self, btype: str, cutoff) -> np.ndarray:
+        """
+        设计 4 阶 Butterworth 滤波器（二阶节形式，float32，结果缓存）
+
+        截止频率达到奈奎斯特频率时，带通退化为高通，低通退化为直通。
+
+        Args:
+            btype: 滤波器类型 (high/low/band)
+            cutoff: 截止频率 (Hz)，带通为 (低, 高)
+
+        Returns:
+            二阶节系数，直通时返回空数组
+        """
+        key = (btype, cutoff if btype != 'band' else tuple(cutoff))
+        sos = self._sos_cache.get(key)
+        if sos is not None:
+            return sos
+
+        nyquist = self.sample_rate / 2
+
+        if btype == 'band':
+            low, high = cutoff
+            if high >= nyquist:
+                sos = self.design_filter('high', low)
+            else:
+                sos = signal.butter(4, [low / nyquist, high / nyquist], btype='band', output='sos')
+        elif btype == 'low' and cutoff >= nyquist:
+            sos = np.empty((0, 6))
+        else:
+            sos = signal.butter(4, cutoff / nyquist, btype=btype, output='sos')
+
+        # float32 系数使滤波全程保持 float32
+        sos = sos.astype(np.float32)
+        self._sos_cache[key] = sos
+        return sos
+
+    def _filtfilt(self, audio: np.ndarray, sos: np.ndarray) -> np.ndarray:
+        """
+        零相位滤波（整段音频），保持 float32
+
+        Args:
+            audio: 输入音频
+            sos: 二阶节系数
+
+        Returns:
+            滤波后的音频
+        """
+        if len(sos) == 0:
+            return audio
+
+        filtered = signal.sosfiltfilt(sos, audio)
+        alloc_tracker.record('filter', filtered.nbytes)
+        return filtered.astype(np.float32, copy=False)
+
+    def normalize(self, audio: np.ndarray, target_level: float = -20.0,
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         标准化音频音量
 
         Args:
             audio: 输入音频
             target_level: 目标音量 (dB)
+            out: 输出缓冲（可与输入相同）
 
         Returns:
             标准化后的音频
         """
-        # 计算当前 RMS
-        rms = np.sqrt(np.mean(audio ** 2))
+        if len(audio) == 0:
+            return audio
+
+        # 计算当前 RMS（点积避免平方临时数组）
+        rms = np.sqrt(np.dot(audio, audio) / len(audio))
 
         if rms < 1e-6:
-            return audio
+            if out is None or out is audio:
+                return audio
+            np.copyto(out, audio)
+            return out
 
         # 计算当前音量 (dB)
         current_level = 20 * np.log10(rms)
@@ -45,26 +256,27 @@ class AudioProcessor:
         gain = 10 ** (gain_db / 20)
 
         # 应用增益
-        normalized = audio * gain
+        normalized = np.multiply(audio, gain, out=out)
 
         # 防止削波
         max_val = np.max(np.abs(normalized))
         if max_val > 1.0:
-            normalized = normalized / max_val * 0.95
+            normalized *= 0.95 / max_val
 
         return normalized
 
-    def remove_dc_offset(self, audio: np.ndarray) -> np.ndarray:
+    def remove_dc_offset(self, audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         移除直流偏移
 
         Args:
             audio: 输入音频
+            out: 输出缓冲（可与输入相同）
 
         Returns:
             处理后的音频
         """
-        return audio - np.mean(audio)
+        return np.subtract(audio, np.mean(audio), out=out)
 
     def apply_highpass_filter(self, audio: np.ndarray, cutoff: float = 80.0) -> np.ndarray:
         """
@@ -77,16 +289,7 @@ class AudioProcessor:
         Returns:
             滤波后的音频
         """
-        nyquist = self.sample_rate / 2
-        normalized_cutoff = cutoff / nyquist
-
-        # 设计 Butterworth 高通滤波器
-        b, a = signal.butter(4, normalized_cutoff, btype='high')
-
-        # 应用滤波器
-        filtered = signal.filtfilt(b, a, audio)
-
-        return filtered
+        return self._filtfilt(audio, self.design_filter('high', cutoff))
 
     def apply_lowpass_filter(self, audio: np.ndarray, cutoff: float = 8000.0) -> np.ndarray:
         """
@@ -99,16 +302,7 @@ class AudioProcessor:
         Returns:
             滤波后的音频
         """
-        nyquist = self.sample_rate / 2
-        normalized_cutoff = cutoff / nyquist
-
-        # 设计 Butterworth 低通滤波器
-        b, a = signal.butter(4, normalized_cutoff, btype='low')
-
-        # 应用滤波器
-        filtered = signal.filtfilt(b, a, audio)
-
-        return filtered
+        return self._filtfilt(audio, self.design_filter('low', cutoff))
 
     def apply_bandpass_filter(self, audio: np.ndarray,
                              low_cutoff: float = 80.0,
@@ -124,17 +318,36 @@ class AudioProcessor:
         Returns:
             滤波后的音频
         """
-        nyquist = self.sample_rate / 2
-        low = low_cutoff / nyquist
-        high = high_cutoff / nyquist
+        return self._filtfilt(audio, self.design_filter('band', (low_cutoff, high_cutoff)))
 
-        # 设计 Butterworth 带通滤波器
-        b, a = signal.butter(4, [low, high], btype='band')
+    def filter_stream(self, audio: np.ndarray,
+                      low_cutoff: float = 80.0,
+                      high_cutoff: float = 8000.0,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        流式带通滤波（滤波状态跨块延续）
 
-        # 应用滤波器
-        filtered = signal.filtfilt(b, a, audio)
+        未指定 out 时返回新分配的 float32 数组（调用方可直接持有）。
 
-        return filtered
+        Args:
+            audio: 输入音频块 (float32)
+            low_cutoff: 低截止频率 (Hz)
+            high_cutoff: 高截止频率 (Hz)
+            out: 输出缓冲（可与输入相同）
+
+        Returns:
+            滤波后的音频
+        """
+        if self.stream_filter is None:
+            sos = self.design_filter('band', (low_cutoff, high_cutoff))
+            self.stream_filter = StreamingFilter(sos)
+
+        return self.stream_filter.process(audio, out=out)
+
+    def reset_stream(self):
+        """重置流式滤波状态"""
+        if self.stream_filter is not None:
+            self.stream_filter.reset()
 
     def reduce_noise_simple(self, audio: np.ndarray, noise_level: float = 0.01) -> np.ndarray:
         """
@@ -147,35 +360,45 @@ class AudioProcessor:
         Returns:
             降噪后的音频
         """
-        # 计算短时能量
+        # 帧参数
         frame_length = int(self.sample_rate * 0.02)  # 20ms
         hop_length = frame_length // 2
 
-        # 分帧
-        frames = []
-        for i in range(0, len(audio) - frame_length, hop_length):
-            frame = audio[i:i + frame_length]
-            rms = np.sqrt(np.mean(frame ** 2))
+        num_frames = len(range(0, len(audio) - frame_length, hop_length))
+        if num_frames == 0:
+            return audio
 
-            # 噪声门
-            if rms < noise_level:
-                frame = frame * 0.1  # 衰减而不是完全静音
+        # 累积平方和计算每帧短时能量
+        starts = np.arange(num_frames) * hop_length
+        energy = self._frame_energy(audio, starts, frame_length)
 
-            frames.append(frame)
+        # 噪声门：低能量帧衰减而不是完全静音
+        gains = np.where(energy < noise_level ** 2, 0.1, 1.0)
 
-        # 重建音频
-        if not frames:
-            return audio
+        # 重叠相加等价于逐样本增益：每个样本的增益为覆盖它的各帧增益之和
+        envelope = np.zeros(len(audio) + 1)
+        envelope[starts] += gains
+        envelope[starts + frame_length] -= gains
+        envelope = np.cumsum(envelope[:-1]).astype(np.float32)
 
-        # 使用重叠相加
-        output = np.zeros(len(audio))
-        for i, frame in enumerate(frames):
-            start = i * hop_length
-            end = start + len(frame)
-            if end <= len(output):
-                output[start:end] += frame
+        return np.multiply(audio, envelope, out=envelope)
 
-        return output
+    def _frame_energy(self, audio: np.ndarray, starts: np.ndarray, frame_length: int) -> np.ndarray:
+        """
+        用累积平方和计算各帧的均方能量
+
+        Args:
+            audio: 输入音频
+            starts: 各帧起始位置
+            frame_length: 帧长
+
+        Returns:
+            各帧均方能量 (float64)
+        """
+        cumulative = np.empty(len(audio) + 1)
+        cumulative[0] = 0.0
+        np.cumsum(np.square(audio, dtype=np.float64), out=cumulative[1:])
+        return (cumulative[starts + frame_length] - cumulative[starts]) / frame_length
 
     def resample(self, audio: np.ndarray, target_rate: int) -> np.ndarray:
         """
@@ -191,11 +414,10 @@ class AudioProcessor:
         if self.sample_rate == target_rate:
             return audio
 
-        # 计算重采样比例
-        num_samples = int(len(audio) * target_rate / self.sample_rate)
-
-        # 使用 scipy 重采样
-        resampled = signal.resample(audio, num_samples)
+        # 多相 FIR 重采样（O(n)，无 FFT 周期延拓带来的首尾失真）
+        g = gcd(int(self.sample_rate), int(target_rate))
+        resampled = signal.resample_poly(audio, int(target_rate) // g, int(self.sample_rate) // g)
+        resampled = resampled.astype(np.float32, copy=False)
 
         logger.debug(f"重采样: {self.sample_rate}Hz -> {target_rate}Hz")
 
@@ -212,35 +434,50 @@ class AudioProcessor:
         Returns:
             裁剪后的音频
         """
-        # 计算短时能量
+        start_sample, end_sample = self.silence_bounds(audio, threshold)
+        return audio[start_sample:end_sample]
+
+    def silence_bounds(self, audio: np.ndarray, threshold: float = 0.01) -> Tuple[int, int]:
+        """
+        计算裁剪首尾静音后的样本范围
+
+        Args:
+            audio: 输入音频
+            threshold: 能量阈值
+
+        Returns:
+            (起始样本, 结束样本)，全部静音时为整段
+        """
+        # 不重叠分帧（跨步视图）计算短时能量
         frame_length = int(self.sample_rate * 0.02)  # 20ms
-        energy = np.array([
-            np.sqrt(np.mean(audio[i:i + frame_length] ** 2))
-            for i in range(0, len(audio) - frame_length, frame_length)
-        ])
+        num_frames = len(range(0, len(audio) - frame_length, frame_length))
+        frames = audio[:num_frames * frame_length].reshape(num_frames, frame_length)
+        energy = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
 
         # 找到非静音区域
         non_silent = np.where(energy > threshold)[0]
 
         if len(non_silent) == 0:
-            return audio
+            return 0, len(audio)
 
         # 计算起止位置
         start_frame = non_silent[0]
         end_frame = non_silent[-1] + 1
 
-        start_sample = start_frame * frame_length
-        end_sample = min(end_frame * frame_length, len(audio))
+        start_sample = int(start_frame * frame_length)
+        end_sample = min(int(end_frame * frame_length), len(audio))
 
-        return audio[start_sample:end_sample]
+        return start_sample, end_sample
 
     def process(self, audio: np.ndarray,
                normalize: bool = True,
                remove_dc: bool = True,
                bandpass: bool = True,
-               trim: bool = False) -> np.ndarray:
+               trim: bool = False,
+               stream: bool = False,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        完整的音频预处理流程
+        完整的音频预处理流程（在 float32 工作缓冲上原地处理）
 
         Args:
             audio: 输入音频
@@ -248,19 +485,36 @@ class AudioProcessor:
             remove_dc: 是否移除直流偏移
             bandpass: 是否应用带通滤波
             trim: 是否裁剪静音
+            stream: 带通滤波是否使用流式状态（连续音频块逐块调用时使用）
+            out: float32 工作缓冲（可与输入相同，此时不复制）；未指定时复制输入
 
         Returns:
             处理后的音频
         """
-        processed = audio.copy()
+        if out is None:
+            processed = np.array(audio, dtype=np.float32)
+            alloc_tracker.record('preprocess', processed.nbytes, copy=True)
+        else:
+            processed = out
+            if out is not audio:
+                np.copyto(processed, audio)
+                alloc_tracker.record('preprocess', processed.nbytes, copy=True)
 
         # 移除直流偏移
         if remove_dc:
-            processed = self.remove_dc_offset(processed)
+            self.remove_dc_offset(processed, out=processed)
 
         # 带通滤波（保留语音频段）
         if bandpass:
-            processed = self.apply_bandpass_filter(processed, 80.0, 8000.0)
+            if stream:
+                self.filter_stream(processed, 80.0, 8000.0, out=processed)
+            else:
+                filtered = self.apply_bandpass_filter(processed, 80.0, 8000.0)
+                if out is None:
+                    processed = filtered
+                elif filtered is not processed:
+                    np.copyto(processed, filtered)
+                    alloc_tracker.record('preprocess', processed.nbytes, copy=True)
 
         # 裁剪静音
         if trim:
@@ -268,7 +522,7 @@ class AudioProcessor:
 
         # 标准化音量
         if normalize:
-            processed = self.normalize(processed)
+            processed = self.normalize(processed, out=processed)
 
         return processed
 
@@ -0,0 +1,151 @@
+"""
+音频环形缓冲区模块 - 预分配的单生产者/单消费者无锁缓冲
+"""
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+
+class AudioRingBuffer:
+    """
+    单声道 float32 环形缓冲区
+
+    写入端（音频回调线程）原地写入预分配内存，读取端获取零拷贝视图。
+    读写位置均为单调递增的样本索引，只由各自一端修改，因此无需加锁。
+
+    缓冲区尾部额外预留 max_read 个样本作为头部镜像，
+    跨越回绕点的读取同样可以返回连续视图。
+    """
+
+    def __init__(self, capacity: int, max_read: int, poll_interval: float = 0.005):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 容量（样本数）
+            max_read: 单次读取的最大样本数
+            poll_interval: 读取等待时的轮询间隔（秒）
+        """
+        if max_read > capacity:
+            raise ValueError(f"max_read ({max_read}) 不能大于 capacity ({capacity})")
+
+        self.capacity = capacity
+        self.max_read = max_read
+        self.poll_interval = poll_interval
+
+        # 一次性分配（容量 + 头部镜像）
+        self._buffer = np.zeros(capacity + max_read, dtype=np.float32)
+
+        # 单调递增的样本索引
+        self._write_index = 0
+        self._read_index = 0
+
+        # 溢出统计（回调中只计数，不记录日志）
+        self.overruns = 0
+        self.dropped_samples = 0
+
+    @property
+    def write_index(self) -> int:
+        """已写入的样本总数"""
+        return self._write_index
+
+    @property
+    def read_index(self) -> int:
+        """已读取的样本总数"""
+        return self._read_index
+
+    def available(self) -> int:
+        """可读取的样本数"""
+        return self._write_index - self._read_index
+
+    def write(self, block: np.ndarray) -> bool:
+        """
+        写入音频块（多声道时原地混为单声道）
+
+        Args:
+            block: 音频数据，形状 (frames,) 或 (frames, channels)
+
+        Returns:
+            是否写入成功（空间不足时丢弃整块并计数）
+        """
+        frames = block.shape[0]
+        if frames > self.capacity - (self._write_index - self._read_index):
+            self.overruns += 1
+            self.dropped_samples += frames
+            return False
+
+        pos = self._write_index % self.capacity
+        first = min(frames, self.capacity - pos)
+        self._store(block[:first], pos)
+        if first < frames:
+            self._store(block[first:], 0)
+
+        # 发布新的写位置（数据写完后再更新）
+        self._write_index += frames
+        return True
+
+    def _store(self, block: np.ndarray, pos: int):
+        """
+        将音频块写入指定位置，并同步头部镜像
+
+        Args:
+            block: 音频数据
+            pos: 写入位置（不跨越回绕点）
+        """
+        end = pos + block.shape[0]
+        dst = self._buffer[pos:end]
+
+        if block.ndim == 1:
+            np.copyto(dst, block, casting='same_kind')
+        elif block.shape[1] == 1:
+            np.copyto(dst, block[:, 0], casting='same_kind')
+        else:
+            np.mean(block, axis=1, out=dst)
+
+        # 头部区域镜像到尾部预留区
+        if pos < self.max_read:
+            mirror_end = min(end, self.max_read)
+            self._buffer[self.capacity + pos:self.capacity + mirror_end] = self._buffer[pos:mirror_end]
+
+    def read(self, frames: int, timeout: float = 1.0) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        读取固定长度的音频（零拷贝）
+
+        返回的视图为只读，在写入端绕回该区域之前（约 capacity 个样本）有效，
+        需要长期持有数据的调用方应自行复制。
+
+        Args:
+            frames: 样本数（不超过 max_read）
+            timeout: 超时时间（秒）
+
+        Returns:
+            (起始样本索引, 音频视图)，超时返回 None
+        """
+        if frames > self.max_read:
+            raise ValueError(f"单次读取 {frames} 超过上限 {self.max_read}")
+
+        deadline = time.monotonic() + timeout
+        while self._write_index - self._read_index < frames:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_interval, remaining))
+
+        start = self._read_index
+        pos = start % self.capacity
+        view = self._buffer[pos:pos + frames]
+        view.flags.writeable = False
+
+        self._read_index = start + frames
+        return start, view
+
+    def skip(self):
+        """丢弃所有未读数据"""
+        self._read_index = self._write_index
+
+    def reset(self):
+        """重置缓冲区（仅在写入端停止时调用）"""
+        self._write_index = 0
+        self._read_index = 0
+        self.overruns = 0
+        self.dropped_samples = 0
@@ -4,20 +4,106 @@
 import numpy as np
 import webrtcvad
 from collections import deque
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Protocol, runtime_checkable
 from loguru import logger
 
+from .instrumentation import alloc_tracker
+
+
+@runtime_checkable
+class VADBackend(Protocol):
+    """
+    逐帧语音判定后端接口
+
+    后端只负责判断单个 int16 PCM 帧是否为语音，
+    分段、填充和切分逻辑由 VoiceActivityDetector 统一处理。
+    """
+
+    name: str
+
+    def is_speech(self, frame, sample_rate: int) -> bool:
+        """判断 int16 PCM 帧（字节或字节视图）是否为语音"""
+        ...
+
+    def set_aggressiveness(self, level: int):
+        """设置激进程度 (0-3, 越高越不容易判为语音)"""
+        ...
+
+
+class WebRTCBackend:
+    """WebRTC VAD 后端"""
+
+    name = 'webrtc'
+
+    def __init__(self, aggressiveness: int = 3):
+        """
+        初始化 WebRTC VAD 后端
+
+        Args:
+            aggressiveness: 激进程度 (0-3)
+        """
+        self.aggressiveness = aggressiveness
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame, sample_rate: int) -> bool:
+        """
+        判断帧是否为语音
+
+        Args:
+            frame: int16 PCM 帧（10/20/30ms）
+            sample_rate: 采样率
+
+        Returns:
+            是否为语音
+        """
+        return self._vad.is_speech(frame, sample_rate)
+
+    def set_aggressiveness(self, level: int):
+        """
+        设置激进程度
+
+        Args:
+            level: 激进程度 (0-3)
+        """
+        self.aggressiveness = level
+        self._vad.set_mode(level)
+
+
+def create_vad_backend(config: dict) -> VADBackend:
+    """
+    根据配置创建逐帧判定后端
+
+    Args:
+        config: VAD 配置字典
+
+    Returns:
+        VAD 后端
+    """
+    name = config.get('backend', 'webrtc')
+    aggressiveness = config.get('aggressiveness', 3)
+
+    if name == 'webrtc':
+        return WebRTCBackend(aggressiveness)
+    if name == 'energy':
+        backend = EnergyVAD(threshold=config.get('energy_threshold', 0.01), min_duration=0.0)
+        backend.set_aggressiveness(aggressiveness)
+        return backend
+
+    raise ValueError(f"未知的 VAD 后端: {name}")
+
 
 class VoiceActivityDetector:
     """语音活动检测器"""
 
-    def __init__(self, config: dict, sample_rate: int = 16000):
+    def __init__(self, config: dict, sample_rate: int = 16000,
+                 backend: Optional[VADBackend] = None):
         """
         初始化 VAD
 
         Args:
             config: VAD 配置字典
             sample_rate: 音频采样率
+            backend: 逐帧判定后端（默认按配置创建）
         """
         self.config = config
         self.sample_rate = sample_rate
@@ -27,67 +113,154 @@ class VoiceActivityDetector:
             logger.info("VAD 已禁用")
             return
 
-        # WebRTC VAD 参数
+        # 逐帧判定后端
         self.aggressiveness = config.get('aggressiveness', 3)  # 0-3
-        self.vad = webrtcvad.Vad(self.aggressiveness)
+        self.backend = backend or create_vad_backend(config)
+        self.backend.set_aggressiveness(self.aggressiveness)
 
         # 时长参数（秒）
         self.min_speech_duration = config.get('min_speech_duration', 0.3)
         self.max_silence_duration = config.get('max_silence_duration', 0.8)
         self.padding_duration = config.get('padding_duration', 0.2)
+        self.max_segment_duration = config.get('max_segment_duration', 8.0)
 
         # 帧参数（WebRTC VAD 要求 10/20/30ms 帧）
         self.frame_duration_ms = 30  # 毫秒
         self.frame_size = int(sample_rate * self.frame_duration_ms / 1000)
 
         # 转换为帧数
-        self.min_speech_frames = int(self.min_speech_duration * 1000 / self.frame_duration_ms)
-        self.max_silence_frames = int(self.max_silence_duration * 1000 / self.frame_duration_ms)
+        self.min_speech_frames = max(1, int(self.min_speech_duration * 1000 / self.frame_duration_ms))
+        self.max_silence_frames = max(1, int(self.max_silence_duration * 1000 / self.frame_duration_ms))
         self.padding_frames = int(self.padding_duration * 1000 / self.frame_duration_ms)
+        self.max_segment_frames = int(self.max_segment_duration * 1000 / self.frame_duration_ms)
 
         # 状态
         self.is_speech = False
         self.speech_frames = 0
         self.silence_frames = 0
 
-        # 音频缓冲
-        self.audio_buffer = deque(maxlen=self.padding_frames * 2)
+        # 语音开始前的预录缓冲（前填充 + 起始判定期间的语音帧）
+        self.pre_roll = deque(maxlen=self.padding_frames + self.min_speech_frames)
+
+        # 当前语音片段的帧，及每帧是否为语音
+        self.segment_frames: List[np.ndarray] = []
+        self.segment_flags: List[bool] = []
+
+        # 最近一次 process_stream / flush 输出的各片段的语音区间（秒，相对片段起点）
+        self.segment_regions: List[List[Tuple[float, float]]] = []
+
+        # int16 工作缓冲（按需扩容复用）：块级检测与流式检测各用一个，
+        # 流式缓冲头部保存跨块遗留的不足一帧的样本
+        self._pcm = np.empty(self.frame_size * 16, dtype=np.int16)
+        self._stream_pcm = np.empty(self.frame_size * 16, dtype=np.int16)
+        self._remainder_start = 0
+        self._remainder_len = 0
+
+        logger.info(
+            f"VAD 初始化: 后端={self.backend.name}, 激进度={self.aggressiveness}, "
+            f"帧大小={self.frame_size}"
+        )
+
+    def set_aggressiveness(self, level: int):
+        """
+        调整激进程度（在处理线程中调用）
+
+        Args:
+            level: 激进程度 (0-3)
+        """
+        level = min(3, max(0, level))
+        if level == self.aggressiveness:
+            return
+        self.aggressiveness = level
+        self.backend.set_aggressiveness(level)
+        logger.info(f"VAD 激进度调整为 {level}")
 
-        logger.info(f"VAD 初始化: 激进度={self.aggressiveness}, 帧大小={self.frame_size}")
+    def set_min_speech_duration(self, seconds: float):
+        """
+        调整触发语音所需的最小时长（在处理线程中调用）
 
-    def _split_frames(self, audio: np.ndarray) -> List[bytes]:
+        Args:
+            seconds: 最小语音时长（秒）
         """
-        将音频分割为固定大小的帧
+        frames = max(1, int(seconds * 1000 / self.frame_duration_ms))
+        self.min_speech_duration = seconds
+        if frames == self.min_speech_frames:
+            return
+
+        self.min_speech_frames = frames
+        # 预录缓冲长度随之变化（保留最近的帧）
+        self.pre_roll = deque(self.pre_roll, maxlen=self.padding_frames + frames)
+        logger.info(f"VAD 最小语音时长调整为 {seconds:.2f}s")
+
+    def _split_frames(self, audio: np.ndarray, carry: bool = False) -> np.ndarray:
+        """
+        将音频分割为固定大小的帧（int16 跨步视图，不逐帧复制）
+
+        返回的视图指向内部工作缓冲，在下一次调用前有效。
 
         Args:
             audio: 音频数据 (float32, -1.0 到 1.0)
+            carry: 是否拼接上一块遗留的样本，并保留本块不足一帧的尾部
 
         Returns:
-            帧列表 (bytes)
+            帧数组 (帧数, frame_size)，int16
         """
-        # 转换为 int16
-        audio_int16 = (audio * 32767).astype(np.int16)
+        pcm = self._stream_pcm if carry else self._pcm
+        rem = self._remainder_len if carry else 0
+        total = rem + len(audio)
+
+        # 遗留样本移到缓冲区头部
+        if rem:
+            pcm[:rem] = pcm[self._remainder_start:self._remainder_start + rem]
+
+        # 按需扩容
+        if total > len(pcm):
+            grown = np.empty(total, dtype=np.int16)
+            grown[:rem] = pcm[:rem]
+            pcm = grown
+            if carry:
+                self._stream_pcm = grown
+            else:
+                self._pcm = grown
 
-        frames = []
-        for i in range(0, len(audio_int16), self.frame_size):
-            frame = audio_int16[i:i + self.frame_size]
-            if len(frame) == self.frame_size:
-                frames.append(frame.tobytes())
+        # 一次性转换为 int16
+        np.multiply(audio, 32767, out=pcm[rem:total], casting='unsafe')
 
-        return frames
+        num_frames = total // self.frame_size
+        used = num_frames * self.frame_size
 
-    def is_speech_frame(self, frame: bytes) -> bool:
+        if carry:
+            self._remainder_start = used
+            self._remainder_len = total - used
+
+        return pcm[:used].reshape(num_frames, self.frame_size)
+
+    def _frame_buffers(self, frames: np.ndarray) -> List[memoryview]:
+        """
+        获取每帧的字节视图（整块只导出一次缓冲区）
+
+        Args:
+            frames: 帧数组 (帧数, frame_size)，int16
+
+        Returns:
+            帧字节视图列表
+        """
+        buf = memoryview(frames).cast('B')
+        step = self.frame_size * 2
+        return [buf[i:i + step] for i in range(0, len(buf), step)]
+
+    def is_speech_frame(self, frame) -> bool:
         """
         检测单个帧是否包含语音
 
         Args:
-            frame: 音频帧 (bytes)
+            frame: 音频帧 (int16 PCM 字节或字节视图)
 
         Returns:
             是否为语音帧
         """
         try:
-            return self.vad.is_speech(frame, self.sample_rate)
+            return self.backend.is_speech(frame, self.sample_rate)
         except Exception as e:
             logger.warning(f"VAD 检测失败: {e}")
             return False
@@ -107,12 +280,12 @@ class VoiceActivityDetector:
 
         # 分割为帧
         frames = self._split_frames(audio)
-        if not frames:
+        if len(frames) == 0:
             return False, audio
 
         # 检测每一帧
         speech_count = 0
-        for frame in frames:
+        for frame in self._frame_buffers(frames):
             if self.is_speech_frame(frame):
                 speech_count += 1
 
@@ -126,64 +299,208 @@ class VoiceActivityDetector:
         """
         流式处理音频，返回完整的语音片段
 
+        检测到语音结束（静音达到 max_silence_duration）时立即输出片段，
+        片段前后各保留 padding_duration 的填充；超过 max_segment_duration
+        的语音会被强制切分。
+
         Args:
             audio: 音频数据 (float32)
 
         Returns:
-            (状态变化, 语音片段列表)
+            (当前是否处于语音中, 语音片段列表)
         """
         if not self.enabled:
             return False, [audio]
 
-        # 分割为帧
-        frames = self._split_frames(audio)
+        # 分割为帧（遗留不足一帧的样本到下一块）
+        frames = self._split_frames(audio, carry=True)
         speech_segments = []
+        self.segment_regions = []
+
+        # 整块转换为 float32，缓冲区保存逐帧的行视图
+        frames_float = frames.astype(np.float32)
+        frames_float /= 32767.0
+        alloc_tracker.record('vad', frames_float.nbytes)
 
-        for frame in frames:
+        for frame, frame_array in zip(self._frame_buffers(frames), frames_float):
             is_speech = self.is_speech_frame(frame)
 
-            # 将帧添加到缓冲区
-            frame_array = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32767.0
-            self.audio_buffer.append(frame_array)
+            if not self.is_speech:
+                # 等待语音开始：帧进入预录缓冲
+                self.pre_roll.append(frame_array)
 
-            if is_speech:
-                self.speech_frames += 1
-                self.silence_frames = 0
+                if is_speech:
+                    self.speech_frames += 1
+                else:
+                    self.speech_frames = 0
 
-                if not self.is_speech and self.speech_frames >= self.min_speech_frames:
-                    # 开始语音
+                if self.speech_frames >= self.min_speech_frames:
+                    # 开始语音（带上预录的填充和起始帧）
                     self.is_speech = True
+                    self.silence_frames = 0
+                    self.segment_frames = list(self.pre_roll)
+                    self.segment_flags = [False] * (len(self.pre_roll) - self.speech_frames)
+                    self.segment_flags += [True] * self.speech_frames
+                    self.pre_roll.clear()
                     logger.debug("检测到语音开始")
+                continue
+
+            self.segment_frames.append(frame_array)
+            self.segment_flags.append(is_speech)
+
+            if is_speech:
+                self.silence_frames = 0
             else:
                 self.silence_frames += 1
 
-                if self.is_speech and self.silence_frames >= self.max_silence_frames:
-                    # 结束语音
+                if self.silence_frames >= self.max_silence_frames:
+                    # 结束语音（尾部静音只保留填充长度）
+                    trailing = self.silence_frames - self.padding_frames
+                    if trailing > 0:
+                        del self.segment_frames[-trailing:]
+                        del self.segment_flags[-trailing:]
+
+                    # 强制切分后剩余的可能只有静音
+                    if self.segment_frames:
+                        speech_segments.append(self._emit_segment())
                     self.is_speech = False
                     self.speech_frames = 0
+                    self.silence_frames = 0
+                    continue
 
-                    # 提取语音片段（包含填充）
-                    segment = np.concatenate(list(self.audio_buffer))
-                    speech_segments.append(segment)
+            if self.max_segment_frames and len(self.segment_frames) >= self.max_segment_frames:
+                # 超长语音强制切分，保持语音状态
+                speech_segments.append(self._emit_segment())
+                logger.debug("语音片段超过最大时长，强制切分")
 
-                    logger.debug(f"检测到语音结束，时长={len(segment)/self.sample_rate:.2f}s")
+        return self.is_speech, speech_segments
 
-                    # 清空缓冲区
-                    self.audio_buffer.clear()
+    def push_silence(self, audio: np.ndarray):
+        """
+        送入已被前级判定为静音的音频块（不调用 WebRTC VAD）
 
-        return self.is_speech, speech_segments
+        只更新预录缓冲和帧对齐，保证之后检测到语音时填充仍是连续的音频。
+        仅在不处于语音中时调用。
+
+        Args:
+            audio: 音频数据 (float32)
+        """
+        if not self.enabled:
+            return
+
+        frames = self._split_frames(audio, carry=True)
+        self.speech_frames = 0
+
+        # 只转换预录缓冲能保留的尾部帧
+        tail = frames[-self.pre_roll.maxlen:] if self.pre_roll.maxlen else frames[:0]
+        tail_float = tail.astype(np.float32)
+        tail_float /= 32767.0
+        self.pre_roll.extend(tail_float)
+
+    def onset_audio(self, segments: List[np.ndarray], audio: np.ndarray) -> np.ndarray:
+        """
+        语音开始的块中应送入流式识别的音频（process_stream 之后调用）
+
+        包括本块输出的片段、当前片段已有的帧（预录缓冲和开始帧，含前一块中
+        计入起始判定的语音帧）以及本块不足一帧的尾部样本，与之后的音频块连续。
+
+        Args:
+            segments: 本块 process_stream 输出的语音片段
+            audio: 本块音频
+
+        Returns:
+            音频 (float32)
+        """
+        parts = list(segments)
+        if self.is_speech:
+            parts.extend(self.segment_frames)
+            remainder = min(self._remainder_len, len(audio))
+            if remainder:
+                parts.append(audio[len(audio) - remainder:])
+        onset = np.concatenate(parts) if parts else audio[:0]
+        alloc_tracker.record('vad_segment', onset.nbytes, copy=True)
+        return onset
+
+    def _emit_segment(self) -> np.ndarray:
+        """
+        合并当前片段的帧并清空
+
+        Returns:
+            语音片段 (float32)
+        """
+        segment = np.concatenate(self.segment_frames)
+        self.segment_regions.append(self._speech_regions(self.segment_flags))
+        self.segment_frames = []
+        self.segment_flags = []
+        alloc_tracker.record('vad_segment', segment.nbytes, copy=True)
+        logger.debug(f"检测到语音结束，时长={len(segment)/self.sample_rate:.2f}s")
+        return segment
+
+    def _speech_regions(self, flags: List[bool]) -> List[Tuple[float, float]]:
+        """
+        由逐帧语音标记计算语音区间（两侧各扩展填充长度，重叠的合并）
+
+        Args:
+            flags: 每帧是否为语音
+
+        Returns:
+            语音区间列表 [(起始秒, 结束秒)]，相对片段起点
+        """
+        marks = np.asarray(flags, dtype=np.int8)
+        if len(marks) == 0 or not marks.any():
+            return []
+
+        # 语音段的起止帧
+        edges = np.diff(np.concatenate(([0], marks, [0])))
+        starts = np.maximum(np.flatnonzero(edges == 1) - self.padding_frames, 0)
+        ends = np.minimum(np.flatnonzero(edges == -1) + self.padding_frames, len(marks))
+
+        frame_seconds = self.frame_duration_ms / 1000
+        regions = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if regions and start * frame_seconds <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end * frame_seconds)
+            else:
+                regions.append((start * frame_seconds, end * frame_seconds))
+        return regions
+
+    def flush(self) -> Optional[np.ndarray]:
+        """
+        结束当前未完成的语音片段（音频中断或停止时调用）
+
+        Returns:
+            语音片段，不在语音中返回 None
+        """
+        self.segment_regions = []
+        if not self.enabled or not self.is_speech or not self.segment_frames:
+            return None
+
+        segment = self._emit_segment()
+        self.is_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0
+        return segment
 
     def reset(self):
         """重置 VAD 状态"""
         self.is_speech = False
         self.speech_frames = 0
         self.silence_frames = 0
-        self.audio_buffer.clear()
+        self.pre_roll.clear()
+        self.segment_frames = []
+        self.segment_flags = []
+        self.segment_regions = []
+        self._remainder_len = 0
         logger.debug("VAD 状态已重置")
 
 
 class EnergyVAD:
-    """基于能量的简单 VAD（备用方案）"""
+    """基于能量的简单 VAD（备用方案，也可作为逐帧判定后端）"""
+
+    name = 'energy'
+
+    # 激进度对应的阈值倍数
+    AGGRESSIVENESS_SCALE = (0.5, 1.0, 1.5, 2.0)
 
     def __init__(self, threshold: float = 0.01, min_duration: float = 0.3):
         """
@@ -193,10 +510,34 @@ class EnergyVAD:
             threshold: 能量阈值
             min_duration: 最小语音时长（秒）
         """
+        self.base_threshold = threshold
         self.threshold = threshold
         self.min_duration = min_duration
         logger.info(f"能量 VAD 初始化: 阈值={threshold}")
 
+    def is_speech(self, frame, sample_rate: int = 16000) -> bool:
+        """
+        判断单个 int16 PCM 帧是否为语音（VADBackend 接口）
+
+        Args:
+            frame: int16 PCM 帧（字节或字节视图）
+            sample_rate: 采样率
+
+        Returns:
+            是否为语音
+        """
+        pcm = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return self._rms(pcm) > self.threshold * 32767.0
+
+    def set_aggressiveness(self, level: int):
+        """
+        按激进程度缩放能量阈值（VADBackend 接口）
+
+        Args:
+            level: 激进程度 (0-3)
+        """
+        self.threshold = self.base_threshold * self.AGGRESSIVENESS_SCALE[min(3, max(0, level))]
+
     def process(self, audio: np.ndarray, sample_rate: int = 16000) -> bool:
         """
         检测音频是否包含语音
@@ -209,7 +550,7 @@ class EnergyVAD:
             是否包含语音
         """
         # 计算 RMS 能量
-        rms = np.sqrt(np.mean(audio ** 2))
+        rms = self._rms(audio)
 
         # 检查时长
         duration = len(audio) / sample_rate
@@ -221,6 +562,86 @@ class EnergyVAD:
 
         return is_speech
 
+    @staticmethod
+    def _rms(audio: np.ndarray) -> float:
+        """
+        计算 RMS（点积避免平方临时数组）
+
+        Args:
+            audio: 音频数据
+
+        Returns:
+            RMS 能量
+        """
+        if len(audio) == 0:
+            return 0.0
+        return float(np.sqrt(np.dot(audio, audio) / len(audio)))
+
+
+class AdaptiveEnergyVAD(EnergyVAD):
+    """
+    自适应噪声底的能量门（WebRTC VAD 的前级）
+
+    跟踪背景噪声能量，只有明显高于噪声底的音频块才送入 WebRTC VAD，
+    长时间静音时省去逐帧检测的开销。
+    """
+
+    def __init__(self, config: dict):
+        """
+        初始化能量门
+
+        Args:
+            config: 能量门配置字典
+        """
+        super().__init__(threshold=config.get('min_threshold', 0.002), min_duration=0.0)
+
+        # 高于噪声底的余量 (dB)
+        self.margin_db = config.get('margin_db', 6.0)
+        self.margin = 10 ** (self.margin_db / 20)
+
+        # 噪声底上升速率（下降立即跟随）
+        self.adapt_rate = config.get('adapt_rate', 0.05)
+        self.noise_floor: Optional[float] = None
+
+        # 统计
+        self.passed = 0
+        self.rejected = 0
+
+    def process(self, audio: np.ndarray, sample_rate: int = 16000) -> bool:
+        """
+        判断音频块是否可能包含语音
+
+        Args:
+            audio: 音频数据
+            sample_rate: 采样率
+
+        Returns:
+            是否通过（需要进一步做 VAD）
+        """
+        rms = self._rms(audio)
+
+        if self.noise_floor is None:
+            self.noise_floor = rms
+
+        passed = rms > max(self.threshold, self.noise_floor * self.margin)
+
+        # 更新噪声底：下降立即跟随，上升缓慢跟随
+        if rms < self.noise_floor:
+            self.noise_floor = rms
+        else:
+            self.noise_floor += self.adapt_rate * (rms - self.noise_floor)
+
+        if passed:
+            self.passed += 1
+        else:
+            self.rejected += 1
+
+        return passed
+
+    def reset(self):
+        """重置噪声底"""
+        self.noise_floor = None
+
 
 if __name__ == "__main__":
     # 测试代码
@@ -0,0 +1,137 @@
+"""
+VAD 自适应控制模块 - 根据噪声底和空识别率调整 VAD 激进度与最小语音时长
+"""
+from collections import deque
+from threading import Lock
+from typing import Dict, Optional
+from loguru import logger
+
+from .vad import VoiceActivityDetector
+
+
+class VADController:
+    """
+    VAD 参数自适应控制器
+
+    每个误触发的语音片段都要完整跑一次 Whisper，
+    因此 ASR 空结果偏多时提高激进度 / 最小语音时长，
+    空结果很少时逐步放宽，避免漏掉语音。
+
+    ASR 结果在识别线程记录，参数调整只在采集线程（update）中进行。
+    """
+
+    def __init__(self, config: dict, vad: VoiceActivityDetector):
+        """
+        初始化控制器
+
+        Args:
+            config: 控制器配置字典
+            vad: 被控制的 VAD
+        """
+        self.vad = vad
+
+        # 每次评估所需的 ASR 结果数
+        self.window = config.get('window', 20)
+
+        # 空结果率阈值
+        self.empty_rate_high = config.get('empty_rate_high', 0.4)
+        self.empty_rate_low = config.get('empty_rate_low', 0.1)
+
+        # 噪声底高于此值时激进度不低于 2
+        self.noise_floor_high = config.get('noise_floor_high', 0.01)
+
+        # 最小语音时长的调整范围与步长（秒）
+        self.min_speech_duration = vad.min_speech_duration
+        self.max_speech_duration = config.get('max_min_speech_duration', 0.6)
+        self.speech_step = config.get('speech_step', 0.1)
+
+        # 最近的 ASR 结果（True 为空结果）
+        self._results = deque(maxlen=self.window)
+        self._pending = 0
+        self._lock = Lock()
+
+        self.noise_floor: Optional[float] = None
+        self.adjustments = 0
+        self.last_empty_rate = 0.0
+
+        logger.info(
+            f"VAD 自适应控制初始化: 窗口={self.window}, "
+            f"空结果率阈值={self.empty_rate_low}-{self.empty_rate_high}"
+        )
+
+    def record_asr_result(self, empty: bool):
+        """
+        记录一次 ASR 结果（识别线程调用）
+
+        Args:
+            empty: 是否为空结果
+        """
+        with self._lock:
+            self._results.append(empty)
+            self._pending += 1
+
+    def update(self, noise_floor: Optional[float] = None):
+        """
+        按最新的噪声底和空结果率调整 VAD（采集线程每块调用）
+
+        Args:
+            noise_floor: 当前噪声底 (RMS)，未知时为 None
+        """
+        self.noise_floor = noise_floor
+        noisy = noise_floor is not None and noise_floor > self.noise_floor_high
+
+        # 噪声大时直接提高激进度下限
+        if noisy and self.vad.aggressiveness < 2:
+            self.vad.set_aggressiveness(2)
+            self.adjustments += 1
+
+        with self._lock:
+            if self._pending < self.window:
+                return
+            empty_rate = sum(self._results) / len(self._results)
+            self._pending = 0
+            self._results.clear()
+
+        self.last_empty_rate = empty_rate
+
+        if empty_rate > self.empty_rate_high:
+            # 误触发多：先提高激进度，已到上限再加长最小语音时长
+            if self.vad.aggressiveness < 3:
+                self.vad.set_aggressiveness(self.vad.aggressiveness + 1)
+            elif self.vad.min_speech_duration < self.max_speech_duration:
+                self.vad.set_min_speech_duration(
+                    round(min(self.max_speech_duration, self.vad.min_speech_duration + self.speech_step), 3)
+                )
+            else:
+                return
+        elif empty_rate < self.empty_rate_low:
+            # 误触发少：按相反顺序放宽
+            floor = 2 if noisy else 0
+            if self.vad.min_speech_duration > self.min_speech_duration:
+                self.vad.set_min_speech_duration(
+                    round(max(self.min_speech_duration, self.vad.min_speech_duration - self.speech_step), 3)
+                )
+            elif self.vad.aggressiveness > floor:
+                self.vad.set_aggressiveness(self.vad.aggressiveness - 1)
+            else:
+                return
+        else:
+            return
+
+        self.adjustments += 1
+        logger.debug(f"VAD 自适应调整: 空结果率={empty_rate:.2f}")
+
+    def get_stats(self) -> Dict:
+        """
+        获取控制器统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            'aggressiveness': self.vad.aggressiveness,
+            'min_speech_duration': self.vad.min_speech_duration,
+            'noise_floor': self.noise_floor,
+            'empty_rate': self.last_empty_rate,
+            'adjustments': self.adjustments
+        }
@@ -2,44 +2,147 @@
 游戏实时语音翻译工具 - 主程序
 """
 import sys
+import time
+import itertools
 import yaml
 import numpy as np
 from pathlib import Path
-from threading import Thread, Event
-from queue import Queue, Empty
+from threading import Thread, Event, Lock
+from queue import Queue, Empty, Full
+from typing import Optional, Dict, List, Tuple
 from loguru import logger
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QTimer
 
 # 导入模块
 from audio.capture import AudioCapture
-from audio.vad import VoiceActivityDetector
+from audio.file_source import FileAudioSource
+from audio.vad import VoiceActivityDetector, AdaptiveEnergyVAD
+from audio.vad_controller import VADController
 from audio.processor import AudioProcessor
-from asr.whisper_engine import WhisperEngine
+from audio.instrumentation import alloc_tracker
+from audio.fingerprint import Fingerprint, FingerprintCache
+from asr.whisper_engine import WhisperEngine, WhisperStreamProcessor
+from asr.quality_controller import ASRQualityController
+from asr.result_filter import ASRResultFilter
+from asr.worker_pool import ASRWorkerPool, partition_threads
 from translation.translator_manager import TranslatorManager
+from translation.route_planner import RoutePlanner, ROUTE_TRANSCRIBE_MT
 from overlay.subtitle_window import SubtitleWindow
 
 
 class GameTranslator:
     """游戏翻译主程序"""
 
-    def __init__(self, config_path: str = "config/settings.yaml"):
+    def __init__(self, config_path: str = "config/settings.yaml",
+                 config: Optional[dict] = None):
         """
         初始化游戏翻译器
 
         Args:
             config_path: 配置文件路径
+            config: 配置字典（传入时忽略 config_path）
         """
         # 加载配置
-        self.config = self._load_config(config_path)
+        self.config = config if config is not None else self._load_config(config_path)
 
         # 初始化组件
-        self.audio_capture = AudioCapture(self.config['audio'])
+        self.audio_capture = self._create_audio_source(self.config['audio'])
         self.vad = VoiceActivityDetector(self.config['vad'], sample_rate=16000)
+        self.energy_gate = self._create_energy_gate(self.config['vad'])
+        self.vad_controller = self._create_vad_controller(self.config['vad'])
         self.audio_processor = AudioProcessor(sample_rate=16000)
-        self.whisper_engine = WhisperEngine(self.config['whisper'])
+
+        # 翻译路径（目标语言为英语时 Whisper 直接输出英语，不再机器翻译）
+        self.route_planner = RoutePlanner(self.config['translation'])
+        whisper_config = self.config['whisper']
+        if whisper_config.get('task', 'transcribe') != self.route_planner.asr_task:
+            logger.info(f"Whisper 任务按翻译路径设为 {self.route_planner.asr_task}")
+            whisper_config = dict(whisper_config, task=self.route_planner.asr_task)
+
+        # 并发识别数 > 1 且使用线程池（语音片段模式，非两遍识别）时
+        # 按并发数平分 CPU 线程（模型以 num_workers 加载）
+        performance = self.config.get('performance', {})
+        self.pool_size = max(1, performance.get('thread_pool_size', 2))
+        pooled = (self.pool_size > 1 and self.vad.enabled
+                  and self.config['vad'].get('segmentation', 'utterance') == 'utterance'
+                  and not self.config['whisper'].get('two_pass', {}).get('enabled', False))
+        if pooled:
+            whisper_config = dict(
+                whisper_config,
+                **partition_threads(self.pool_size, performance.get('cpu_threads', 0))
+            )
+        self.whisper_engine = WhisperEngine(whisper_config)
+
+        # 后台加载模型并预热，模型就绪前按策略保留或丢弃音频
+        self.not_ready_policy = self.config['whisper'].get('not_ready_policy', 'hold')  # hold / drop
+        if self.config['whisper'].get('preload', True):
+            self.whisper_engine.load_async()
+
+        # 识别结果过滤（翻译前丢弃非语音和幻觉输出）
+        self.result_filter = None
+        filter_config = self.config['whisper'].get('result_filter', {})
+        if filter_config.get('enabled', True):
+            self.result_filter = ASRResultFilter(filter_config)
+
+        # 负载自适应（RTF 和队列积压过高时降低识别质量）
+        self.quality_controller = None
+        quality_config = self.config['whisper'].get('quality_control', {})
+        if quality_config.get('enabled', True):
+            self.quality_controller = ASRQualityController(quality_config, self.whisper_engine)
         self.translator = TranslatorManager(self.config['translation'])
 
+        # 重复语音缓存（NPC 台词、播报等完全相同的语音跳过识别和翻译）
+        self.fingerprint_cache = None
+        fingerprint_config = self.config['whisper'].get('fingerprint_cache', {})
+        if fingerprint_config.get('enabled', True):
+            self.fingerprint_cache = FingerprintCache(fingerprint_config, self.translator.target_language)
+
+        # 分段模式（utterance: 按语音结束切分, stream: 增量流式识别, fixed: 固定 3 秒窗口）
+        self.segmentation = self.config['vad'].get('segmentation', 'utterance')
+        if self.segmentation in ('utterance', 'stream') and not self.vad.enabled:
+            logger.warning("VAD 已禁用，分段模式回退为固定窗口")
+            self.segmentation = 'fixed'
+
+        # 流式识别（LocalAgreement 增量确认或重叠窗口合并）
+        self.stream_processor = None
+        if self.segmentation == 'stream':
+            streaming = self.config['whisper'].get('streaming', {})
+            self.stream_processor = WhisperStreamProcessor(
+                self.whisper_engine,
+                mode=streaming.get('mode', 'agreement'),
+                buffer_duration=streaming.get('buffer_duration', 3.0),
+                overlap_duration=streaming.get('overlap_duration', 0.5),
+                min_chunk_duration=streaming.get('min_chunk_duration', 1.0),
+                max_buffer_duration=streaming.get('max_buffer_duration', 15.0),
+                prompt_chars=streaming.get('prompt_chars', 200)
+            )
+
+        # 两遍识别（草稿模型立即出字幕，最终识别在后台线程完成后替换；流式模式不适用）
+        self.two_pass = self.whisper_engine.draft_model_size is not None and self.segmentation != 'stream'
+        self.final_queue = Queue(maxsize=20)
+        self._final_stop = Event()
+        self._segment_ids = itertools.count(1)
+        self.two_pass_stats = {
+            'drafts': 0,
+            'drafts_dropped': 0,
+            'finals': 0,
+            'finals_empty': 0,
+            'replaced': 0,
+            'removed': 0,
+            'draft_time': 0.0,
+            'time_to_first': 0.0,
+            'time_to_final': 0.0
+        }
+
+        # ASR 线程池（仅语音片段模式，片段之间相互独立；两遍识别时不使用）
+        self.asr_pool = None
+        if self.segmentation == 'utterance' and self.pool_size > 1:
+            if self.two_pass:
+                logger.warning("两遍识别已启用，不使用 ASR 线程池")
+            else:
+                self.asr_pool = ASRWorkerPool(self.whisper_engine, self.pool_size)
+
         # 字幕窗口（稍后初始化）
         self.subtitle_window = None
 
@@ -54,10 +157,84 @@ class GameTranslator:
         # 工作线程
         self.capture_thread = None
         self.process_thread = None
+        self.final_thread = None
         self.display_thread = None
 
+        # 内存分配统计（performance.enable_profiling）
+        if self.config.get('performance', {}).get('enable_profiling', False):
+            alloc_tracker.enable()
+            logger.info("已开启内存分配统计")
+
+        # 运行统计（处理线程和最终识别线程共用，识别结果统计持锁更新）
+        self._stats_lock = Lock()
+        self.stats = {
+            'chunks': 0,
+            'dropped_not_ready': 0,
+            'queue_dropped': 0,
+            'energy_rejected': 0,
+            'vad_rejected': 0,
+            'asr_calls': 0,
+            'asr_timeouts': 0,
+            'asr_budget_limited': 0,
+            'batches': 0,
+            'asr_time': 0.0,
+            'audio_seconds': 0.0,
+            'results': 0
+        }
+
         logger.info("游戏翻译器初始化完成")
 
+    def _create_energy_gate(self, vad_config: dict) -> Optional[AdaptiveEnergyVAD]:
+        """
+        根据配置创建 VAD 前级能量门
+
+        Args:
+            vad_config: VAD 配置字典
+
+        Returns:
+            能量门，未启用返回 None
+        """
+        gate_config = vad_config.get('energy_gate', {})
+        if not gate_config.get('enabled', True) or not vad_config.get('enabled', True):
+            return None
+
+        return AdaptiveEnergyVAD(gate_config)
+
+    def _create_vad_controller(self, vad_config: dict) -> Optional[VADController]:
+        """
+        根据配置创建 VAD 自适应控制器
+
+        Args:
+            vad_config: VAD 配置字典
+
+        Returns:
+            控制器，未启用返回 None
+        """
+        controller_config = vad_config.get('controller', {})
+        if not controller_config.get('enabled', True) or not self.vad.enabled:
+            return None
+
+        return VADController(controller_config, self.vad)
+
+    def _create_audio_source(self, audio_config: dict):
+        """
+        根据配置创建音频源
+
+        Args:
+            audio_config: 音频配置字典
+
+        Returns:
+            音频源（声卡捕获或文件回放）
+        """
+        source = audio_config.get('source', 'device')  # device / file
+
+        if source == 'file':
+            return FileAudioSource(audio_config)
+        if source != 'device':
+            logger.warning(f"无效的音频源: {source}，使用声卡捕获")
+
+        return AudioCapture(audio_config)
+
     def _load_config(self, config_path: str) -> dict:
         """
         加载配置文件
@@ -93,17 +270,70 @@ class GameTranslator:
                 # 获取音频块
                 audio_chunk = self.audio_capture.get_audio_chunk(timeout=0.5)
 
-                if audio_chunk is not None:
+                if audio_chunk is None:
+                    # 音频中断，结束当前语音片段
+                    if self.segmentation == 'utterance':
+                        segment = self.vad.flush()
+                        if segment is not None:
+                            self._enqueue_audio(segment, self.vad.segment_regions[0])
+                    elif self.segmentation == 'stream' and self.vad.is_speech:
+                        self.vad.flush()
+                        self._enqueue_audio(None)
+                    continue
+
+                alloc_tracker.add_audio(len(audio_chunk) / 16000)
+
+                # 流式带通滤波（滤波状态跨块延续，输出为新数组，之后可直接持有）
+                audio_chunk = self.audio_processor.filter_stream(audio_chunk)
+                self.stats['chunks'] += 1
+
+                # 模型未就绪时按策略丢弃（hold 时照常入队等待）
+                if self.not_ready_policy == 'drop' and not self.whisper_engine.ready.is_set():
+                    self.stats['dropped_not_ready'] += 1
+                    continue
+
+                # 按噪声底和空识别率调整 VAD 参数
+                if self.vad_controller:
+                    self.vad_controller.update(
+                        self.energy_gate.noise_floor if self.energy_gate else None
+                    )
+
+                # 能量门：明显静音的块不做 WebRTC VAD（语音进行中仍需 VAD 判断结束）
+                if self.energy_gate and not self.vad.is_speech:
+                    if not self.energy_gate.process(audio_chunk):
+                        self.stats['energy_rejected'] += 1
+                        if self.segmentation in ('utterance', 'stream'):
+                            self.vad.push_silence(audio_chunk)
+                        continue
+
+                if self.segmentation == 'utterance':
+                    # 流式 VAD：语音结束时输出完整片段
+                    in_speech, segments = self.vad.process_stream(audio_chunk)
+                    for segment, regions in zip(segments, self.vad.segment_regions):
+                        self._enqueue_audio(segment, regions)
+                    if not in_speech and not segments:
+                        self.stats['vad_rejected'] += 1
+                elif self.segmentation == 'stream':
+                    # 流式识别：语音期间逐块送入，语音结束时送入结束标记
+                    was_speech = self.vad.is_speech
+                    in_speech, segments = self.vad.process_stream(audio_chunk)
+                    if was_speech:
+                        self._enqueue_audio(audio_chunk)
+                    elif in_speech or segments:
+                        # 语音开始：送入预录缓冲和开始帧（含之前计入起始判定的语音帧），不只是本块
+                        self._enqueue_audio(self.vad.onset_audio(segments, audio_chunk))
+                    if (was_speech or segments) and not in_speech:
+                        self._enqueue_audio(None)
+                    elif not in_speech and not segments:
+                        self.stats['vad_rejected'] += 1
+                else:
                     # VAD 检测
                     is_speech, audio = self.vad.process(audio_chunk)
 
                     if is_speech:
-                        # 放入处理队列
-                        try:
-                            self.audio_queue.put(audio, timeout=0.1)
-                            logger.debug(f"音频块入队: {len(audio)/16000:.2f}s")
-                        except:
-                            logger.warning("音频队列已满，丢弃数据")
+                        self._enqueue_audio(audio)
+                    else:
+                        self.stats['vad_rejected'] += 1
 
         except Exception as e:
             logger.error(f"音频捕获线程异常: {e}")
@@ -111,109 +341,674 @@ class GameTranslator:
             self.audio_capture.stop()
             logger.info("音频捕获线程退出")
 
+    def _enqueue_audio(self, audio: Optional[np.ndarray],
+                       regions: Optional[List[Tuple[float, float]]] = None):
+        """
+        放入处理队列
+
+        Args:
+            audio: 音频块或语音片段（流式模式下 None 表示语音结束）
+            regions: 语音片段内的语音区间（按语音片段模式时提供，随片段一起入队）
+        """
+        try:
+            self.audio_queue.put(audio if regions is None else (audio, regions), timeout=0.1)
+            if audio is not None:
+                logger.debug(f"音频入队: {len(audio)/16000:.2f}s")
+        except Full:
+            self.stats['queue_dropped'] += 1
+            logger.warning("音频队列已满，丢弃数据")
+
     def _process_worker(self):
         """
         音频处理工作线程（ASR + 翻译）
         """
         logger.info("音频处理线程启动")
 
-        # 加载 Whisper 模型
-        self.whisper_engine.load_model()
+        # 等待 Whisper 模型就绪（未预加载时在此开始后台加载）
+        self.whisper_engine.load_async()
+        while not self.whisper_engine.wait_ready(timeout=0.5):
+            if self.whisper_engine.state == 'failed' or not self.is_running.is_set():
+                logger.error("Whisper 模型未就绪，处理线程退出")
+                return
+
+        # 两遍识别的最终识别线程随处理线程启停，卸载模型前先等它退出
+        if self.two_pass:
+            self._final_stop.clear()
+            self.final_thread = Thread(target=self._final_worker, daemon=True)
+            self.final_thread.start()
+
+        try:
+            if self.segmentation == 'utterance':
+                self._process_segments()
+            elif self.segmentation == 'stream':
+                self._process_stream()
+            else:
+                self._process_windows()
+
+        except Exception as e:
+            logger.error(f"音频处理线程异常: {e}")
+        finally:
+            if self.final_thread:
+                self._final_stop.set()
+                self.final_thread.join()
+            self.whisper_engine.unload_model()
+            logger.info("音频处理线程退出")
 
-        # 音频缓冲（累积多个块）
-        audio_buffer = []
+    def _process_windows(self):
+        """
+        固定窗口模式：累积语音块到 3 秒后识别（负载过高时缩短窗口）
+        """
+        # 音频缓冲（预处理结果直接写入预分配的窗口）
+        base_buffer_duration = 3.0  # 最大缓冲 3 秒
+        window = np.empty(int(base_buffer_duration * 16000) * 2, dtype=np.float32)
+        buffer_samples = 0
         buffer_duration = 0.0
-        max_buffer_duration = 3.0  # 最大缓冲 3 秒
+
+        while self.is_running.is_set():
+            try:
+                # 获取音频块
+                audio_chunk = self.audio_queue.get(timeout=0.5)
+
+                # 窗口不足时扩容
+                end = buffer_samples + len(audio_chunk)
+                if end > len(window):
+                    grown = np.empty(end * 2, dtype=np.float32)
+                    grown[:buffer_samples] = window[:buffer_samples]
+                    window = grown
+
+                # 预处理音频（结果写入窗口）
+                self.audio_processor.process(
+                    audio_chunk,
+                    normalize=True,
+                    remove_dc=True,
+                    bandpass=False,  # 捕获线程已流式滤波
+                    trim=False,
+                    out=window[buffer_samples:end]
+                )
+
+                # 添加到缓冲区
+                buffer_samples = end
+                buffer_duration = buffer_samples / 16000
+
+                # 如果缓冲区足够大，进行识别
+                max_buffer_duration = base_buffer_duration * self._window_scale()
+                if buffer_duration >= max_buffer_duration:
+                    # 语音识别 + 翻译（识别完成前窗口不会被覆盖）
+                    logger.info(f"开始识别音频: {buffer_duration:.2f}s")
+                    self._recognize_and_translate(window[:buffer_samples])
+
+                    # 清空缓冲区
+                    buffer_samples = 0
+                    buffer_duration = 0.0
+
+            except Empty:
+                # 超时，检查缓冲区
+                if buffer_duration >= 1.0:
+                    # 处理剩余音频
+                    self._recognize_and_translate(window[:buffer_samples])
+
+                    buffer_samples = 0
+                    buffer_duration = 0.0
+
+            except Exception as e:
+                logger.error(f"处理音频异常: {e}")
+                buffer_samples = 0
+                buffer_duration = 0.0
+
+    def _process_segments(self):
+        """
+        按语音片段模式：每个片段到达后立即识别
+
+        队列积压达到 batch_threshold 时一次取出多个片段批量识别。
+        启用线程池时改为并发识别。
+        """
+        if self.asr_pool:
+            self._process_segments_pooled()
+            return
+
+        batch_size = self.config['whisper'].get('batch_size', 8)
+        batch_threshold = self.config['whisper'].get('batch_threshold', 3)
+
+        while self.is_running.is_set():
+            try:
+                item = self.audio_queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            # 队列积压时取出更多片段（每项为 (片段, 语音区间)）；两遍识别逐段出草稿
+            batch = [item]
+            if batch_size > 1 and not self.two_pass and self.audio_queue.qsize() + 1 >= batch_threshold:
+                while len(batch) < batch_size:
+                    try:
+                        batch.append(self.audio_queue.get_nowait())
+                    except Empty:
+                        break
+
+            try:
+                # 预处理整个片段（片段由 VAD 新分配，原地处理不再复制）
+                # 每项为 (音频, 语音区间, 指纹, 缓存条目)，按采集顺序输出
+                items = []
+                for segment, segment_regions in batch:
+                    audio, segment_regions = self._preprocess_segment(segment, segment_regions)
+                    if len(audio) == 0:
+                        continue
+                    # 重复语音不识别，输出缓存的结果
+                    entry, fingerprint = self._lookup_fingerprint(audio)
+                    items.append((audio, segment_regions, fingerprint, entry))
+
+                misses = [item for item in items if item[3] is None]
+                results = iter([])
+                if len(misses) > 1:
+                    logger.info(f"开始批量识别: {len(misses)} 个片段")
+                    self.stats['batches'] += 1
+                    results = iter(self.whisper_engine.transcribe_batch(
+                        [item[0] for item in misses], speech_regions=[item[1] for item in misses]
+                    ))
+
+                for audio, segment_regions, fingerprint, entry in items:
+                    if entry is not None:
+                        self._publish_cached(entry)
+                    elif len(misses) == 1:
+                        logger.info(f"开始识别语音片段: {len(audio)/16000:.2f}s")
+                        self._recognize_and_translate(audio, segment_regions, fingerprint)
+                    else:
+                        self._handle_asr_result(audio, next(results), fingerprint)
+
+            except Exception as e:
+                logger.error(f"处理音频异常: {e}")
+
+    def _preprocess_segment(self, segment: np.ndarray,
+                            regions: Optional[List[Tuple[float, float]]]):
+        """
+        预处理语音片段（原地处理）：裁剪首尾静音，语音区间按裁剪起点平移
+
+        Args:
+            segment: VAD 输出的语音片段
+            regions: 片段内的语音区间（秒）
+
+        Returns:
+            (处理后的音频, 平移后的语音区间，无区间时为 None)
+        """
+        audio = self.audio_processor.process(
+            segment,
+            normalize=False,  # 裁剪后再标准化（音量按裁剪后的语音计算）
+            remove_dc=True,
+            bandpass=False,  # 捕获线程已流式滤波
+            trim=False,
+            out=segment
+        )
+
+        # 裁剪首尾静音，缩短识别时长
+        start, end = self.audio_processor.silence_bounds(audio)
+        audio = audio[start:end]
+        audio = self.audio_processor.normalize(audio, out=audio)
+
+        if regions:
+            offset = start / 16000
+            duration = len(audio) / 16000
+            regions = [(max(0.0, region_start - offset), min(region_end - offset, duration))
+                       for region_start, region_end in regions]
+            regions = [(region_start, region_end) for region_start, region_end in regions
+                       if region_end > region_start]
+        return audio, regions or None
+
+    def _process_segments_pooled(self):
+        """
+        线程池模式：片段轮询分配给识别线程，结果按采集顺序翻译输出
+
+        队列积压达到 batch_threshold 时一次取出多个片段，整批交给一个线程批量识别。
+        """
+        pool = self.asr_pool
+        pool.start()
+
+        batch_size = self.config['whisper'].get('batch_size', 8)
+        batch_threshold = self.config['whisper'].get('batch_threshold', 3)
 
         try:
             while self.is_running.is_set():
+                # 输出已按顺序完成的结果（缓存命中的片段在自己的位置输出）
+                while True:
+                    try:
+                        audio, asr_result, (fingerprint, entry) = pool.results.get_nowait()
+                    except Empty:
+                        break
+                    if entry is not None:
+                        self._publish_cached(entry)
+                    else:
+                        self._handle_asr_result(audio, asr_result, fingerprint)
+
+                # 每个线程最多积压两个片段，其余留在音频队列（计入负载控制）
+                if pool.pending() >= pool.size * 2:
+                    time.sleep(0.01)
+                    continue
+
                 try:
-                    # 获取音频块
-                    audio_chunk = self.audio_queue.get(timeout=0.5)
+                    item = self.audio_queue.get(timeout=0.05)
+                except Empty:
+                    continue
 
-                    # 预处理音频
+                # 队列积压时取出更多片段（每项为 (片段, 语音区间)）
+                batch = [item]
+                if batch_size > 1 and self.audio_queue.qsize() + 1 >= batch_threshold:
+                    while len(batch) < batch_size:
+                        try:
+                            batch.append(self.audio_queue.get_nowait())
+                        except Empty:
+                            break
+
+                try:
+                    # 连续的未命中片段整批提交，命中缓存的片段在自己的位置占位
+                    misses = []
+                    for segment, regions in batch:
+                        audio, regions = self._preprocess_segment(segment, regions)
+                        if len(audio) == 0:
+                            continue
+                        entry, fingerprint = self._lookup_fingerprint(audio)
+                        if entry is not None:
+                            self._submit_pooled(misses)
+                            misses = []
+                            pool.skip(audio, (fingerprint, entry))
+                        else:
+                            misses.append((audio, regions, (fingerprint, None)))
+                    self._submit_pooled(misses)
+                except Exception as e:
+                    logger.error(f"处理音频异常: {e}")
+        finally:
+            pool.stop()
+
+    def _submit_pooled(self, items: List[Tuple]):
+        """
+        提交片段到线程池（多个片段时批量识别）
+
+        Args:
+            items: [(音频, 语音区间, (指纹, None))]
+        """
+        if len(items) > 1:
+            logger.info(f"开始批量识别: {len(items)} 个片段")
+            with self._stats_lock:
+                self.stats['batches'] += 1
+        self.asr_pool.submit_batch(items)
+
+    def _process_stream(self):
+        """
+        流式识别模式：语音块逐块送入流式处理器（LocalAgreement 或重叠窗口），
+        未确认的文本（partial 事件）作为草稿输出，已确认的句子（final 事件）原地替换草稿
+        """
+        # 当前句子的片段 ID 和已显示的草稿文本
+        segment_id = None
+        shown = ''
+
+        while self.is_running.is_set():
+            try:
+                audio_chunk = self.audio_queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            try:
+                if audio_chunk is None:
+                    # 语音结束：确认剩余文本
+                    event = self.stream_processor.flush()
+                else:
+                    # 预处理（捕获线程输出为新数组，原地处理）
                     processed = self.audio_processor.process(
                         audio_chunk,
                         normalize=True,
                         remove_dc=True,
-                        bandpass=True,
-                        trim=False
+                        bandpass=False,  # 捕获线程已流式滤波
+                        trim=False,
+                        out=audio_chunk
                     )
+                    self.stats['audio_seconds'] += len(processed) / 16000
+                    event = self.stream_processor.add_audio(processed)
+
+                if event is None:
+                    if audio_chunk is None and segment_id is not None:
+                        # 语音结束且没有可确认的文本：删除草稿
+                        self._publish('', None, 'unknown', 0.0, segment_id=segment_id)
+                        segment_id, shown = None, ''
+                    continue
 
-                    # 添加到缓冲区
-                    audio_buffer.append(processed)
-                    buffer_duration += len(processed) / 16000
+                if event['type'] == 'partial':
+                    logger.debug(f"流式识别: {event['text']} | {event['pending']}")
+                    # 已确认和未确认的文本一起作为草稿（只过滤已知幻觉文本）
+                    text = f"{event['text']} {event['pending']}".strip()
+                    if not text or text == shown:
+                        continue
+                    if self.result_filter and self.result_filter.is_hallucination(text):
+                        continue
+                    if segment_id is None:
+                        segment_id = next(self._segment_ids)
+                    self._translate_and_publish(
+                        text, event['language'], event['language_probability'],
+                        segment_id=segment_id, final=False
+                    )
+                    shown = text
+                    continue
 
-                    # 如果缓冲区足够大，进行识别
-                    if buffer_duration >= max_buffer_duration:
-                        # 合并音频
-                        full_audio = np.concatenate(audio_buffer)
+                # final 事件替换当前草稿，之后的文本属于下一句
+                final_id, segment_id, shown = segment_id, None, ''
 
-                        # 语音识别
-                        logger.info(f"开始识别音频: {buffer_duration:.2f}s")
-                        asr_result = self.whisper_engine.transcribe(full_audio)
+                if self.result_filter and not self.result_filter.check_text(event['text']):
+                    if final_id is not None:
+                        self._publish('', None, event['language'], 0.0, segment_id=final_id)
+                    continue
 
-                        if asr_result['text']:
-                            # 翻译
-                            translated = self.translator.translate(
-                                asr_result['text'],
-                                asr_result['language']
-                            )
+                self._translate_and_publish(
+                    event['text'], event['language'], event['language_probability'],
+                    segment_id=final_id
+                )
 
-                            # 放入结果队列
-                            result = {
-                                'original': asr_result['text'],
-                                'translated': translated or asr_result['text'],
-                                'language': asr_result['language'],
-                                'confidence': asr_result.get('language_probability', 0.0)
-                            }
+            except Exception as e:
+                logger.error(f"流式识别异常: {e}")
 
-                            self.result_queue.put(result)
+    def _recognize_and_translate(self, audio: np.ndarray,
+                                 regions: Optional[List[Tuple[float, float]]] = None,
+                                 fingerprint: Optional[Fingerprint] = None):
+        """
+        识别一段音频并翻译，结果放入结果队列
 
-                            logger.info(
-                                f"识别结果: [{asr_result['language']}] {asr_result['text'][:50]}... "
-                                f"-> {translated[:50] if translated else '(未翻译)'}..."
-                            )
+        两遍识别时先用草稿模型识别并输出，再把片段交给最终识别线程。
 
-                        # 清空缓冲区
-                        audio_buffer.clear()
-                        buffer_duration = 0.0
+        Args:
+            audio: 预处理后的音频 (float32, 16kHz)
+            regions: 上游 VAD 给出的语音区间（秒）
+            fingerprint: 音频指纹（识别后写入重复语音缓存）
+        """
+        if self.two_pass:
+            self._recognize_draft(audio, regions, fingerprint)
+            return
 
-                except Empty:
-                    # 超时，检查缓冲区
-                    if audio_buffer and buffer_duration >= 1.0:
-                        # 处理剩余音频
-                        full_audio = np.concatenate(audio_buffer)
-                        asr_result = self.whisper_engine.transcribe(full_audio)
-
-                        if asr_result['text']:
-                            translated = self.translator.translate(
-                                asr_result['text'],
-                                asr_result['language']
-                            )
+        asr_result = self.whisper_engine.transcribe(audio, speech_regions=regions)
+        self._handle_asr_result(audio, asr_result, fingerprint)
 
-                            result = {
-                                'original': asr_result['text'],
-                                'translated': translated or asr_result['text'],
-                                'language': asr_result['language'],
-                                'confidence': asr_result.get('language_probability', 0.0)
-                            }
+    def _recognize_draft(self, audio: np.ndarray,
+                         regions: Optional[List[Tuple[float, float]]],
+                         fingerprint: Optional[Fingerprint]):
+        """
+        两遍识别第一遍：草稿模型识别并立即输出草稿字幕，片段排入最终识别队列
 
-                            self.result_queue.put(result)
+        Args:
+            audio: 预处理后的音频
+            regions: 语音区间（秒）
+            fingerprint: 音频指纹
+        """
+        started = time.time()
+        segment_id = next(self._segment_ids)
+        draft = self.whisper_engine.transcribe(audio, speech_regions=regions, draft=True)
+        self.two_pass_stats['draft_time'] += draft.get('process_time', 0.0)
+
+        # 草稿只过滤已知幻觉文本，其余由最终识别的结果过滤决定
+        text = draft['text']
+        if text and self.result_filter and self.result_filter.is_hallucination(text):
+            text = ''
+
+        if text:
+            self._translate_and_publish(
+                text, draft['language'], draft.get('language_probability', 0.0),
+                segment_id=segment_id, final=False
+            )
+            self.two_pass_stats['drafts'] += 1
+            self.two_pass_stats['time_to_first'] += time.time() - started
+        else:
+            self.two_pass_stats['drafts_dropped'] += 1
+
+        # 固定窗口模式的音频缓冲会被复用，排队前复制
+        if self.segmentation == 'fixed':
+            audio = audio.copy()
+            alloc_tracker.record('two_pass_audio', audio.nbytes, copy=True)
+
+        item = (segment_id, audio, regions, fingerprint, bool(text), started)
+        while self.is_running.is_set():
+            try:
+                self.final_queue.put(item, timeout=0.5)
+                return
+            except Full:
+                continue
+
+    def _final_worker(self):
+        """
+        两遍识别第二遍：配置的模型重新识别片段，结果替换草稿字幕
+        """
+        logger.info("最终识别线程启动")
+
+        while not self._final_stop.is_set():
+            try:
+                segment_id, audio, regions, fingerprint, has_draft, started = self.final_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            if self._final_stop.is_set():
+                break
+
+            try:
+                asr_result = self.whisper_engine.transcribe(audio, speech_regions=regions)
+                if self._handle_asr_result(audio, asr_result, fingerprint, segment_id=segment_id):
+                    self.two_pass_stats['finals'] += 1
+                    self.two_pass_stats['time_to_final'] += time.time() - started
+                    if has_draft:
+                        self.two_pass_stats['replaced'] += 1
+                else:
+                    self.two_pass_stats['finals_empty'] += 1
+                    if has_draft:
+                        # 最终识别判定为非语音：删除草稿
+                        self._publish('', None, asr_result['language'], 0.0, segment_id=segment_id)
+                        self.two_pass_stats['removed'] += 1
+
+            except Exception as e:
+                logger.error(f"最终识别异常: {e}")
+
+        logger.info("最终识别线程退出")
+
+    def _lookup_fingerprint(self, audio: np.ndarray) -> Tuple[Optional[Dict], Optional[Fingerprint]]:
+        """
+        查询重复语音缓存（命中的结果由调用方按采集顺序用 _publish_cached 输出）
 
-                        audio_buffer.clear()
-                        buffer_duration = 0.0
+        Args:
+            audio: 预处理后的语音片段
 
-                except Exception as e:
-                    logger.error(f"处理音频异常: {e}")
-                    audio_buffer.clear()
-                    buffer_duration = 0.0
+        Returns:
+            (命中的缓存条目或 None, 音频指纹)；未启用缓存时指纹为 None
+        """
+        if not self.fingerprint_cache:
+            return None, None
+        return self.fingerprint_cache.lookup(audio)
 
-        except Exception as e:
-            logger.error(f"音频处理线程异常: {e}")
-        finally:
-            self.whisper_engine.unload_model()
-            logger.info("音频处理线程退出")
+    def _publish_cached(self, entry: Dict):
+        """
+        输出重复语音缓存中的识别和翻译结果
+
+        Args:
+            entry: 缓存条目
+        """
+        translated = entry['translation']
+        if translated is None:
+            # 缓存来自其他目标语言：只重新翻译
+            translated = self.translator.translate(entry['text'], entry['language'])
+            self.fingerprint_cache.update_translation(entry, translated)
+
+        self._publish(entry['text'], translated, entry['language'], entry['language_probability'])
+
+    def _handle_asr_result(self, audio: np.ndarray, asr_result: Dict,
+                           fingerprint: Optional[Fingerprint] = None,
+                           segment_id: Optional[int] = None) -> bool:
+        """
+        统计识别结果并翻译输出
+
+        Args:
+            audio: 识别的音频
+            asr_result: 识别结果字典
+            fingerprint: 查询缓存时计算的音频指纹（None 时不写入缓存）
+            segment_id: 片段 ID（两遍识别时用于替换草稿字幕）
+
+        Returns:
+            是否输出了结果
+        """
+        # 两遍识别时处理线程和最终识别线程都会到这里，统计和控制器更新持锁（翻译不持锁）
+        with self._stats_lock:
+            self.stats['asr_calls'] += 1
+            self.stats['asr_time'] += asr_result.get('process_time', 0.0)
+            if asr_result.get('timed_out'):
+                self.stats['asr_timeouts'] += 1
+            if asr_result.get('budget_limited'):
+                self.stats['asr_budget_limited'] += 1
+            self.stats['audio_seconds'] += len(audio) / 16000
+
+            # 丢弃非语音和幻觉片段（空结果计入 VAD 误触发）
+            if self.result_filter:
+                asr_result = self.result_filter.filter(asr_result)
+
+            # 负载自适应
+            if self.quality_controller and 'rtf' in asr_result:
+                if self.quality_controller.record(asr_result['rtf'], self.audio_queue.qsize()):
+                    self._apply_window_scale()
+
+            if self.vad_controller:
+                self.vad_controller.record_asr_result(not asr_result['text'])
+
+        if not asr_result['text']:
+            return False
+
+        translated = self._translate_and_publish(
+            asr_result['text'],
+            asr_result['language'],
+            asr_result.get('language_probability', 0.0),
+            segment_id=segment_id,
+            asr_time=asr_result.get('process_time')
+        )
+
+        # 查询过缓存的语音片段，完整识别（未超时、解码未被预算收紧）后写入重复语音缓存
+        # （固定窗口的切分位置不会重复，不写入）
+        if (fingerprint is not None and not asr_result.get('timed_out')
+                and not asr_result.get('budget_limited')):
+            # translate 任务输出的是英语，按英语缓存（换目标语言后从英语翻译）
+            self.fingerprint_cache.add(
+                fingerprint,
+                asr_result['text'],
+                'en' if self.route_planner.asr_translate else asr_result['language'],
+                asr_result.get('language_probability', 0.0),
+                translated
+            )
+        return True
+
+    def _window_scale(self) -> float:
+        """当前识别窗口的缩放比例（负载自适应）"""
+        return self.quality_controller.window_scale if self.quality_controller else 1.0
+
+    def _apply_window_scale(self):
+        """
+        按负载等级调整 VAD 语音片段的最大时长
+        """
+        if not self.vad.enabled:
+            return
+
+        max_duration = self.vad.max_segment_duration * self._window_scale()
+        self.vad.max_segment_frames = int(max_duration * 1000 / self.vad.frame_duration_ms)
+
+    def _translate_and_publish(self, text: str, language: str, confidence: float,
+                               segment_id: Optional[int] = None, final: bool = True,
+                               asr_time: Optional[float] = None) -> Optional[str]:
+        """
+        按翻译路径翻译识别文本，结果放入结果队列
+
+        Args:
+            text: 识别文本
+            language: 源语言
+            confidence: 语言置信度
+            segment_id: 片段 ID（两遍识别）
+            final: 是否为最终结果（False 为草稿）
+            asr_time: 识别耗时（秒，计入路径统计）
+
+        Returns:
+            翻译结果
+        """
+        if not text:
+            return None
+
+        # 翻译（Whisper 已输出目标语言或源语言即目标语言时跳过）
+        route = self.route_planner.plan(language)
+        start_time = time.time()
+        if route == ROUTE_TRANSCRIBE_MT:
+            translated = self.translator.translate(text, language)
+        else:
+            translated = text
+        if final:
+            self.route_planner.record(route, asr_time, time.time() - start_time)
+
+        self._publish(text, translated, language, confidence, segment_id, final)
+        return translated
+
+    def _publish(self, text: str, translated: Optional[str], language: str, confidence: float,
+                 segment_id: Optional[int] = None, final: bool = True):
+        """
+        识别和翻译结果放入结果队列
+
+        Args:
+            text: 识别文本（两遍识别的最终结果为空时表示删除草稿）
+            translated: 翻译结果
+            language: 源语言
+            confidence: 语言置信度
+            segment_id: 片段 ID（两遍识别）
+            final: 是否为最终结果（False 为草稿）
+        """
+        # 放入结果队列
+        result = {
+            'original': text,
+            'translated': translated or text,
+            'language': language,
+            'confidence': confidence,
+            'segment_id': segment_id,
+            'final': final
+        }
+
+        self.result_queue.put(result)
+        if final and text:
+            with self._stats_lock:
+                self.stats['results'] += 1
+
+        logger.info(
+            f"{'识别结果' if final else '草稿结果'}: [{language}] {text[:50]}... "
+            f"-> {translated[:50] if translated else '(未翻译)'}..."
+        )
+
+    def get_stats(self) -> Dict:
+        """
+        获取运行统计信息
+
+        Returns:
+            统计信息字典
+        """
+        stats = dict(self.stats)
+        stats['audio_source'] = self.audio_capture.get_stats()
+        stats['asr_engine'] = self.whisper_engine.get_status()
+        stats['routes'] = self.route_planner.get_stats()
+        if self.quality_controller:
+            stats['asr_quality'] = self.quality_controller.get_stats()
+        if self.asr_pool:
+            stats['asr_pool'] = self.asr_pool.get_stats()
+        if self.two_pass:
+            two_pass = dict(self.two_pass_stats)
+            two_pass['avg_time_to_first'] = (
+                two_pass['time_to_first'] / two_pass['drafts'] if two_pass['drafts'] else 0.0
+            )
+            two_pass['avg_time_to_final'] = (
+                two_pass['time_to_final'] / two_pass['finals'] if two_pass['finals'] else 0.0
+            )
+            two_pass['pending'] = self.final_queue.qsize()
+            stats['two_pass'] = two_pass
+        if self.result_filter:
+            stats['asr_filter'] = self.result_filter.get_stats()
+        if self.fingerprint_cache:
+            stats['fingerprint_cache'] = self.fingerprint_cache.get_stats()
+        if self.energy_gate:
+            stats['noise_floor'] = self.energy_gate.noise_floor
+        if self.vad_controller:
+            stats['vad_controller'] = self.vad_controller.get_stats()
+        if self.stream_processor:
+            stats['streaming'] = self.stream_processor.get_stats()
+        if self.whisper_engine.language_tracker:
+            stats['language_tracking'] = self.whisper_engine.language_tracker.get_stats()
+        if alloc_tracker.enabled:
+            stats['allocations'] = alloc_tracker.report()
+        return stats
 
     def _display_worker(self):
         """
@@ -227,11 +1022,26 @@ class GameTranslator:
                     # 获取结果
                     result = self.result_queue.get(timeout=0.5)
 
-                    # 显示字幕
-                    if self.subtitle_window:
+                    # 显示字幕（同一片段的新草稿和最终结果原地替换草稿，已清除时作为新行显示）
+                    if not self.subtitle_window:
+                        continue
+                    segment_id = result.get('segment_id')
+                    if segment_id is not None:
+                        if not result['translated']:
+                            self.subtitle_window.remove_subtitle(segment_id)
+                        elif not self.subtitle_window.update_subtitle(
+                                segment_id, result['translated'], result['language'],
+                                draft=not result['final']):
+                            self.subtitle_window.add_subtitle(
+                                result['translated'], result['language'],
+                                segment_id=segment_id, draft=not result['final']
+                            )
+                    else:
                         self.subtitle_window.add_subtitle(
                             result['translated'],
-                            result['language']
+                            result['language'],
+                            segment_id=segment_id,
+                            draft=not result['final']
                         )
 
                 except Empty:
@@ -290,6 +1100,19 @@ class GameTranslator:
         if self.display_thread:
             self.display_thread.join(timeout=2.0)
 
+        if self.fingerprint_cache:
+            self.fingerprint_cache.save()
+
+        if alloc_tracker.enabled:
+            report = alloc_tracker.report()
+            per_second = report['per_audio_second']
+            if per_second:
+                logger.info(
+                    f"内存分配统计: 每秒音频 {per_second['allocations']:.1f} 次分配 "
+                    f"({per_second['allocated_bytes'] / 1024:.1f} KB), "
+                    f"{per_second['copies']:.1f} 次复制 ({per_second['copied_bytes'] / 1024:.1f} KB)"
+                )
+
         logger.info("翻译器已停止")
 
     def toggle_capture(self):
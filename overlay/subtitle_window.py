@@ -18,16 +18,23 @@ except ImportError:
 class SubtitleLabel(QLabel):
     """单条字幕标签"""
 
-    def __init__(self, text: str, style_config: dict, parent=None):
+    def __init__(self, text: str, style_config: dict, parent=None, draft: bool = False):
         super().__init__(text, parent)
-        self._apply_style(style_config)
+        self.style_config = style_config
+        self._apply_style(style_config, draft)
 
-    def _apply_style(self, config: dict):
-        """应用字幕样式"""
+    def set_draft(self, draft: bool):
+        """切换草稿/最终样式"""
+        self._apply_style(self.style_config, draft)
+
+    def _apply_style(self, config: dict, draft: bool = False):
+        """应用字幕样式（草稿使用 draft_text_color）"""
         font_family = config.get('font_family', 'Microsoft YaHei')
         font_size = config.get('font_size', 24)
         font_weight = config.get('font_weight', 'bold')
         text_color = config.get('text_color', '#FFFFFF')
+        if draft:
+            text_color = config.get('draft_text_color', '#CCCCCC')
         outline_color = config.get('outline_color', '#000000')
         outline_width = config.get('outline_width', 2)
         bg_color = config.get('background_color', 'rgba(0, 0, 0, 0.6)')
@@ -83,7 +90,7 @@ class SubtitleWindow(QWidget):
         self.stay_duration = self.display_config.get('stay_duration', 5.0) * 1000  # 转为毫秒
         self.show_language_tag = self.display_config.get('show_language_tag', True)
 
-        # 字幕队列
+        # 字幕队列: (片段 ID, 显示文本, 是否草稿)
         self.subtitle_queue = deque(maxlen=self.max_lines)
         self.subtitle_labels: List[SubtitleLabel] = []
 
@@ -162,28 +169,24 @@ class SubtitleWindow(QWidget):
         self.move(x, y)
         logger.debug(f"窗口位置: ({x}, {y})")
 
-    def add_subtitle(self, text: str, language: Optional[str] = None):
+    def add_subtitle(self, text: str, language: Optional[str] = None,
+                     segment_id: Optional[int] = None, draft: bool = False):
         """
         添加字幕
 
         Args:
             text: 字幕文本
             language: 语言代码（用于显示标签）
+            segment_id: 片段 ID（之后可按 ID 替换或删除这一行）
+            draft: 是否为草稿（两遍识别的第一遍结果）
         """
         if not text or not text.strip():
             return
 
-        # 添加语言标签
-        if self.show_language_tag and language:
-            display_text = f"[{language.upper()}] {text}"
-        else:
-            display_text = text
-
-        # 高亮关键词
-        display_text = self._highlight_keywords(display_text)
+        display_text = self._format_text(text, language)
 
         # 添加到队列
-        self.subtitle_queue.append(display_text)
+        self.subtitle_queue.append((segment_id, display_text, draft))
 
         # 更新显示
         self._update_display()
@@ -197,6 +200,78 @@ class SubtitleWindow(QWidget):
 
         logger.debug(f"添加字幕: {display_text}")
 
+    def update_subtitle(self, segment_id: int, text: str, language: Optional[str] = None,
+                        draft: bool = False) -> bool:
+        """
+        原地替换指定片段的字幕（新草稿或最终结果替换草稿，不改变行的位置和停留时间）
+
+        Args:
+            segment_id: 片段 ID
+            text: 新的字幕文本
+            language: 语言代码
+            draft: 新文本是否仍为草稿（流式识别的未确认文本）
+
+        Returns:
+            是否找到该行（已被自动清除时返回 False）
+        """
+        for i, (item_id, _, _) in enumerate(self.subtitle_queue):
+            if item_id != segment_id:
+                continue
+
+            display_text = self._format_text(text, language)
+            self.subtitle_queue[i] = (segment_id, display_text, draft)
+            if i < len(self.subtitle_labels):
+                label = self.subtitle_labels[i]
+                label.setText(display_text)
+                label.set_draft(draft)
+            else:
+                self._update_display()
+
+            logger.debug(f"替换字幕: {display_text}")
+            return True
+
+        return False
+
+    def remove_subtitle(self, segment_id: int) -> bool:
+        """
+        删除指定片段的字幕（草稿在最终识别中被判定为非语音时）
+
+        Args:
+            segment_id: 片段 ID
+
+        Returns:
+            是否找到该行
+        """
+        for item in self.subtitle_queue:
+            if item[0] == segment_id:
+                self.subtitle_queue.remove(item)
+                self._update_display()
+                if not self.subtitle_queue:
+                    self.clear_timer.stop()
+                    self.subtitle_cleared.emit()
+                return True
+        return False
+
+    def _format_text(self, text: str, language: Optional[str]) -> str:
+        """
+        生成显示文本（语言标签 + 关键词高亮）
+
+        Args:
+            text: 字幕文本
+            language: 语言代码
+
+        Returns:
+            显示文本（HTML）
+        """
+        # 添加语言标签
+        if self.show_language_tag and language:
+            display_text = f"[{language.upper()}] {text}"
+        else:
+            display_text = text
+
+        # 高亮关键词
+        return self._highlight_keywords(display_text)
+
     def _highlight_keywords(self, text: str) -> str:
         """
         高亮关键词
@@ -240,8 +315,8 @@ class SubtitleWindow(QWidget):
         self.subtitle_labels.clear()
 
         # 创建新标签
-        for subtitle_text in self.subtitle_queue:
-            label = SubtitleLabel(subtitle_text, self.style_config, self)
+        for _, subtitle_text, draft in self.subtitle_queue:
+            label = SubtitleLabel(subtitle_text, self.style_config, self, draft=draft)
             self.layout.addWidget(label)
             self.subtitle_labels.append(label)
 
@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+性能测试脚本 - 回放音频文件测量流水线和各模块的吞吐
+
+用法:
+    python scripts/benchmark.py pipeline <音频文件> [--pacing fast|realtime]
+    python scripts/benchmark.py vad [--duration 60]
+    python scripts/benchmark.py processor [--durations 1 5 10 30 60]
+    python scripts/benchmark.py resample [--rates 48000 44100]
+    python scripts/benchmark.py asr-batch [--file 音频文件] [--batch-sizes 1 2 4 8]
+    python scripts/benchmark.py asr-vad [--file 音频文件]
+    python scripts/benchmark.py asr-pool [--file 音频文件] [--configs 1 2 4]
+    python scripts/benchmark.py mel-cache [--hops 0.5 1 2] [--window 10]
+    python scripts/benchmark.py model-routing [--file 英语音频] [--models base small]
+"""
+import sys
+import time
+import argparse
+import yaml
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Tuple
+from loguru import logger
+
+# 项目根目录
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+
+def load_config(config_path: str) -> dict:
+    """
+    加载配置文件
+
+    Args:
+        config_path: 配置文件路径
+
+    Returns:
+        配置字典
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def bench_pipeline(args):
+    """
+    端到端流水线测试（文件回放 -> VAD -> ASR -> 翻译）
+    """
+    from main import GameTranslator
+
+    config = load_config(args.config)
+    config['audio']['source'] = 'file'
+    config['audio']['file_path'] = args.file
+    config['audio']['pacing'] = args.pacing
+    config['audio']['loop'] = False
+    config.setdefault('performance', {})['enable_profiling'] = args.profile
+
+    translator = GameTranslator(config=config)
+
+    start_time = time.time()
+    translator.start()
+
+    # 等待回放结束且处理队列清空
+    source = translator.audio_capture
+    while not source.finished.wait(timeout=0.5):
+        pass
+    while not translator.audio_queue.empty():
+        time.sleep(0.1)
+
+    # 等待处理线程消费缓冲区尾部
+    time.sleep(args.settle)
+    translator.stop()
+    elapsed = time.time() - start_time
+
+    stats = translator.get_stats()
+    audio_duration = source.total_chunks * source.chunk_duration
+
+    logger.info("-" * 60)
+    logger.info(f"音频时长: {audio_duration:.2f}s, 总耗时: {elapsed:.2f}s "
+                f"({audio_duration / elapsed:.2f}x 实时)")
+    logger.info(f"ASR 调用: {stats['asr_calls']} 次, 识别音频 {stats['audio_seconds']:.2f}s, "
+                f"ASR 耗时 {stats['asr_time']:.2f}s")
+    logger.info(f"输出结果: {stats['results']} 条")
+    for route, entry in stats['routes'].items():
+        logger.info(f"  [{route}] {entry['count']} 条, 识别 {entry['avg_asr_time'] * 1000:.0f}ms, "
+                    f"翻译 {entry['avg_mt_time'] * 1000:.0f}ms, 合计 {entry['avg_total_time'] * 1000:.0f}ms")
+
+    if 'allocations' in stats:
+        for stage, entry in stats['allocations']['stages'].items():
+            logger.info(f"  [{stage}] 分配 {entry['allocations']} 次 ({entry['allocated_bytes'] / 1024:.1f} KB), "
+                        f"复制 {entry['copies']} 次 ({entry['copied_bytes'] / 1024:.1f} KB)")
+
+
+def synthetic_audio(duration: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    生成测试音频（语音频段谐波 + 噪声，交替出现静音）
+
+    Args:
+        duration: 时长（秒）
+        sample_rate: 采样率
+        seed: 随机种子
+
+    Returns:
+        音频数据 (float32)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    voiced = 0.2 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 660 * t)
+    envelope = (np.sin(2 * np.pi * 0.25 * t) > 0).astype(np.float64)
+    audio = voiced * envelope + 0.01 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def measure(func, repeat: int = 3) -> float:
+    """
+    多次运行取最短耗时
+
+    Args:
+        func: 被测函数
+        repeat: 重复次数
+
+    Returns:
+        最短耗时（秒）
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _legacy_vad_frames(audio: np.ndarray, frame_size: int) -> list:
+    """
+    旧版 VAD 分帧：逐帧切片 + tobytes，再逐帧转回 float32
+    """
+    audio_int16 = (audio * 32767).astype(np.int16)
+
+    frames = []
+    for i in range(0, len(audio_int16), frame_size):
+        frame = audio_int16[i:i + frame_size]
+        if len(frame) == frame_size:
+            frames.append(frame.tobytes())
+
+    return [(frame, np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32767.0)
+            for frame in frames]
+
+
+def bench_vad(args):
+    """
+    VAD 分帧微基准（帧/秒，新旧实现对比）
+    """
+    from audio.vad import VoiceActivityDetector
+
+    vad = VoiceActivityDetector({'enabled': True, 'aggressiveness': 3}, sample_rate=16000)
+    audio = synthetic_audio(args.duration)
+    chunk_size = int(16000 * args.chunk_duration)
+    chunks = [audio[i:i + chunk_size] for i in range(0, len(audio), chunk_size)]
+    total_frames = len(audio) // vad.frame_size
+
+    def legacy_framing():
+        for chunk in chunks:
+            _legacy_vad_frames(chunk, vad.frame_size)
+
+    def new_framing():
+        vad.reset()
+        for chunk in chunks:
+            frames = vad._split_frames(chunk, carry=True)
+            frames_float = frames.astype(np.float32)
+            frames_float /= 32767.0
+            for frame, frame_array in zip(vad._frame_buffers(frames), frames_float):
+                pass
+
+    def legacy_detect():
+        for chunk in chunks:
+            for frame, _ in _legacy_vad_frames(chunk, vad.frame_size):
+                vad.backend.is_speech(frame, 16000)
+
+    def new_detect():
+        vad.reset()
+        for chunk in chunks:
+            frames = vad._split_frames(chunk, carry=True)
+            frames_float = frames.astype(np.float32)
+            frames_float /= 32767.0
+            for frame, frame_array in zip(vad._frame_buffers(frames), frames_float):
+                vad.backend.is_speech(frame, 16000)
+
+    logger.info(f"测试音频: {args.duration:.0f}s, 块长 {args.chunk_duration}s, 共 {total_frames} 帧")
+    for name, legacy, new in [('分帧', legacy_framing, new_framing),
+                              ('分帧 + WebRTC VAD', legacy_detect, new_detect)]:
+        legacy_time = measure(legacy, args.repeat)
+        new_time = measure(new, args.repeat)
+        logger.info(
+            f"{name}: 旧版 {total_frames / legacy_time:,.0f} 帧/s, "
+            f"新版 {total_frames / new_time:,.0f} 帧/s ({legacy_time / new_time:.2f}x)"
+        )
+
+
+def _legacy_reduce_noise(audio: np.ndarray, sample_rate: int, noise_level: float = 0.01) -> np.ndarray:
+    """
+    旧版噪声门：逐帧 RMS + 逐帧重叠相加
+    """
+    frame_length = int(sample_rate * 0.02)
+    hop_length = frame_length // 2
+
+    frames = []
+    for i in range(0, len(audio) - frame_length, hop_length):
+        frame = audio[i:i + frame_length]
+        rms = np.sqrt(np.mean(frame ** 2))
+        if rms < noise_level:
+            frame = frame * 0.1
+        frames.append(frame)
+
+    if not frames:
+        return audio
+
+    output = np.zeros(len(audio), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        start = i * hop_length
+        end = start + len(frame)
+        if end <= len(output):
+            output[start:end] += frame
+
+    return output
+
+
+def _legacy_trim_silence(audio: np.ndarray, sample_rate: int, threshold: float = 0.01) -> np.ndarray:
+    """
+    旧版静音裁剪：逐帧 RMS
+    """
+    frame_length = int(sample_rate * 0.02)
+    energy = np.array([
+        np.sqrt(np.mean(audio[i:i + frame_length] ** 2))
+        for i in range(0, len(audio) - frame_length, frame_length)
+    ])
+
+    non_silent = np.where(energy > threshold)[0]
+    if len(non_silent) == 0:
+        return audio
+
+    start_sample = non_silent[0] * frame_length
+    end_sample = min((non_silent[-1] + 1) * frame_length, len(audio))
+    return audio[start_sample:end_sample]
+
+
+def bench_processor(args):
+    """
+    噪声门和静音裁剪基准（新旧实现对比，并校验结果一致）
+    """
+    from audio.processor import AudioProcessor
+
+    processor = AudioProcessor(sample_rate=16000)
+
+    for duration in args.durations:
+        # 首尾加静音，确保裁剪有效
+        silence = np.zeros(int(16000 * 0.5), dtype=np.float32)
+        audio = np.concatenate([silence, synthetic_audio(duration), silence])
+
+        for name, legacy, new in [
+            ('噪声门', lambda: _legacy_reduce_noise(audio, 16000), lambda: processor.reduce_noise_simple(audio)),
+            ('静音裁剪', lambda: _legacy_trim_silence(audio, 16000), lambda: processor.trim_silence(audio)),
+        ]:
+            expected = legacy()
+            actual = new()
+            if expected.shape != actual.shape:
+                logger.error(f"{name} {duration:.0f}s: 输出长度不一致 {expected.shape} != {actual.shape}")
+                continue
+            max_diff = float(np.max(np.abs(expected - actual))) if len(actual) else 0.0
+
+            legacy_time = measure(legacy, args.repeat)
+            new_time = measure(new, args.repeat)
+            logger.info(
+                f"{name} {duration:5.0f}s: 旧版 {legacy_time * 1000:8.2f}ms, "
+                f"新版 {new_time * 1000:7.2f}ms ({legacy_time / new_time:6.1f}x), 最大误差 {max_diff:.2e}"
+            )
+
+
+def bench_resample(args):
+    """
+    重采样基准：旧版逐块 FFT 重采样 vs 流式多相重采样
+
+    以整段 resample_poly 的结果为参考，统计逐块处理引入的误差（块边界失真）。
+    """
+    from math import gcd
+    from scipy import signal
+    from audio.processor import AudioProcessor, StreamingResampler
+
+    for rate in args.rates:
+        rng = np.random.default_rng(0)
+        t = np.arange(int(rate * args.duration)) / rate
+        audio = (0.2 * np.sin(2 * np.pi * 440 * t) + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+        chunk_size = int(rate * args.chunk_duration)
+        chunks = [audio[i:i + chunk_size] for i in range(0, len(audio), chunk_size)]
+
+        g = gcd(rate, 16000)
+        reference = signal.resample_poly(audio.astype(np.float64), 16000 // g, rate // g)
+
+        # 旧版：AudioProcessor.resample 原实现（逐块 FFT）
+        def legacy():
+            return np.concatenate([
+                signal.resample(chunk, int(len(chunk) * 16000 / rate)) for chunk in chunks
+            ])
+
+        resampler = StreamingResampler(rate, 16000)
+
+        def streaming():
+            resampler.reset()
+            return np.concatenate([resampler.process(chunk) for chunk in chunks])
+
+        for name, func in [('逐块 FFT (旧版)', legacy), ('流式多相', streaming)]:
+            output = func()
+            elapsed = measure(func, args.repeat)
+            # 忽略末尾未冲出的群延迟部分
+            n = min(len(output), len(reference)) - 100
+            max_error = float(np.max(np.abs(output[:n] - reference[:n])))
+            logger.info(
+                f"{rate}Hz -> 16000Hz {name}: 每秒音频 {elapsed / args.duration * 1000:.3f}ms, "
+                f"与整段 resample_poly 最大误差 {max_error:.2e}"
+            )
+
+
+def load_segments(path: Optional[str], count: int, duration: float) -> List[np.ndarray]:
+    """
+    准备识别测试用的语音片段（从文件切分或合成）
+
+    Args:
+        path: 音频文件路径（None 时合成）
+        count: 片段数
+        duration: 片段时长（秒）
+
+    Returns:
+        片段列表
+    """
+    size = int(duration * 16000)
+
+    if path:
+        from audio.file_source import FileAudioSource
+
+        source = FileAudioSource({'file_path': path, 'sample_rate': 16000})
+        source.load()
+        audio = source.audio
+        if len(audio) < size:
+            audio = np.resize(audio, size)
+        starts = np.linspace(0, len(audio) - size, count).astype(int)
+        return [np.array(audio[i:i + size]) for i in starts]
+
+    return [synthetic_audio(duration, seed=i) for i in range(count)]
+
+
+def bench_asr_batch(args):
+    """
+    批量识别基准：不同批大小下的吞吐（片段/秒）
+    """
+    from asr.whisper_engine import WhisperEngine
+
+    config = load_config(args.config)['whisper']
+    config.update({
+        'model_size': args.model,
+        'device': args.device,
+        'compute_type': args.compute_type,
+        'batch_size': max(args.batch_sizes)
+    })
+
+    engine = WhisperEngine(config)
+    engine.load_model()
+    segments = load_segments(args.file, args.segments, args.segment_duration)
+
+    # 预热
+    engine.transcribe(segments[0])
+
+    for batch_size in args.batch_sizes:
+        def run():
+            for i in range(0, len(segments), batch_size):
+                engine.transcribe_batch(segments[i:i + batch_size], language=args.language)
+
+        elapsed = measure(run, args.repeat)
+        logger.info(
+            f"批大小 {batch_size}: {len(segments) / elapsed:.2f} 片段/秒, "
+            f"RTF={elapsed / (len(segments) * args.segment_duration):.3f}"
+        )
+
+    engine.unload_model()
+
+
+def vad_segments(audio: np.ndarray, vad_config: dict, chunk_duration: float = 0.3) -> Tuple[list, list]:
+    """
+    用流式 VAD 切分音频，得到语音片段和片段内的语音区间
+
+    Args:
+        audio: 音频数据 (float32, 16kHz)
+        vad_config: VAD 配置字典
+        chunk_duration: 音频块时长（秒）
+
+    Returns:
+        (片段列表, 语音区间列表)
+    """
+    from audio.vad import VoiceActivityDetector
+
+    vad = VoiceActivityDetector(vad_config, sample_rate=16000)
+    chunk_size = int(chunk_duration * 16000)
+    segments, regions = [], []
+    for i in range(0, len(audio), chunk_size):
+        _, found = vad.process_stream(audio[i:i + chunk_size])
+        segments.extend(found)
+        regions.extend(vad.segment_regions)
+    segment = vad.flush()
+    if segment is not None:
+        segments.append(segment)
+        regions.extend(vad.segment_regions)
+    return segments, regions
+
+
+def bench_asr_vad(args):
+    """
+    内置 VAD 基准：Whisper 内置 Silero VAD vs 直接使用上游 VAD 的语音区间
+    """
+    from asr.whisper_engine import WhisperEngine
+
+    config = load_config(args.config)
+    if args.file:
+        from audio.file_source import FileAudioSource
+
+        source = FileAudioSource({'file_path': args.file, 'sample_rate': 16000})
+        source.load()
+        audio = np.array(source.audio)
+    else:
+        audio = synthetic_audio(args.duration)
+        # 合成音频不是真实语音，WebRTC VAD 不会触发，改用能量判定
+        config['vad']['backend'] = 'energy'
+
+    segments, regions = vad_segments(audio, config['vad'])
+    if not segments:
+        logger.error("VAD 没有切分出语音片段")
+        return
+    logger.info(f"VAD 切分出 {len(segments)} 个片段")
+
+    whisper_config = config['whisper']
+    whisper_config.update({
+        'model_size': args.model,
+        'device': args.device,
+        'compute_type': args.compute_type,
+        'language': args.language,
+        'batch_size': 1
+    })
+
+    engine = WhisperEngine(whisper_config)
+    engine.load_model()
+    engine.warm_up()
+
+    timings = {}
+    for name, vad_filter, use_regions in [('内置 Silero VAD', True, False), ('上游语音区间', 'auto', True)]:
+        engine.vad_filter = vad_filter
+
+        def run():
+            for segment, segment_regions in zip(segments, regions):
+                engine.transcribe(segment, speech_regions=segment_regions if use_regions else None)
+
+        elapsed = measure(run, args.repeat)
+        timings[name] = elapsed / len(segments) * 1000
+        logger.info(f"{name}: 每片段 {timings[name]:.1f}ms")
+
+    saved = timings['内置 Silero VAD'] - timings['上游语音区间']
+    logger.info(f"跳过内置 VAD 每片段节省 {saved:.1f}ms")
+
+    engine.unload_model()
+
+
+def bench_asr_pool(args):
+    """
+    线程池基准：不同并发数（CPU 线程平分）下的吞吐（片段/秒）
+    """
+    from asr.whisper_engine import WhisperEngine
+    from asr.worker_pool import ASRWorkerPool, partition_threads
+
+    base_config = load_config(args.config)['whisper']
+    base_config.update({
+        'model_size': args.model,
+        'device': args.device,
+        'compute_type': args.compute_type,
+        'language': args.language
+    })
+    segments = load_segments(args.file, args.segments, args.segment_duration)
+
+    for size in args.configs:
+        threads = partition_threads(size, args.cpu_threads)
+        engine = WhisperEngine(dict(base_config, **threads))
+        engine.load_model()
+        engine.warm_up()
+
+        pool = ASRWorkerPool(engine, size)
+        pool.start()
+
+        def run():
+            for segment in segments:
+                pool.submit(segment)
+            for _ in segments:
+                pool.results.get()
+
+        elapsed = measure(run, args.repeat)
+        pool.stop()
+
+        stats = pool.get_stats()
+        logger.info(
+            f"{size} 并发 x {threads['cpu_threads']} 线程: "
+            f"{len(segments) / elapsed:.2f} 片段/秒, "
+            f"RTF={elapsed / (len(segments) * args.segment_duration):.3f}, "
+            f"最大重排={stats['max_reorder']}"
+        )
+
+        engine.unload_model()
+
+
+def bench_mel_cache(args):
+    """
+    增量 log-mel 基准：滑动窗口每次前移 hop 秒时的特征提取耗时
+    """
+    from faster_whisper.feature_extractor import FeatureExtractor
+    from asr.mel_cache import IncrementalMelExtractor
+
+    audio = synthetic_audio(args.duration)
+    window = int(args.window * 16000)
+    full = FeatureExtractor()
+
+    for hop_seconds in args.hops:
+        hop = int(hop_seconds * 16000)
+        starts = range(0, len(audio) - window + 1, hop)
+        incremental = IncrementalMelExtractor(FeatureExtractor())
+
+        def run_full():
+            for start in starts:
+                full(audio[start:start + window])
+
+        def run_incremental():
+            incremental.reset()
+            for start in starts:
+                segment = audio[start:start + window]
+                with incremental.bind(segment, start):
+                    incremental(segment)
+
+        full_time = measure(run_full, args.repeat) / len(starts) * 1000
+        incremental_time = measure(run_incremental, args.repeat) / len(starts) * 1000
+        logger.info(
+            f"hop {hop_seconds}s: 完整计算 {full_time:.2f}ms/窗口, "
+            f"增量 {incremental_time:.2f}ms/窗口 ({full_time / incremental_time:.1f}x), "
+            f"帧复用率 {incremental.get_stats()['reuse_rate']:.0%}"
+        )
+
+
+def bench_model_routing(args):
+    """
+    模型路由基准：英语回放上 .en 检查点与多语言检查点的 RTF 对比
+    """
+    from asr.whisper_engine import WhisperEngine
+
+    base_config = load_config(args.config)['whisper']
+    base_config.update({
+        'device': args.device,
+        'compute_type': args.compute_type,
+        'language': 'en',
+        'batch_size': 1,
+        'preload': False,
+        'two_pass': {'enabled': False}
+    })
+    segments = load_segments(args.file, args.segments, args.segment_duration)
+    if not args.file:
+        logger.warning("未指定英语音频文件，使用合成音频（只比较速度）")
+
+    for model_size in args.models:
+        texts = {}
+        for routing in (False, True):
+            engine = WhisperEngine(dict(base_config, model_size=model_size, model_routing={'enabled': routing}))
+            engine.load_model()
+            engine.warm_up()
+
+            def run():
+                texts[routing] = [engine.transcribe(segment)['text'] for segment in segments]
+
+            elapsed = measure(run, args.repeat)
+            logger.info(
+                f"{engine.model_size}: {len(segments) / elapsed:.2f} 片段/秒, "
+                f"RTF={elapsed / (len(segments) * args.segment_duration):.3f}"
+            )
+            engine.unload_model()
+
+        same = sum(a == b for a, b in zip(texts[False], texts[True]))
+        logger.info(f"{model_size}: 两种检查点结果相同 {same}/{len(segments)} 段")
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="游戏翻译助手性能测试")
+    parser.add_argument('--config', default=str(ROOT_DIR / 'config' / 'settings.yaml'),
+                        help="配置文件路径")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pipeline = subparsers.add_parser('pipeline', help="端到端流水线测试")
+    pipeline.add_argument('file', help="回放音频文件 (WAV/FLAC/NPY/NPZ)")
+    pipeline.add_argument('--pacing', choices=['realtime', 'fast'], default='fast',
+                          help="回放节奏")
+    pipeline.add_argument('--settle', type=float, default=2.0,
+                          help="回放结束后等待处理完成的时间（秒）")
+    pipeline.add_argument('--profile', action='store_true',
+                          help="统计各环节的内存分配和复制")
+    pipeline.set_defaults(func=bench_pipeline)
+
+    vad = subparsers.add_parser('vad', help="VAD 分帧微基准")
+    vad.add_argument('--duration', type=float, default=60.0, help="测试音频时长（秒）")
+    vad.add_argument('--chunk-duration', type=float, default=0.3, help="音频块时长（秒）")
+    vad.add_argument('--repeat', type=int, default=5, help="重复次数")
+    vad.set_defaults(func=bench_vad)
+
+    processor = subparsers.add_parser('processor', help="噪声门和静音裁剪基准")
+    processor.add_argument('--durations', type=float, nargs='+', default=[1, 5, 10, 30, 60],
+                           help="测试音频时长列表（秒）")
+    processor.add_argument('--repeat', type=int, default=3, help="重复次数")
+    processor.set_defaults(func=bench_processor)
+
+    resample = subparsers.add_parser('resample', help="重采样基准")
+    resample.add_argument('--rates', type=int, nargs='+', default=[48000, 44100], help="设备采样率列表")
+    resample.add_argument('--duration', type=float, default=30.0, help="测试音频时长（秒）")
+    resample.add_argument('--chunk-duration', type=float, default=0.3, help="音频块时长（秒）")
+    resample.add_argument('--repeat', type=int, default=3, help="重复次数")
+    resample.set_defaults(func=bench_resample)
+
+    asr_batch = subparsers.add_parser('asr-batch', help="批量识别吞吐基准")
+    asr_batch.add_argument('--file', default=None, help="切分片段用的音频文件（默认合成音频）")
+    asr_batch.add_argument('--model', default='small', help="模型大小")
+    asr_batch.add_argument('--device', default='cpu', help="设备")
+    asr_batch.add_argument('--compute-type', default='int8', help="计算类型")
+    asr_batch.add_argument('--language', default=None, help="源语言（默认自动检测）")
+    asr_batch.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8], help="批大小列表")
+    asr_batch.add_argument('--segments', type=int, default=16, help="片段数")
+    asr_batch.add_argument('--segment-duration', type=float, default=4.0, help="片段时长（秒）")
+    asr_batch.add_argument('--repeat', type=int, default=2, help="重复次数")
+    asr_batch.set_defaults(func=bench_asr_batch)
+
+    asr_vad = subparsers.add_parser('asr-vad', help="内置 VAD 与上游语音区间对比")
+    asr_vad.add_argument('--file', default=None, help="音频文件（默认合成音频）")
+    asr_vad.add_argument('--duration', type=float, default=60.0, help="合成音频时长（秒）")
+    asr_vad.add_argument('--model', default='small', help="模型大小")
+    asr_vad.add_argument('--device', default='cpu', help="设备")
+    asr_vad.add_argument('--compute-type', default='int8', help="计算类型")
+    asr_vad.add_argument('--language', default=None, help="源语言（默认自动检测）")
+    asr_vad.add_argument('--repeat', type=int, default=2, help="重复次数")
+    asr_vad.set_defaults(func=bench_asr_vad)
+
+    asr_pool = subparsers.add_parser('asr-pool', help="ASR 线程池吞吐基准")
+    asr_pool.add_argument('--file', default=None, help="切分片段用的音频文件（默认合成音频）")
+    asr_pool.add_argument('--model', default='small', help="模型大小")
+    asr_pool.add_argument('--device', default='cpu', help="设备")
+    asr_pool.add_argument('--compute-type', default='int8', help="计算类型")
+    asr_pool.add_argument('--language', default=None, help="源语言（默认自动检测）")
+    asr_pool.add_argument('--configs', type=int, nargs='+', default=[1, 2, 4], help="并发数列表")
+    asr_pool.add_argument('--cpu-threads', type=int, default=0, help="CPU 线程总数（0 为全部核心）")
+    asr_pool.add_argument('--segments', type=int, default=16, help="片段数")
+    asr_pool.add_argument('--segment-duration', type=float, default=4.0, help="片段时长（秒）")
+    asr_pool.add_argument('--repeat', type=int, default=2, help="重复次数")
+    asr_pool.set_defaults(func=bench_asr_pool)
+
+    mel_cache = subparsers.add_parser('mel-cache', help="增量 log-mel 特征基准")
+    mel_cache.add_argument('--hops', type=float, nargs='+', default=[0.5, 1.0, 2.0], help="窗口前移步长列表（秒）")
+    mel_cache.add_argument('--window', type=float, default=10.0, help="窗口时长（秒）")
+    mel_cache.add_argument('--duration', type=float, default=120.0, help="测试音频时长（秒）")
+    mel_cache.add_argument('--repeat', type=int, default=3, help="重复次数")
+    mel_cache.set_defaults(func=bench_mel_cache)
+
+    model_routing = subparsers.add_parser('model-routing', help="英语 .en 与多语言检查点 RTF 对比")
+    model_routing.add_argument('--file', default=None, help="英语回放音频文件（默认合成音频）")
+    model_routing.add_argument('--models', nargs='+', default=['base', 'small'], help="多语言模型大小列表")
+    model_routing.add_argument('--device', default='cpu', help="设备")
+    model_routing.add_argument('--compute-type', default='int8', help="计算类型")
+    model_routing.add_argument('--segments', type=int, default=16, help="片段数")
+    model_routing.add_argument('--segment-duration', type=float, default=4.0, help="片段时长（秒）")
+    model_routing.add_argument('--repeat', type=int, default=2, help="重复次数")
+    model_routing.set_defaults(func=bench_model_routing)
+
+    args = parser.parse_args()
+
+    # 测试循环中的调试日志会干扰计时
+    logger.remove()
+    logger.add(sys.stderr, level='INFO')
+
+    logger.info("=" * 60)
+    logger.info(f"性能测试: {args.command}")
+    logger.info("=" * 60)
+
+    try:
+        args.func(args)
+    except KeyboardInterrupt:
+        logger.warning("测试被中断")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+流式重叠窗口合并测试 - 合成的重叠窗口（带时间戳抖动）在接缝处不重复、不丢词
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("faster_whisper")
+
+from asr.whisper_engine import WhisperStreamProcessor  # noqa: E402
+
+
+SAMPLE_RATE = 16000
+
+
+def make_timeline(count: int, seed: int = 0) -> list:
+    """
+    生成流中的词时间线
+
+    Args:
+        count: 词数
+        seed: 随机种子
+
+    Returns:
+        [(起始秒, 结束秒, 词)]
+    """
+    rng = np.random.default_rng(seed)
+    words = []
+    t = 0.2
+    for i in range(count):
+        duration = rng.uniform(0.15, 0.45)
+        words.append((t, t + duration, f" w{i}"))
+        t += duration + rng.uniform(0.02, 0.25)
+    return words
+
+
+class FakeEngine:
+    """
+    按时间线返回窗口内词的引擎
+
+    中点落在窗口内的词被识别，时间戳加抖动并截到窗口边界
+    （窗口起点截断的词只剩后半段，模拟真实识别）。
+    """
+
+    def __init__(self, timeline: list, jitter: float = 0.06, seed: int = 1):
+        self.timeline = timeline
+        self.jitter = jitter
+        self.rng = np.random.default_rng(seed)
+
+    def transcribe(self, audio, word_timestamps=False, stream_offset=None, **kwargs):
+        start = stream_offset / SAMPLE_RATE
+        end = start + len(audio) / SAMPLE_RATE
+        words = []
+        for w_start, w_end, word in self.timeline:
+            if not start <= (w_start + w_end) / 2 < end:
+                continue
+            a = min(max(w_start + self.rng.uniform(-self.jitter, self.jitter), start), end)
+            b = min(max(w_end + self.rng.uniform(-self.jitter, self.jitter), a + 0.02), end)
+            words.append({'start': a - start, 'end': b - start, 'word': word})
+
+        if not words:
+            return {'text': '', 'segments': [], 'language': 'en'}
+        segment = {
+            'start': words[0]['start'],
+            'end': words[-1]['end'],
+            'text': ''.join(w['word'] for w in words).strip(),
+            'words': words
+        }
+        return {'text': segment['text'], 'segments': [segment], 'language': 'en'}
+
+
+def run_stream(timeline: list, buffer_duration: float, overlap_duration: float,
+               chunk_duration: float = 0.3, jitter: float = 0.06, seed: int = 1) -> list:
+    """
+    把覆盖整条时间线的音频逐块送入 buffer 模式的流式处理器
+
+    Returns:
+        输出的词列表
+    """
+    processor = WhisperStreamProcessor(
+        FakeEngine(timeline, jitter, seed),
+        mode='buffer',
+        buffer_duration=buffer_duration,
+        overlap_duration=overlap_duration
+    )
+    total = int((timeline[-1][1] + 0.5) * SAMPLE_RATE)
+    chunk = int(chunk_duration * SAMPLE_RATE)
+
+    output = []
+    for pos in range(0, total, chunk):
+        result = processor.add_audio(np.zeros(min(chunk, total - pos), dtype=np.float32))
+        if result:
+            output.extend(result['text'].split())
+    result = processor.flush()
+    if result:
+        output.extend(result['text'].split())
+    return output
+
+
+@pytest.mark.parametrize("buffer_duration,overlap_duration", [(3.0, 0.5), (4.0, 1.0), (2.0, 0.5)])
+@pytest.mark.parametrize("seed", range(5))
+def test_overlapping_windows_emit_each_word_once(buffer_duration, overlap_duration, seed):
+    timeline = make_timeline(60, seed=seed)
+    expected = [w[2].strip() for w in timeline]
+
+    output = run_stream(timeline, buffer_duration, overlap_duration, seed=seed)
+
+    assert output == expected
+
+
+def test_no_jitter_is_exact():
+    timeline = make_timeline(40, seed=7)
+    output = run_stream(timeline, 3.0, 0.5, jitter=0.0)
+    assert output == [w[2].strip() for w in timeline]
+
+
+def test_drop_repeated_head_removes_seam_duplicates():
+    tail = [(1.0, 1.3, " the"), (1.4, 1.8, " enemy"), (1.9, 2.2, " is")]
+    words = [(2.0, 2.25, " is,"), (2.3, 2.7, " behind"), (2.8, 3.0, " you")]
+
+    kept, dropped = WhisperStreamProcessor._drop_repeated_head(words, tail, max_gap=1.0)
+
+    assert dropped == 1
+    assert [w[2] for w in kept] == [" behind", " you"]
+
+
+def test_drop_repeated_head_keeps_distant_repeats():
+    tail = [(1.0, 1.3, " go")]
+    words = [(3.0, 3.3, " go"), (3.4, 3.7, " go")]
+
+    kept, dropped = WhisperStreamProcessor._drop_repeated_head(words, tail, max_gap=1.0)
+
+    assert dropped == 0
+    assert kept == words
@@ -0,0 +1,97 @@
+"""
+翻译路径规划 - 目标语言为英语时由 Whisper translate 任务直接输出，省去机器翻译
+"""
+from threading import Lock
+from typing import Dict, Optional
+from loguru import logger
+
+
+# 翻译路径
+ROUTE_ASR_TRANSLATE = 'asr_translate'  # Whisper translate 任务直接输出目标语言
+ROUTE_TRANSCRIBE_MT = 'transcribe_mt'  # 转录后机器翻译
+ROUTE_PASSTHROUGH = 'passthrough'      # 源语言即目标语言
+
+
+class RoutePlanner:
+    """
+    按 (源语言, 目标语言) 选择翻译路径，并统计各路径的识别和翻译耗时
+
+    Whisper 的 translate 任务只能输出英语，目标语言为英语时识别直接使用
+    translate 任务，所有源语言都不再经过机器翻译；其他目标语言转录后翻译。
+    """
+
+    def __init__(self, config: dict):
+        """
+        初始化路径规划
+
+        Args:
+            config: 翻译配置字典
+        """
+        self.target_language = config.get('target_language', 'zh').lower()
+        self.asr_translate = config.get('asr_translate', True) and self.target_language == 'en'
+
+        # Whisper 识别任务（整个会话固定）
+        self.asr_task = 'translate' if self.asr_translate else 'transcribe'
+
+        self._lock = Lock()
+        self.stats: Dict[str, Dict] = {}
+
+        logger.info(f"翻译路径: 目标语言={self.target_language}, Whisper 任务={self.asr_task}")
+
+    def plan(self, source_language: Optional[str]) -> str:
+        """
+        选择翻译路径
+
+        Args:
+            source_language: 识别出的源语言
+
+        Returns:
+            路径名称
+        """
+        if source_language and source_language.lower() == self.target_language:
+            return ROUTE_PASSTHROUGH
+        if self.asr_translate:
+            return ROUTE_ASR_TRANSLATE
+        return ROUTE_TRANSCRIBE_MT
+
+    def record(self, route: str, asr_time: Optional[float], mt_time: float):
+        """
+        记录一条结果的耗时
+
+        Args:
+            route: 路径名称
+            asr_time: 识别耗时（秒，流式结果为 None）
+            mt_time: 机器翻译耗时（秒）
+        """
+        with self._lock:
+            entry = self.stats.setdefault(route, {
+                'count': 0,
+                'asr_count': 0,
+                'asr_time': 0.0,
+                'mt_time': 0.0
+            })
+            entry['count'] += 1
+            entry['mt_time'] += mt_time
+            if asr_time is not None:
+                entry['asr_count'] += 1
+                entry['asr_time'] += asr_time
+
+    def get_stats(self) -> Dict:
+        """
+        获取各路径统计（平均耗时为秒）
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            stats = {}
+            for route, entry in self.stats.items():
+                avg_asr = entry['asr_time'] / entry['asr_count'] if entry['asr_count'] else 0.0
+                avg_mt = entry['mt_time'] / entry['count']
+                stats[route] = dict(
+                    entry,
+                    avg_asr_time=avg_asr,
+                    avg_mt_time=avg_mt,
+                    avg_total_time=avg_asr + avg_mt
+                )
+        return stats